@@ -0,0 +1,172 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file plays many moves on many ChessVar games in one call, for example all of the moves clients
+# send again when they reconnect. An operation is (game, start_id, end_id) for moving a piece or (game, letter,
+# square_id) for entering a fairy piece, and the operations are played in the order they are given. Square ids are
+# turned into square indexes with one table lookup instead of going through the board, and the games are played
+# with their make_move_by_index and enter_fairy_piece_by_index methods. An id that is not on the board is left to
+# make_move or enter_fairy_piece, so the game still sets its rejection reason and sends its REJECTED event. With
+# with_results=True every operation gets a ChessVar MoveResult that also says why a move was not allowed, which the
+# games already worked out while checking it.
+# Only an operation whose first item is one of the FAIRY_LETTERS enters a fairy. Anything else is a move, so an
+# operation like (game, "e", "a1") is not on the board, the same as make_move("e", "a1"). ChessVar.is_fairy_entry
+# decides this for BatchMoves, BoardArray.play_moves and ShardedHost alike. Run "python BatchMoves.py" to check that
+# play_moves, BoardArray.play_moves and ShardedHost.make_moves answer the same as make_move and enter_fairy_piece for
+# badly formed operations.
+
+import argparse
+
+from BoardArray import BoardArray
+from ShardedHost import ShardedHost
+from ChessVar import ChessVar, SQUARE_INDEX, MOVE_RESULTS, fen_to_position_bytes, is_fairy_entry
+
+# (first, square_id) of operations with square ids or letters that are badly formed, and some good ones
+CHECKED_OPERATIONS = [("e", "a1"), ("X", "a1"), ("", "a1"), ("HH", "b1"), ("e", "b1"), ("H", "b1"), ("F", "a1"),
+                      ("h", "b8"), ("H", "z9"), ("e2", ""), ("e2", "e"), ("e2", "e4"), ("e2", "e4x"), ("z9", "e4"),
+                      ("e7", "e5"), ("b1", "c3"), ("b1", "b3")]
+
+# positions the operations are checked on: the start, and one where white has lost a knight and can enter a fairy
+CHECKED_FENS = ["rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w HFhf -",
+                "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/R1BQKBNR w HFhf -"]
+
+
+def play_moves(operations, with_results=False):
+    """takes in a list of (game, start_id, end_id) and (game, letter, square_id) operations and plays each of them
+    the same way make_move and enter_fairy_piece would. returns a list with True or False for every operation, or
+    with a MoveResult for every operation if with_results is True"""
+
+    if with_results:
+        return play_moves_with_results(operations)
+
+    results = []
+    append_result = results.append
+    find_index = SQUARE_INDEX.get
+
+    # an id that is not on the board is left to make_move or enter_fairy_piece
+    for game, first, square_id in operations:
+        end = find_index(square_id[:2])
+        if is_fairy_entry(first):
+            if end is None:
+                append_result(game.enter_fairy_piece(first, square_id))
+            else:
+                append_result(game.enter_fairy_piece_by_index(first, end))
+        else:
+            start = find_index(first[:2])
+            if start is None or end is None:
+                append_result(game.make_move(first, square_id))
+            else:
+                append_result(game.make_move_by_index(start, end))
+
+    return results
+
+
+def play_moves_with_results(operations):
+    """same as play_moves but returns a list with a MoveResult for every operation"""
+
+    results = []
+    append_result = results.append
+    find_index = SQUARE_INDEX.get
+
+    for game, first, square_id in operations:
+        end = find_index(square_id[:2])
+        if is_fairy_entry(first):
+            if end is None:
+                game.enter_fairy_piece(first, square_id)
+            else:
+                game.enter_fairy_piece_by_index(first, end)
+        else:
+            start = find_index(first[:2])
+            if start is None or end is None:
+                game.make_move(first, square_id)
+            else:
+                game.make_move_by_index(start, end)
+        append_result(MOVE_RESULTS[game.get_rejection_reason()])
+
+    return results
+
+
+def check_against_single_moves(fens=CHECKED_FENS, operations=CHECKED_OPERATIONS):
+    """plays every operation on a new game of every FEN position, once with play_moves and once with make_move (or
+    enter_fairy_piece for a fairy letter), and returns a list of (fen, operation, play_moves result, single move
+    result) for every operation where they did not give the same True or False, the same reason or the same events"""
+
+    mismatches = []
+    for fen in fens:
+        position = fen_to_position_bytes(fen)
+        for first, square_id in operations:
+            batch_events = []
+            batch_game = ChessVar.from_bytes(position)
+            batch_game.add_event_listener(lambda game, event: batch_events.append(event))
+            [plain_result] = play_moves([(batch_game, first, square_id)])
+            plain_reason = batch_game.get_rejection_reason()
+            batch_game = ChessVar.from_bytes(position)
+            [batch_result] = play_moves([(batch_game, first, square_id)], with_results=True)
+
+            single_events = []
+            single_game = ChessVar.from_bytes(position)
+            single_game.add_event_listener(lambda game, event: single_events.append(event))
+            if is_fairy_entry(first):
+                single_result = single_game.enter_fairy_piece_with_result(first, square_id)
+            else:
+                single_result = single_game.make_move_with_result(first, square_id)
+
+            if (plain_result != bool(single_result) or plain_reason != single_result.get_reason() or
+                    batch_result is not single_result or batch_events != single_events):
+                mismatches.append((fen, (first, square_id), batch_result, single_result))
+    return mismatches
+
+
+def check_front_ends(fens=CHECKED_FENS, operations=CHECKED_OPERATIONS):
+    """plays every operation on a new game of every FEN position with play_moves, BoardArray.play_moves and
+    ShardedHost.make_moves, and returns a list of (fen, operation, front end name, its result, single move result)
+    for every operation where one of them did not give the same answer as make_move or enter_fairy_piece"""
+
+    mismatches = []
+    with ShardedHost(num_of_workers=2) as host:
+        for fen in fens:
+            position = fen_to_position_bytes(fen)
+            for number, (first, square_id) in enumerate(operations):
+                single_game = ChessVar.from_bytes(position)
+                if is_fairy_entry(first):
+                    single_result = single_game.enter_fairy_piece_with_result(first, square_id)
+                else:
+                    single_result = single_game.make_move_with_result(first, square_id)
+
+                [batch_result] = play_moves([(ChessVar.from_bytes(position), first, square_id)])
+                board_array = BoardArray()
+                board_array.add_game_bytes(position)
+                [array_result] = board_array.play_moves([(0, first, square_id)])
+                game_id = "%s %d" % (fen, number)
+                host.new_game(game_id, fen)
+                [host_result] = host.make_moves([(game_id, first, square_id)], with_results=True)
+                host.remove_game(game_id)
+
+                for name, result in (("play_moves", batch_result), ("BoardArray.play_moves", array_result)):
+                    if result != bool(single_result):
+                        mismatches.append((fen, (first, square_id), name, result, single_result))
+                if host_result is not single_result:
+                    mismatches.append((fen, (first, square_id), "ShardedHost.make_moves", host_result,
+                                       single_result))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check that play_moves, BoardArray.play_moves and "
+                                                 "ShardedHost.make_moves answer like make_move and "
+                                                 "enter_fairy_piece")
+    parser.parse_args()
+
+    mismatches = check_against_single_moves()
+    for fen, operation, batch_result, single_result in mismatches:
+        print("%s %r: play_moves %r, single move %r" % (fen, operation, batch_result, single_result))
+    front_end_mismatches = check_front_ends()
+    for fen, operation, name, result, single_result in front_end_mismatches:
+        print("%s %r: %s %r, single move %r" % (fen, operation, name, result, single_result))
+    print("%d operations checked, %d different" % (len(CHECKED_FENS) * len(CHECKED_OPERATIONS),
+                                                   len(mismatches) + len(front_end_mismatches)))
+    return 1 if mismatches or front_end_mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,317 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file keeps many games of ChessVar packed together in a few flat byte arrays instead of a ChessVar
+# and a Board per game. A BoardArray holds game number g as 64 bytes of squares (square index
+# g * 64 + row * 8 + col, using the piece codes from ChessVar), 1 byte for whose turn it is, 8 bytes of pawn first move
+# bits and 16 bytes of piece trackers, so every game costs 89 bytes. Games can be created, played and looked at by
+# number with the exact same rules as ChessVar, turned into a ChessVar and back, and the squares of every game can be
+# copied into one (number of games, 64) int8 numpy array when numpy is installed. The move rules, piece codes and
+# tracker layout all come from the tables in ChessVar.py, so the two can't drift apart.
+
+from ChessVar import (ChessVar, COLORS, PIECE_CODES, PIECES_FROM_CODES, TRACKER_INDEXES, SQUARE_INDEX, SQUARES_BETWEEN,
+                      REACHABLE_SQUARES, PAWN_CAPTURES, HOME_RANKS, FAIRY_LETTERS, FEN_LETTERS, CODES_FROM_FEN_LETTERS,
+                      MAJOR_PIECE_NAMES, MOST_MAJOR_PIECES_FOR_FIRST_FAIRY,
+                      MOST_MAJOR_PIECES_FOR_SECOND_FAIRY, TURN_BYTE, FIRST_MOVES_START, TRACKERS_START,
+                      check_position_bytes, is_fairy_entry)
+
+# bytes kept for every game
+SQUARE_BYTES = 64
+FIRST_MOVE_BYTES = 8
+TRACKER_BYTES = 16
+
+
+def _build_squares_between_lists():
+    """returns a 64 x 64 table. table[start][end] is a tuple of the square indexes strictly between start and end when
+    the two squares share a row, column or diagonal, and an empty tuple otherwise"""
+
+    table = []
+    for start in range(64):
+        row = []
+        for end in range(64):
+            between = SQUARES_BETWEEN[start][end]
+            row.append(tuple(index for index in range(64) if between >> index & 1))
+        table.append(row)
+    return table
+
+
+SQUARES_BETWEEN_LISTS = _build_squares_between_lists()
+
+# the tracker byte of each color's king, and of each color's major pieces
+KING_TRACKERS = [TRACKER_INDEXES[PIECE_CODES[(color, "king")]] for color in COLORS]
+MAJOR_PIECE_TRACKERS = [[TRACKER_INDEXES[PIECE_CODES[(color, piece_name)]] for piece_name in MAJOR_PIECE_NAMES]
+                        for color in COLORS]
+
+
+# the squares, first move bits and trackers of a new game of ChessVar
+_STARTING_POSITION = ChessVar().to_bytes()
+STARTING_SQUARES = _STARTING_POSITION[:TURN_BYTE]
+STARTING_FIRST_MOVES = _STARTING_POSITION[FIRST_MOVES_START:TRACKERS_START]
+STARTING_TRACKERS = _STARTING_POSITION[TRACKERS_START:]
+
+
+class BoardArray:
+    """A BoardArray object holds any number of ChessVar games packed into byte arrays. Games are numbered from 0 in
+    the order they are added. make_move and enter_fairy_piece follow the same rules as the ChessVar methods with the
+    same names, but take the game number first"""
+
+    def __init__(self, number_of_games=0):
+        """starts with number_of_games new games"""
+        self._squares = bytearray()
+        self._turns = bytearray()
+        self._first_moves = bytearray()
+        self._trackers = bytearray()
+        self.add_new_games(number_of_games)
+
+    def get_num_of_games(self):
+        """returns how many games are in the array"""
+        return len(self._turns)
+
+    def add_new_games(self, number_of_games):
+        """adds number_of_games new games set up at the starting position and returns the number of the first one"""
+
+        first_game = len(self._turns)
+        self._squares += STARTING_SQUARES * number_of_games
+        self._turns += bytes(number_of_games)
+        self._first_moves += STARTING_FIRST_MOVES * number_of_games
+        self._trackers += STARTING_TRACKERS * number_of_games
+        return first_game
+
+    def add_new_game(self):
+        """adds a game set up at the starting position and returns its number"""
+        return self.add_new_games(1)
+
+    def add_chess_var(self, game):
+        """adds a copy of the position of a ChessVar game and returns its number"""
+
+        game_number = self.add_new_game()
+        self.set_game_from_chess_var(game_number, game)
+        return game_number
+
+    def set_game_from_chess_var(self, game_number, game):
+        """replaces game game_number with a copy of the position of a ChessVar game"""
+        self.set_game_bytes(game_number, game.to_bytes())
+
+    def get_chess_var(self, game_number, engine="list"):
+        """returns a new ChessVar set up to the position of game game_number, using the engine for its board"""
+        return ChessVar.from_bytes(self.get_game_bytes(game_number), engine)
+
+    def get_game_bytes(self, game_number):
+        """returns the position of game game_number in the same bytes as ChessVar.to_bytes"""
+
+        return (self._squares[game_number * SQUARE_BYTES:(game_number + 1) * SQUARE_BYTES] +
+                self._turns[game_number:game_number + 1] +
+                self._first_moves[game_number * FIRST_MOVE_BYTES:(game_number + 1) * FIRST_MOVE_BYTES] +
+                self._trackers[game_number * TRACKER_BYTES:(game_number + 1) * TRACKER_BYTES])
+
+    def set_game_bytes(self, game_number, data):
+        """replaces game game_number with the position in bytes made by ChessVar.to_bytes or get_game_bytes. raises a
+        ValueError if the bytes are not a position (see ChessVar.check_position_bytes)"""
+
+        check_position_bytes(data)
+        self._squares[game_number * SQUARE_BYTES:(game_number + 1) * SQUARE_BYTES] = data[:TURN_BYTE]
+        self._turns[game_number] = data[TURN_BYTE]
+        self._first_moves[game_number * FIRST_MOVE_BYTES:(game_number + 1) * FIRST_MOVE_BYTES] = \
+            data[FIRST_MOVES_START:TRACKERS_START]
+        self._trackers[game_number * TRACKER_BYTES:(game_number + 1) * TRACKER_BYTES] = data[TRACKERS_START:]
+
+    def add_game_bytes(self, data):
+        """adds the position in bytes made by ChessVar.to_bytes or get_game_bytes as a new game and returns its
+        number"""
+
+        check_position_bytes(data)
+        game_number = self.add_new_game()
+        self.set_game_bytes(game_number, data)
+        return game_number
+
+    def get_numpy_squares(self):
+        """returns a copy of the squares of every game as a read only (number of games, 64) int8 numpy array, so white
+        pieces are 1 to 8, black pieces are -1 to -8 and empty squares are 0. numpy is only needed for this method.
+        the array is made from a copy of the bytes, so holding on to it never stops games from being added"""
+
+        import numpy
+        return numpy.frombuffer(bytes(self._squares), dtype=numpy.int8).reshape(len(self._turns), SQUARE_BYTES)
+
+    def get_piece_at_index(self, game_number, index):
+        """returns the (color, piece name) on the square index of the game, or None if the square is empty"""
+        return PIECES_FROM_CODES.get(self._squares[game_number * SQUARE_BYTES + index])
+
+    def get_piece_at_square(self, game_number, square_id):
+        """returns the (color, piece name) on the square id of the game, ex. ("white", "pawn"), or None"""
+        return self.get_piece_at_index(game_number, SQUARE_INDEX[square_id[:2]])
+
+    def is_first_move_at_index(self, game_number, index):
+        """returns true if the pawn on the square index of the game still has its double move"""
+        return self._first_moves[game_number * FIRST_MOVE_BYTES + (index >> 3)] >> (index & 7) & 1 == 1
+
+    def get_current_player_turn(self, game_number):
+        """returns "white" or "black" for the player whose turn it is in the game"""
+        return COLORS[self._turns[game_number]]
+
+    def get_num_of_piece_on_board(self, game_number, color, piece_name):
+        """returns how many of this piece the color has on the board of the game"""
+        return self._trackers[game_number * TRACKER_BYTES + TRACKER_INDEXES[PIECE_CODES[(color, piece_name)]]]
+
+    def get_game_state(self, game_number):
+        """returns "UNFINISHED", "WHITE_WON" or "BLACK_WON" for the game"""
+
+        tracker_base = game_number * TRACKER_BYTES
+        if self._trackers[tracker_base + KING_TRACKERS[0]] == 0:
+            return "BLACK_WON"
+        elif self._trackers[tracker_base + KING_TRACKERS[1]] == 0:
+            return "WHITE_WON"
+        return "UNFINISHED"
+
+    def make_move(self, game_number, start_id, end_id):
+        """plays a move in the game the same way ChessVar.make_move would and returns True, or returns False if the
+        move is not allowed"""
+
+        start = SQUARE_INDEX.get(start_id[:2])
+        end = SQUARE_INDEX.get(end_id[:2])
+        if start is None or end is None:
+            return False
+        return self.make_move_by_index(game_number, start, end)
+
+    def make_move_by_index(self, game_number, start, end):
+        """same as make_move but takes in 2 square indexes"""
+
+        squares = self._squares
+        square_base = game_number * SQUARE_BYTES
+        start_code = squares[square_base + start]
+        end_code = squares[square_base + end]
+        turn = self._turns[game_number]
+
+        # there has to be a piece of the player whose turn it is on the start square, and not on the end square
+        if start_code == 0 or (start_code > 127) != (turn == 1):
+            return False
+        if end_code != 0 and (end_code > 127) == (turn == 1):
+            return False
+
+        color, piece_name = PIECES_FROM_CODES[start_code]
+        # the squares the piece could reach on an empty board, the same table ChessVar.make_move_by_index checks first
+        valid = REACHABLE_SQUARES[(color, piece_name)][start] >> end & 1 == 1
+        if valid and piece_name == "pawn":
+            if end_code != 0:
+                valid = PAWN_CAPTURES[color][start] >> end & 1 == 1
+            else:
+                step = -8 if turn == 0 else 8
+                valid = end - start == step
+                first_move_byte = game_number * FIRST_MOVE_BYTES + (start >> 3)
+                first_move_bit = 1 << (start & 7)
+                if self._first_moves[first_move_byte] & first_move_bit:
+                    valid = valid or end - start == step * 2
+                    # like Pawn.make_move, a valid move without a capture uses up the pawn's double move
+                    if valid:
+                        self._first_moves[first_move_byte] ^= first_move_bit
+        elif valid:
+            # knights and kings jump, so this is empty for them
+            for index in SQUARES_BETWEEN_LISTS[start][end]:
+                if squares[square_base + index]:
+                    valid = False
+                    break
+
+        if not valid or self.get_game_state(game_number) != "UNFINISHED":
+            return False
+
+        if end_code != 0:
+            # the captured piece comes off the tracker
+            self._trackers[game_number * TRACKER_BYTES + TRACKER_INDEXES[end_code]] -= 1
+
+        # a pawn that still has its double move takes its first move bit with it, and a captured pawn loses its bit
+        first_moves = self._first_moves
+        first_move_base = game_number * FIRST_MOVE_BYTES
+        had_first_move = first_moves[first_move_base + (start >> 3)] >> (start & 7) & 1
+        first_moves[first_move_base + (start >> 3)] &= ~(1 << (start & 7)) & 0xFF
+        first_moves[first_move_base + (end >> 3)] &= ~(1 << (end & 7)) & 0xFF
+        if had_first_move:
+            first_moves[first_move_base + (end >> 3)] |= 1 << (end & 7)
+        squares[square_base + end] = start_code
+        squares[square_base + start] = 0
+        self._turns[game_number] = 1 - turn
+        return True
+
+    def enter_fairy_piece(self, game_number, letter, square_id):
+        """enters a fairy piece in the game the same way ChessVar.enter_fairy_piece would and returns True, or returns
+        False if the fairy piece can not be entered there"""
+
+        start = SQUARE_INDEX.get(square_id[:2])
+        if start is None:
+            return False
+        return self.enter_fairy_piece_by_index(game_number, letter, start)
+
+    def enter_fairy_piece_by_index(self, game_number, letter, start):
+        """same as enter_fairy_piece but takes in a square index"""
+
+        turn = self._turns[game_number]
+        if len(letter) != 1 or letter not in FAIRY_LETTERS:
+            return False
+        code = CODES_FROM_FEN_LETTERS[letter]
+        letter_turn = COLORS.index(PIECES_FROM_CODES[code][0])
+
+        # the fairy has to belong to the player whose turn it is, go on an empty square of their home rank, and the
+        # game can't be finished yet
+        if letter_turn != turn or self.get_game_state(game_number) != "UNFINISHED":
+            return False
+        if HOME_RANKS[COLORS[turn]] >> start & 1 == 0:
+            return False
+        if self._squares[game_number * SQUARE_BYTES + start] != 0:
+            return False
+
+        # at most 6 major pieces left to enter the first fairy and at most 5 to enter the second one
+        tracker_base = game_number * TRACKER_BYTES
+        trackers = self._trackers
+        color = COLORS[turn]
+        num_of_major_pieces = sum(trackers[tracker_base + index] for index in MAJOR_PIECE_TRACKERS[turn])
+        hunter_tracker = tracker_base + TRACKER_INDEXES[PIECE_CODES[(color, "hunter")]]
+        falcon_tracker = tracker_base + TRACKER_INDEXES[PIECE_CODES[(color, "falcon")]]
+        if trackers[hunter_tracker] == 0 and trackers[falcon_tracker] == 0:
+            most_major_pieces = MOST_MAJOR_PIECES_FOR_FIRST_FAIRY
+        else:
+            most_major_pieces = MOST_MAJOR_PIECES_FOR_SECOND_FAIRY
+        fairy_tracker = tracker_base + TRACKER_INDEXES[code]
+        if num_of_major_pieces > most_major_pieces or trackers[fairy_tracker] != 0:
+            return False
+
+        trackers[fairy_tracker] = 1
+        self._squares[game_number * SQUARE_BYTES + start] = code
+        self._turns[game_number] = 1 - turn
+        return True
+
+    def play_moves(self, operations):
+        """takes in a list of (game_number, start_id, end_id) and (game_number, letter, square_id) operations and plays
+        each of them in order. returns a list with True or False for every operation"""
+
+        results = []
+        append_result = results.append
+        find_index = SQUARE_INDEX.get
+
+        for game_number, first, square_id in operations:
+            end = find_index(square_id[:2])
+            if end is None:
+                append_result(False)
+            elif is_fairy_entry(first):
+                append_result(self.enter_fairy_piece_by_index(game_number, first, end))
+            else:
+                start = find_index(first[:2])
+                if start is None:
+                    append_result(False)
+                else:
+                    append_result(self.make_move_by_index(game_number, start, end))
+
+        return results
+
+    def display_board(self, game_number):
+        """prints the board of the game, white pieces in upper case and black pieces in lower case"""
+
+        for row in range(8):
+            line = []
+            for col in range(8):
+                color_and_name = self.get_piece_at_index(game_number, row * 8 + col)
+                if color_and_name is None:
+                    line.append(".")
+                elif color_and_name[0] == "white":
+                    line.append(FEN_LETTERS[color_and_name[1]].upper())
+                else:
+                    line.append(FEN_LETTERS[color_and_name[1]])
+            print(8 - row, " ".join(line))
+        print("  " + " ".join("abcdefgh"))
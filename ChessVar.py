@@ -7,44 +7,535 @@
 # the chess board virtually and setting the pieces on the board at the start of a game. Each piece subclass in the
 # piece class is responsible for upholding the rules in how they move in a game of chess. The ChessVar class contains
 # a board object and is responsible for handling a single game of chess, switching between players, and calling the
-# moves for a piece to move.
+# moves for a piece to move. The BitBoard class is a second board that answers the same questions as Board but stores
+# the pieces as 64 bit integers, so a game can pick whichever board it wants to play on.
+
+import random
+
+COLORS = ("white", "black")
+PIECE_NAMES = ("rook", "knight", "bishop", "king", "queen", "pawn", "hunter", "falcon")
+
+# square ids in bit order. "a8" is square 0, "h8" is square 7, "a1" is square 56 and "h1" is square 63, so the
+# square index is always row * 8 + col using the same rows and columns as the Board class
+SQUARE_IDS = [file_letter + rank for rank in "87654321" for file_letter in "abcdefgh"]
+SQUARE_INDEX = {square_id: index for index, square_id in enumerate(SQUARE_IDS)}
+ROW_FROM_RANK = {rank: row for row, rank in enumerate("87654321")}
+COL_FROM_FILE = {file_letter: col for col, file_letter in enumerate("abcdefgh")}
+
+
+def _build_squares_between():
+    """returns a 64 x 64 table. table[start][end] is a bitboard of the squares strictly between start and end when the
+    two squares share a row, column or diagonal, and 0 otherwise"""
+
+    table = [[0] * 64 for _ in range(64)]
+    for start in range(64):
+        start_row, start_col = divmod(start, 8)
+        for row_step, col_step in ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)):
+            between = 0
+            row, col = start_row + row_step, start_col + col_step
+            while 0 <= row < 8 and 0 <= col < 8:
+                table[start][row * 8 + col] = between
+                between |= 1 << (row * 8 + col)
+                row, col = row + row_step, col + col_step
+    return table
+
+
+SQUARES_BETWEEN = _build_squares_between()
+
+# zobrist keys, one random 64 bit number for every (color, piece name) on every square, every square a pawn could
+# still have its double move on, every fairy piece that has been entered, and black being the player to move. the
+# hash of a position is all of its keys xor-ed together. the seed is fixed so every process gets the same hashes
+_zobrist_random = random.Random(20240317)
+ZOBRIST_PIECE_KEYS = {(color, piece_name): [_zobrist_random.getrandbits(64) for _ in range(64)]
+                      for color in COLORS for piece_name in PIECE_NAMES}
+ZOBRIST_FIRST_MOVE_KEYS = [_zobrist_random.getrandbits(64) for _ in range(64)]
+ZOBRIST_FAIRY_KEYS = {(color, piece_name): _zobrist_random.getrandbits(64)
+                      for color in COLORS for piece_name in ("hunter", "falcon")}
+ZOBRIST_BLACK_TO_MOVE_KEY = _zobrist_random.getrandbits(64)
+
+# (row_step, col_step) directions. a negative row_step goes up the board towards rank 8
+STRAIGHT_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIAGONAL_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+KNIGHT_STEPS = ((-2, -1), (-2, 1), (2, -1), (2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2))
+KING_STEPS = STRAIGHT_DIRECTIONS + DIAGONAL_DIRECTIONS
+
+# the directions each sliding piece can keep moving in until it is blocked. the hunter moves forward like a rook and
+# backward like a bishop, the falcon moves forward like a bishop and backward like a rook. white moves forward up the
+# board and black moves forward down the board
+SLIDING_DIRECTIONS = {
+    ("white", "rook"): STRAIGHT_DIRECTIONS, ("black", "rook"): STRAIGHT_DIRECTIONS,
+    ("white", "bishop"): DIAGONAL_DIRECTIONS, ("black", "bishop"): DIAGONAL_DIRECTIONS,
+    ("white", "queen"): KING_STEPS, ("black", "queen"): KING_STEPS,
+    ("white", "hunter"): ((-1, 0), (1, -1), (1, 1)), ("black", "hunter"): ((1, 0), (-1, -1), (-1, 1)),
+    ("white", "falcon"): ((-1, -1), (-1, 1), (1, 0)), ("black", "falcon"): ((1, -1), (1, 1), (-1, 0)),
+}
+
+
+def _build_rays():
+    """returns a dict from every direction to a list of 64 bitboards. rays[direction][square] has every square from
+    the square (not including it) to the edge of the board in that direction"""
+
+    rays = {}
+    for row_step, col_step in KING_STEPS:
+        rays[(row_step, col_step)] = []
+        for square in range(64):
+            ray = 0
+            row, col = square // 8 + row_step, square % 8 + col_step
+            while 0 <= row < 8 and 0 <= col < 8:
+                ray |= 1 << (row * 8 + col)
+                row, col = row + row_step, col + col_step
+            rays[(row_step, col_step)].append(ray)
+    return rays
+
+
+def _build_step_attacks(steps):
+    """returns a list of 64 bitboards of the squares one of the steps away from each square"""
+
+    attacks = []
+    for square in range(64):
+        attack = 0
+        for row_step, col_step in steps:
+            row, col = square // 8 + row_step, square % 8 + col_step
+            if 0 <= row < 8 and 0 <= col < 8:
+                attack |= 1 << (row * 8 + col)
+        attacks.append(attack)
+    return attacks
+
+
+def _combine_rays(directions):
+    """returns a list of 64 bitboards of every square reachable on an empty board along any of the directions"""
+    return [sum(RAYS[direction][square] for direction in directions) for square in range(64)]
+
+
+RAYS = _build_rays()
+# directions whose square index goes up along the ray. the first piece along these rays is the lowest bit, and the
+# first piece along the other directions is the highest bit
+POSITIVE_DIRECTIONS = frozenset(direction for direction in KING_STEPS if direction[0] * 8 + direction[1] > 0)
+
+KNIGHT_ATTACKS = _build_step_attacks(KNIGHT_STEPS)
+KING_ATTACKS = _build_step_attacks(KING_STEPS)
+STRAIGHT_RAYS = _combine_rays(STRAIGHT_DIRECTIONS)
+DIAGONAL_RAYS = _combine_rays(DIAGONAL_DIRECTIONS)
+
+# the hunter and falcon move differently forward and backward, and forward is up the board for white and down for
+# black. a white hunter can go to FORWARD_STRAIGHT_RAYS["white"] or BACKWARD_DIAGONAL_RAYS["white"] of its square
+FORWARD_STRAIGHT_RAYS = {"white": RAYS[(-1, 0)], "black": RAYS[(1, 0)]}
+BACKWARD_STRAIGHT_RAYS = {"white": RAYS[(1, 0)], "black": RAYS[(-1, 0)]}
+FORWARD_DIAGONAL_RAYS = {"white": _combine_rays(((-1, -1), (-1, 1))), "black": _combine_rays(((1, -1), (1, 1)))}
+BACKWARD_DIAGONAL_RAYS = {"white": _combine_rays(((1, -1), (1, 1))), "black": _combine_rays(((-1, -1), (-1, 1)))}
+
+# the squares a pawn of each color can capture on from each square
+PAWN_CAPTURES = {"white": _build_step_attacks(((-1, -1), (-1, 1))), "black": _build_step_attacks(((1, -1), (1, 1)))}
+
+# the squares a pawn of each color can step to from each square, one or two rows forward
+PAWN_STEPS = {"white": _build_step_attacks(((-1, 0), (-2, 0))), "black": _build_step_attacks(((1, 0), (2, 0)))}
+
+# the squares every (color, piece name) could go to from each square on an empty board. a move to any other square
+# is never legal, whatever is on the board, so make_move_by_index says no to it without asking the piece. this has
+# to stay a superset of what the pieces allow (a pawn's double move is in it even after the pawn has moved), so a
+# move the piece would allow, or that clears a pawn's double move, is never turned away here
+REACHABLE_SQUARES = {}
+for _color in COLORS:
+    REACHABLE_SQUARES[(_color, "rook")] = STRAIGHT_RAYS
+    REACHABLE_SQUARES[(_color, "knight")] = KNIGHT_ATTACKS
+    REACHABLE_SQUARES[(_color, "bishop")] = DIAGONAL_RAYS
+    REACHABLE_SQUARES[(_color, "king")] = KING_ATTACKS
+    REACHABLE_SQUARES[(_color, "queen")] = [STRAIGHT_RAYS[square] | DIAGONAL_RAYS[square] for square in range(64)]
+    REACHABLE_SQUARES[(_color, "pawn")] = [PAWN_STEPS[_color][square] | PAWN_CAPTURES[_color][square]
+                                           for square in range(64)]
+    REACHABLE_SQUARES[(_color, "hunter")] = [FORWARD_STRAIGHT_RAYS[_color][square] |
+                                             BACKWARD_DIAGONAL_RAYS[_color][square] for square in range(64)]
+    REACHABLE_SQUARES[(_color, "falcon")] = [FORWARD_DIAGONAL_RAYS[_color][square] |
+                                             BACKWARD_STRAIGHT_RAYS[_color][square] for square in range(64)]
+
+# the home rank squares each color enters its fairy pieces on
+HOME_RANKS = {"white": 0xFF << 56, "black": 0xFF}
+
+# a player can enter their first fairy once they have at most MOST_MAJOR_PIECES_FOR_FIRST_FAIRY of these pieces left,
+# and their second one with at most MOST_MAJOR_PIECES_FOR_SECOND_FAIRY
+MAJOR_PIECE_NAMES = ("rook", "knight", "bishop", "queen")
+MOST_MAJOR_PIECES_FOR_FIRST_FAIRY = 6
+MOST_MAJOR_PIECES_FOR_SECOND_FAIRY = 5
+
+# one byte for every (color, piece name) when a position is packed into bytes: 1 to 8 for the white pieces and 255 to
+# 248 for the black pieces (-1 to -8 as a signed byte), in the order of PIECE_NAMES. an empty square is 0
+PIECE_CODES = {(color, piece_name): (number + 1 if color == "white" else 255 - number)
+               for color in COLORS for number, piece_name in enumerate(PIECE_NAMES)}
+PIECES_FROM_CODES = {code: color_and_name for color_and_name, code in PIECE_CODES.items()}
+# the place of every piece code in the 16 piece tracker bytes of a position: white first, then black
+TRACKER_INDEXES = {code: (0 if color == "white" else 8) + PIECE_NAMES.index(piece_name)
+                   for code, (color, piece_name) in PIECES_FROM_CODES.items()}
+
+# ChessVar.to_bytes packs a position into POSITION_BYTES bytes: the piece code of each of the 64 squares, 1 byte for
+# whose turn it is (0 for white, 1 for black), the bitboard of pawns that still have their double move as 8 bytes
+# (little endian), then the white and the black piece tracker amounts in the order of PIECE_NAMES
+TURN_BYTE = 64
+FIRST_MOVES_START = 65
+TRACKERS_START = 73
+POSITION_BYTES = 89
+
+# FEN text for a position: the pieces on ranks 8 to 1 separated by "/" (upper case for white, lower case for black, H
+# for the hunter, F for the falcon and a number for empty squares in a row), "w" or "b" for whose turn it is, the
+# letters of the fairy pieces that can still be entered ("-" for none), and the squares of the pawns whose double
+# move is not what their rank says ("-" for none): pawns off their starting rank that still have it, or pawns on
+# their starting rank that lost it. a fairy can be entered exactly when it is not on the board, so the fairy field
+# always has the letters of the fairies that are not on the board
+FEN_LETTERS = {"rook": "r", "knight": "n", "bishop": "b", "king": "k", "queen": "q", "pawn": "p", "hunter": "h",
+               "falcon": "f"}
+CODES_FROM_FEN_LETTERS = {}
+for (_color, _piece_name), _code in PIECE_CODES.items():
+    if _color == "white":
+        CODES_FROM_FEN_LETTERS[FEN_LETTERS[_piece_name].upper()] = _code
+    else:
+        CODES_FROM_FEN_LETTERS[FEN_LETTERS[_piece_name]] = _code
+FEN_LETTERS_FROM_CODES = {code: letter for letter, code in CODES_FROM_FEN_LETTERS.items()}
+FAIRY_LETTERS = "HFhf"
+# the rows of the starting rank of the white pawns (rank 2) and the black pawns (rank 7)
+PAWN_STARTING_ROWS = {CODES_FROM_FEN_LETTERS["P"]: 6, CODES_FROM_FEN_LETTERS["p"]: 1}
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w HFhf -"
+
+# why make_move or enter_fairy_piece said no to a move
+NOT_ON_BOARD = "NOT_ON_BOARD"                      # a square id is not on the board
+NO_PIECE = "NO_PIECE"                              # there is no piece on the start square
+NOT_YOUR_PIECE = "NOT_YOUR_PIECE"                  # the piece on the start square is the other player's
+OWN_PIECE_CAPTURE = "OWN_PIECE_CAPTURE"            # the end square has one of the player's own pieces
+ILLEGAL_PIECE_MOVE = "ILLEGAL_PIECE_MOVE"          # the piece can't move that way, or something is in the way
+GAME_OVER = "GAME_OVER"                            # a king has already been captured
+NOT_YOUR_FAIRY = "NOT_YOUR_FAIRY"                  # the fairy letter is the other player's
+NOT_HOME_RANK = "NOT_HOME_RANK"                    # fairies can only be entered on the player's home rank
+SQUARE_TAKEN = "SQUARE_TAKEN"                      # fairies can only be entered on an empty square
+TOO_MANY_MAJOR_PIECES = "TOO_MANY_MAJOR_PIECES"    # the player has not lost enough major pieces yet
+FAIRY_ALREADY_ENTERED = "FAIRY_ALREADY_ENTERED"    # that fairy has already been entered
+NOT_A_FAIRY = "NOT_A_FAIRY"                        # the letter is not one of the FAIRY_LETTERS
+REJECTION_REASONS = (NOT_ON_BOARD, NO_PIECE, NOT_YOUR_PIECE, OWN_PIECE_CAPTURE, ILLEGAL_PIECE_MOVE, GAME_OVER,
+                     NOT_YOUR_FAIRY, NOT_HOME_RANK, SQUARE_TAKEN, TOO_MANY_MAJOR_PIECES, FAIRY_ALREADY_ENTERED,
+                     NOT_A_FAIRY)
+# a small number for every reason, for sending over a network or between processes. 0 means the move was made.
+# new reasons go at the end so the numbers of the others never change
+REJECTION_CODES = {reason: code for code, reason in enumerate(REJECTION_REASONS, 1)}
+
+
+def fen_to_position_bytes(text):
+    """takes in FEN text and returns the same position as bytes made by ChessVar.to_bytes. raises a ValueError if the
+    text is not a position"""
+
+    fields = text.split()
+    if len(fields) != 4:
+        raise ValueError("FEN needs 4 fields (pieces, turn, fairies, double moves), not " + repr(text))
+    placement, turn, fairies, double_moves = fields
+
+    data = bytearray(POSITION_BYTES)
+    rows = placement.split("/")
+    if len(rows) != 8:
+        raise ValueError("FEN pieces need 8 ranks, not " + repr(placement))
+    for row_number, row in enumerate(rows):
+        index = row_number * 8
+        row_end = index + 8
+        for letter in row:
+            if letter in "12345678":
+                index += int(letter)
+            else:
+                code = CODES_FROM_FEN_LETTERS.get(letter)
+                if code is None or index >= row_end:
+                    raise ValueError("bad FEN rank " + repr(row))
+                data[index] = code
+                # the pieces counted in the trackers: white in the first 8 bytes, black in the next 8
+                if code < 128:
+                    data[TRACKERS_START + code - 1] += 1
+                else:
+                    data[TRACKERS_START + 8 + 255 - code] += 1
+                index += 1
+        if index != row_end:
+            raise ValueError("FEN rank " + repr(row) + " is not 8 squares")
+
+    if turn == "b":
+        data[TURN_BYTE] = 1
+    elif turn != "w":
+        raise ValueError("FEN turn has to be 'w' or 'b', not " + repr(turn))
+
+    if fairies != "-" and any(letter not in FAIRY_LETTERS for letter in fairies):
+        raise ValueError("FEN fairy field can only have the letters " + FAIRY_LETTERS + ", not " + repr(fairies))
+    for letter in FAIRY_LETTERS:
+        code = CODES_FROM_FEN_LETTERS[letter]
+        if code < 128:
+            on_board = data[TRACKERS_START + code - 1] != 0
+        else:
+            on_board = data[TRACKERS_START + 8 + 255 - code] != 0
+        if (letter in fairies) == on_board:
+            raise ValueError("FEN fairy field " + repr(fairies) + " does not match the pieces on the board")
+
+    first_moves = 0
+    for index in range(8, 56):
+        row = PAWN_STARTING_ROWS.get(data[index])
+        if row is not None and index >> 3 == row:
+            first_moves |= 1 << index
+    if double_moves != "-":
+        for square_id in double_moves.split(","):
+            index = SQUARE_INDEX.get(square_id)
+            if index is None or data[index] not in PAWN_STARTING_ROWS:
+                raise ValueError("FEN double move square " + repr(square_id) + " has no pawn")
+            first_moves ^= 1 << index
+    data[FIRST_MOVES_START:TRACKERS_START] = first_moves.to_bytes(8, "little")
+    return bytes(data)
+
+
+def is_fairy_entry(first):
+    """takes in the first item of a move tuple, like "e2" or "H", and returns True if the move enters a fairy piece
+    (with enter_fairy_piece) and False if it moves a piece (with make_move). only one of the FAIRY_LETTERS enters a
+    fairy, so something like "e" or "X" is a move from a square that is not on the board. every batch of moves
+    (BatchMoves, BoardArray, ShardedHost) and GameRecord.play_move decide this the same way here"""
+    return len(first) == 1 and first in FAIRY_LETTERS
+
+
+def check_position_bytes(data):
+    """takes in bytes and raises a ValueError if they are not a position ChessVar.to_bytes could have made: the
+    length, the turn byte and every piece code have to be right, both piece trackers have to count the pieces on the
+    board, each color can have at most one king, with at most one of the two kings captured, and only squares with a
+    pawn can have a double move"""
+
+    if len(data) != POSITION_BYTES or data[TURN_BYTE] > 1:
+        raise ValueError("not a ChessVar position of " + str(POSITION_BYTES) + " bytes")
+
+    counts = [0] * 16
+    pawn_squares = 0
+    for index, code in enumerate(data[:TURN_BYTE]):
+        if code != 0:
+            tracker_index = TRACKER_INDEXES.get(code)
+            if tracker_index is None:
+                raise ValueError("ChessVar position has the unknown piece code " + str(code))
+            counts[tracker_index] += 1
+            if code in PAWN_STARTING_ROWS:
+                pawn_squares |= 1 << index
+    if int.from_bytes(data[FIRST_MOVES_START:TRACKERS_START], "little") & ~pawn_squares:
+        raise ValueError("ChessVar position has a double move on a square without a pawn")
+    if bytes(counts) != bytes(data[TRACKERS_START:]):
+        raise ValueError("ChessVar position piece trackers do not match the pieces on the board")
+
+    white_kings = counts[TRACKER_INDEXES[PIECE_CODES[("white", "king")]]]
+    black_kings = counts[TRACKER_INDEXES[PIECE_CODES[("black", "king")]]]
+    if white_kings > 1 or black_kings > 1 or white_kings + black_kings == 0:
+        raise ValueError("ChessVar position needs at most one king of each color and at least one king")
+
+
+def position_bytes_to_fen(data):
+    """takes in bytes made by ChessVar.to_bytes and returns the same position as FEN text"""
+
+    ranks = []
+    for row_number in range(8):
+        rank = ""
+        empty_squares = 0
+        for code in data[row_number * 8:row_number * 8 + 8]:
+            if code == 0:
+                empty_squares += 1
+            else:
+                if empty_squares:
+                    rank += str(empty_squares)
+                    empty_squares = 0
+                rank += FEN_LETTERS_FROM_CODES[code]
+        if empty_squares:
+            rank += str(empty_squares)
+        ranks.append(rank)
+
+    fairies = ""
+    for letter in FAIRY_LETTERS:
+        code = CODES_FROM_FEN_LETTERS[letter]
+        if code not in data[:TURN_BYTE]:
+            fairies += letter
+
+    first_moves = int.from_bytes(data[FIRST_MOVES_START:TRACKERS_START], "little")
+    double_moves = []
+    for index in range(64):
+        row = PAWN_STARTING_ROWS.get(data[index])
+        if row is not None and (index >> 3 == row) != (first_moves >> index & 1 == 1):
+            double_moves.append(SQUARE_IDS[index])
+
+    return " ".join(("/".join(ranks), "b" if data[TURN_BYTE] == 1 else "w", fairies or "-",
+                     ",".join(double_moves) or "-"))
+
 
 class ChessVar:
     """The ChessVar object creates a Board. This will be the board that we will play a game of chess on. So the
-    ChessVar class interacts with both the Board and Piece class. The ChessVar object also have a game_state data
-    member, which starts off as “UNFINISHED” """
-
-    def __init__(self):
-        self._chess_board = Board()
-        self._game_state = "UNFINISHED"
+    ChessVar class interacts with both the Board and Piece class. The game state starts off as “UNFINISHED” and is
+    kept by the board, which updates it when a king is captured. Observers can be added to hear when the game state
+    changes instead of asking for it over and over, and event listeners to hear about every move (see
+    add_event_listener)"""
+
+    def __init__(self, engine="list", position=None):
+        """engine picks how the board is stored. "list" plays on a Board (a list of 8 lists) and "bitboard" plays on
+        a BitBoard. Both boards follow the exact same rules. position is bytes made by to_bytes to start the game
+        from instead of the starting position"""
+        set_up_pieces = position is None
+        if engine == "list":
+            self._chess_board = Board(set_up_pieces)
+        elif engine == "bitboard":
+            self._chess_board = BitBoard(set_up_pieces)
+        else:
+            raise ValueError("engine must be 'list' or 'bitboard', not " + repr(engine))
         self._current_player_turn = "white"
+        # functions called with (game, old game state, new game state) when the game state changes
+        self._game_state_observers = []
+        # functions called with (game, event) for everything make_move and enter_fairy_piece do
+        self._event_listeners = []
+        # why the last make_move or enter_fairy_piece said no, None if it was allowed
+        self._rejection_reason = None
+        # one record for every move done with make() that has not been taken back with unmake() yet
+        self._undo_stack = []
+        if position is not None:
+            self.set_position_from_bytes(position)
 
     def get_chess_board(self):
         """returns the board that this current game of chess is using"""
         return self._chess_board
 
+    def legal_moves(self):
+        """returns a list of every move the current player could make right now. a move is either a tuple of two
+        square ids like ("e2", "e4") that make_move would accept, or a tuple of a fairy letter and a square id like
+        ("H", "c1") that enter_fairy_piece would accept. returns an empty list once the game is finished"""
+        return self._chess_board.generate_moves(self._current_player_turn)
+
+    def perft(self, depth):
+        """counts every position reached by playing every sequence of legal moves (including fairy entries) that is
+        depth moves long. the counts are used to check that move generation does not change and to time it"""
+
+        if depth == 0:
+            return 1
+        moves = self.legal_moves()
+        if depth == 1:
+            return len(moves)
+
+        nodes = 0
+        for move in moves:
+            self.make(move)
+            nodes += self.perft(depth - 1)
+            self.unmake()
+        return nodes
+
     def get_game_state(self):
         """Takes in no parameters and returns “UNFINISHED”, “WHITE_WON”, or “BLACK_WON”"""
-
-        #if white have no king, black wins
-        if self._chess_board.has_no_king_on_board("white"):
-            return "BLACK_WON"
-        # if black have no king, white wins
-        elif self._chess_board.has_no_king_on_board("black"):
-            return "WHITE_WON"
-        else:
-            return "UNFINISHED"
+        return self._chess_board.get_game_state()
+
+    def get_rejection_reason(self):
+        """returns why the last make_move or enter_fairy_piece returned False (one of REJECTION_REASONS), or None if
+        it returned True. the reason is found by the same checks that decide the move, so it costs nothing extra"""
+        return self._rejection_reason
+
+    def make_move_with_result(self, start_id, end_id):
+        """same as make_move but returns a MoveResult that says why the move was not allowed"""
+        self.make_move(start_id, end_id)
+        return MOVE_RESULTS[self._rejection_reason]
+
+    def enter_fairy_piece_with_result(self, letter, start_id):
+        """same as enter_fairy_piece but returns a MoveResult that says why the fairy could not be entered"""
+        self.enter_fairy_piece(letter, start_id)
+        return MOVE_RESULTS[self._rejection_reason]
+
+    def add_game_state_observer(self, observer):
+        """takes in a function that is called with (game, old game state, new game state) every time make_move or
+        a new position changes the game state. moves tried out with make() and unmake() are not told to observers"""
+        self._game_state_observers.append(observer)
+
+    def remove_game_state_observer(self, observer):
+        """stops calling a function added with add_game_state_observer"""
+        self._game_state_observers.remove(observer)
+
+    def add_event_listener(self, listener):
+        """takes in a function that is called with (game, event) for everything make_move and enter_fairy_piece do.
+        an event is a dict with a "type" and:
+
+            "MOVE"          "color", "piece" (its name) and "move" (start_id, end_id) of a move that was made
+            "FAIRY_ENTRY"   "color", "piece" and "move" (letter, square_id) of a fairy that was entered
+            "CAPTURE"       "color", "piece" and "square" of the piece that came off the piece tracker
+            "GAME_END"      "game_state" after a king was captured
+            "REJECTED"      "color", "move" and "reason" (one of REJECTION_REASONS) of a move that was not allowed
+
+        a move that captures gives a "MOVE", then a "CAPTURE", then a "GAME_END" if it was a king. moves tried out with
+        make() and unmake() are not told to listeners. nothing is made when there are no listeners"""
+        self._event_listeners.append(listener)
+
+    def remove_event_listener(self, listener):
+        """stops calling a function added with add_event_listener"""
+        self._event_listeners.remove(listener)
+
+    def tell_event_listeners(self, event):
+        """calls every event listener with the event"""
+        for listener in list(self._event_listeners):
+            listener(self, event)
+
+    def tell_game_state_observers(self, old_game_state):
+        """calls every game state observer if the game state is not old_game_state anymore"""
+        new_game_state = self._chess_board.get_game_state()
+        if new_game_state != old_game_state:
+            for observer in list(self._game_state_observers):
+                observer(self, old_game_state, new_game_state)
 
     def get_current_player_turn(self):
         """returns the current player"""
         return self._current_player_turn
 
+    def get_zobrist_hash(self):
+        """returns the 64 bit zobrist hash of the current position, including whose turn it is"""
+        return self._chess_board.get_zobrist_hash()
+
+    def to_bytes(self):
+        """returns the position (the pieces, whose turn it is, the pawn double moves and both piece trackers) packed
+        into POSITION_BYTES bytes. from_bytes turns them back into a game"""
+
+        a_board = self._chess_board
+        data = bytearray(POSITION_BYTES)
+        data[:TURN_BYTE] = a_board.get_piece_codes()
+        if self._current_player_turn == "black":
+            data[TURN_BYTE] = 1
+        data[FIRST_MOVES_START:TRACKERS_START] = a_board.get_first_moves().to_bytes(8, "little")
+        data[TRACKERS_START:] = a_board.get_tracker_codes()
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data, engine="list"):
+        """takes in bytes made by to_bytes and returns a new game at that position, using the engine for its board.
+        raises a ValueError if the bytes are not a position. moves done with make() before to_bytes can't be taken
+        back in the new game"""
+        return cls(engine, data)
+
+    def set_position_from_bytes(self, data):
+        """takes in bytes made by to_bytes and sets this game to that position. raises a ValueError if the bytes are
+        not a position (see check_position_bytes), leaving the game as it was. the moves done with make() are
+        forgotten"""
+
+        check_position_bytes(data)
+
+        a_board = self._chess_board
+        old_game_state = a_board.get_game_state()
+        a_board.set_piece_codes(data[:TURN_BYTE])
+        a_board.set_first_moves(int.from_bytes(data[FIRST_MOVES_START:TRACKERS_START], "little"))
+        a_board.set_tracker_codes(data[TRACKERS_START:])
+        if (data[TURN_BYTE] == 1) != (self._current_player_turn == "black"):
+            self.switch_player_turn()
+        self._undo_stack = []
+        if self._game_state_observers:
+            self.tell_game_state_observers(old_game_state)
+
+    def to_fen(self):
+        """returns the position as FEN text (see FEN_LETTERS). from_fen turns it back into a game"""
+        return position_bytes_to_fen(self.to_bytes())
+
+    @classmethod
+    def from_fen(cls, text, engine="list"):
+        """takes in FEN text and returns a new game at that position, using the engine for its board. raises a
+        ValueError if the text is not a position"""
+        return cls(engine, fen_to_position_bytes(text))
+
+    def set_position_from_fen(self, text):
+        """takes in FEN text and sets this game to that position. raises a ValueError if the text is not a
+        position"""
+        self.set_position_from_bytes(fen_to_position_bytes(text))
+
     def switch_player_turn(self):
         """switches to the other player"""
         if self._current_player_turn == "white":
             self._current_player_turn = "black"
         elif self._current_player_turn == "black":
             self._current_player_turn = "white"
+        self._chess_board.toggle_zobrist_side_to_move()
 
     def make_move(self, start_id, end_id):
         """Takes in 2 strings are parameters representing locations on the board a piece is coming from and going
@@ -52,54 +543,149 @@ class ChessVar:
         legal, or the game has already been won. Else, capture the piece at the moved_to square if applicable,
         move the current piece, update the game_state if necessary, update whose turn it is, and return true. """
 
-        result = False
-
         a_board = self._chess_board
 
+        # turn the square ids into square indexes once, everything after this only uses the indexes.
         # if the start_id or end_id are not even square ids that exist on the board, return false, no need to continue
-        if a_board.is_id_within_board_bounds(start_id) is False or a_board.is_id_within_board_bounds(end_id) is False:
+        start = a_board.get_index_from_id(start_id)
+        end = a_board.get_index_from_id(end_id)
+        if start is None or end is None:
+            self._rejection_reason = NOT_ON_BOARD
+            if self._event_listeners:
+                self.tell_event_listeners({"type": "REJECTED", "color": self._current_player_turn,
+                                           "move": (start_id, end_id), "reason": NOT_ON_BOARD})
             return False
 
+        return self.make_move_by_index(start, end)
+
+    def make_move_by_index(self, start, end):
+        """same as make_move but takes in 2 square indexes (0 is "a8" and 63 is "h1") that are already on the
+        board"""
+
+        result = False
+        reason = None
+
+        a_board = self._chess_board
 
-        start_id_piece = a_board.get_Piece_from_squareID(start_id)
+        start_id_piece = a_board.get_piece_at_index(start)
         if start_id_piece is not None:
             color_of_start_id_piece = start_id_piece.get_color()
 
-        end_id_piece = a_board.get_Piece_from_squareID(end_id)
+        end_id_piece = a_board.get_piece_at_index(end)
         if end_id_piece is not None:
             color_of_end_id_piece = end_id_piece.get_color()
 
         current_color_turn = self.get_current_player_turn()
         if start_id_piece is None:
-            result = False
+            reason = NO_PIECE
 
         # if the start_id contains a color that doesn't match the color of the player whose turn it is
             # return false (can't move a piece that's not urs)
         elif color_of_start_id_piece != current_color_turn:
-            result = False
+            reason = NOT_YOUR_PIECE
         # if the end_id contains a color that is the same as the color of the player whose turn it is
             # return false (not allowed to capture ur own piece)
         elif end_id_piece is not None and color_of_end_id_piece == current_color_turn:
-            result = False
+            reason = OWN_PIECE_CAPTURE
         # if the move is not legal (call the piece's move function if it returns false..)
             #return false
-        elif start_id_piece.make_move(start_id, end_id, a_board) is False:
-            result = False
+        # the piece can't get to the end square even on an empty board, so don't ask it
+        elif not start_id_piece.can_reach_by_index(start, end):
+            reason = ILLEGAL_PIECE_MOVE
+        elif start_id_piece.make_move_by_index(start, end, a_board) is False:
+            reason = ILLEGAL_PIECE_MOVE
         # if the game has already been won
             # return false
         elif self.get_game_state() != "UNFINISHED":
-            result = False
+            reason = GAME_OVER
         else:
             # move the current piece from start_id to the end_id
             # update the game start if necessary (get_game_state)
             # this function also updates the tracker if a piece was captured
-            a_board.set_piece_at_square(start_id, end_id)
+            a_board.set_piece_at_square_by_index(start, end)
              # update whose turn it is
             self.switch_player_turn()
             result = True
+            if self._game_state_observers:
+                self.tell_game_state_observers("UNFINISHED")
+
+        self._rejection_reason = reason
+        if self._event_listeners:
+            self.tell_move_events(start, end, current_color_turn, start_id_piece, end_id_piece, reason)
 
         return result
 
+    def tell_move_events(self, start, end, color, moving_piece, captured_piece, reason):
+        """tells the event listeners about a move make_move_by_index made (reason is None) or said no to"""
+
+        move = (SQUARE_IDS[start], SQUARE_IDS[end])
+        if reason is not None:
+            self.tell_event_listeners({"type": "REJECTED", "color": color, "move": move, "reason": reason})
+            return
+
+        self.tell_event_listeners({"type": "MOVE", "color": color, "piece": moving_piece.get_name(), "move": move})
+        if captured_piece is not None:
+            self.tell_event_listeners({"type": "CAPTURE", "color": captured_piece.get_color(),
+                                       "piece": captured_piece.get_name(), "square": move[1]})
+            if self.get_game_state() != "UNFINISHED":
+                self.tell_event_listeners({"type": "GAME_END", "game_state": self.get_game_state()})
+
+    def make(self, move):
+        """plays a move from legal_moves() without checking it again and remembers what it changed so unmake() can
+        take it back. the move is either (start_id, end_id) or (letter, square_id) for a fairy entry. this is
+        meant for trying out moves, so only pass in moves that legal_moves() returned for this position"""
+
+        a_board = self._chess_board
+        first, end_id = move
+        end = SQUARE_INDEX[end_id]
+        color = self._current_player_turn
+
+        if len(first) == 1:
+            # entering a fairy piece, add it to the tracker and put it on the square
+            if first == "H" or first == "h":
+                name_of_piece = "hunter"
+            else:
+                name_of_piece = "falcon"
+            a_board.add_fairy_piece_tracker(color, first)
+            a_board.place_piece_at_index(end, PIECES[(color, name_of_piece)])
+            self._undo_stack.append((move, None, None))
+        else:
+            start = SQUARE_INDEX[first]
+            moving_piece = a_board.get_piece_at_index(start)
+            captured_piece = a_board.get_piece_at_index(end)
+            # the pawn double moves of the moving and the captured piece can change, so remember all of them
+            first_moves = a_board.get_first_moves()
+
+            # a pawn loses its double move the first time it moves without capturing
+            if moving_piece.get_name() == "pawn" and captured_piece is None:
+                a_board.set_is_first_move_at_index(start, False)
+
+            # this also takes the captured piece off the tracker
+            a_board.set_piece_at_square_by_index(start, end)
+            self._undo_stack.append((move, captured_piece, first_moves))
+
+        self.switch_player_turn()
+
+    def unmake(self):
+        """takes back the last move done with make(). the board, the piece trackers, the pawn's first move and whose
+        turn it is all go back to what they were before that move"""
+
+        a_board = self._chess_board
+        move, captured_piece, first_moves = self._undo_stack.pop()
+        first, end_id = move
+        end = SQUARE_INDEX[end_id]
+        self.switch_player_turn()
+
+        if len(first) == 1:
+            # take the fairy back off the board and the tracker
+            fairy_piece = a_board.remove_piece_at_index(end)
+            a_board.remove_piece_from_tracker(fairy_piece.get_color(), fairy_piece.get_name())
+        else:
+            # this also puts the captured piece back on the tracker
+            a_board.unset_piece_at_square_by_index(SQUARE_INDEX[first], end, captured_piece)
+            # give the pawns their double moves back
+            a_board.set_first_moves(first_moves)
+
     def is_mismatched_for_fairy_piece(self, color, letter):
         """black gets their hunter/falcon using lower case letter h and f. white gets their hunter/falcon using
         upper case letters H and F. If black uses upper case or white uses lower case letters, then
@@ -119,17 +705,29 @@ class ChessVar:
         possible, update whose turn it is, and return True. Else return false. """
         #white falcon 'F', white hunter 'H', black falcon 'f', black hunter 'h'
 
-        a_board = self._chess_board
-        result = False
-
+        # turn the square id into a square index once.
         # if the start_id is not even square ids that exist on the board, return false, no need to continue
-        if a_board.is_id_within_board_bounds(start_id) is False:
+        start = self._chess_board.get_index_from_id(start_id)
+        if start is None:
+            self._rejection_reason = NOT_ON_BOARD
+            if self._event_listeners:
+                self.tell_event_listeners({"type": "REJECTED", "color": self._current_player_turn,
+                                           "move": (letter, start_id), "reason": NOT_ON_BOARD})
             return False
 
+        return self.enter_fairy_piece_by_index(letter, start)
+
+    def enter_fairy_piece_by_index(self, letter, start):
+        """same as enter_fairy_piece but takes in a square index (0 is "a8" and 63 is "h1") that is already on the
+        board"""
+
+        a_board = self._chess_board
+        result = False
+        reason = None
+
         current_color_turn = self.get_current_player_turn()
-        row_of_start_id = a_board.get_row_from_id(start_id)
-        col_of_start_id = a_board.get_col_from_id(start_id)
-        start_id_piece = a_board.get_Piece_from_squareID(start_id)
+        row_of_start_id = start >> 3
+        start_id_piece = a_board.get_piece_at_index(start)
         name_of_piece = ""
 
         if letter == "H" or letter == "h":
@@ -139,56 +737,109 @@ class ChessVar:
         else:
             result = False
 
+        # if the letter is not a fairy letter at all, return false ("" and "HF" are in FAIRY_LETTERS as text, so
+        # the length is checked too)
+        if len(letter) != 1 or letter not in FAIRY_LETTERS:
+            reason = NOT_A_FAIRY
         # if the game is finished, return false
-        if self.get_game_state() != "UNFINISHED":
-            result = False
+        elif self.get_game_state() != "UNFINISHED":
+            reason = GAME_OVER
         # if we are trying to create a fairy piece that doesn't align with the current player's color, return false
         elif self.is_mismatched_for_fairy_piece(current_color_turn, letter):
-            result = False
+            reason = NOT_YOUR_FAIRY
         # if the start_id is not at the home ranks, return false:
              #   if current color turn = white, row of start_id should be 1 [7]
             #  if current color turn = black, row of start_id should be 8 [0]
         elif current_color_turn == "black" and row_of_start_id != 0:
-            result = False
+            reason = NOT_HOME_RANK
         elif current_color_turn == "white" and row_of_start_id != 7:
-            result = False
+            reason = NOT_HOME_RANK
         #if start_id is not empty, return false
         elif start_id_piece is not None:
-            result = False
+            reason = SQUARE_TAKEN
         else:
             # add fairy piece will return false if we are trying to add a fairy that is already there
             # if we are trying to enter our first piece, and qualified to do so, and havent added that piece
             # already, then add that piece to the tracker and the board
             if a_board.has_no_fairy_on_board(current_color_turn):
-                if a_board.get_current_num_major_pieces(current_color_turn) <= 6:
-                    if a_board.add_fairy_piece_tracker(current_color_turn, letter):
-                        # add actual piece to the board
-                        virtual_board = a_board.get_board()
-                        virtual_board[row_of_start_id][col_of_start_id] = Fairy(current_color_turn, name_of_piece)
-                        result = True
+                max_major_pieces = MOST_MAJOR_PIECES_FOR_FIRST_FAIRY
             else: # we have at least 1 fairy on the board
-                if a_board.get_current_num_major_pieces(current_color_turn) <= 5:
-                    if a_board.add_fairy_piece_tracker(current_color_turn, letter):
-                        # add the actual piece to the board
-                        virtual_board = a_board.get_board()
-                        virtual_board[row_of_start_id][col_of_start_id] = Fairy(current_color_turn, name_of_piece)
-                        result = True
+                max_major_pieces = MOST_MAJOR_PIECES_FOR_SECOND_FAIRY
+            if a_board.get_current_num_major_pieces(current_color_turn) > max_major_pieces:
+                reason = TOO_MANY_MAJOR_PIECES
+            elif a_board.add_fairy_piece_tracker(current_color_turn, letter):
+                # add actual piece to the board
+                a_board.place_piece_at_index(start, PIECES[(current_color_turn, name_of_piece)])
+                result = True
+            else:
+                reason = FAIRY_ALREADY_ENTERED
 
         # update whose turn it is after a successful entering of a fairy piece
         if result is True:
             self.switch_player_turn()
 
+        self._rejection_reason = reason
+        if self._event_listeners:
+            move = (letter, SQUARE_IDS[start])
+            if result is True:
+                self.tell_event_listeners({"type": "FAIRY_ENTRY", "color": current_color_turn,
+                                           "piece": name_of_piece, "move": move})
+            else:
+                self.tell_event_listeners({"type": "REJECTED", "color": current_color_turn, "move": move,
+                                           "reason": reason})
+
         return result
 
 
+class MoveResult:
+    """A MoveResult object says if a move was made and, if it was not, why (one of REJECTION_REASONS). It is True
+    if the move was made and False if it was not, so it can be used like the True or False of make_move. There is
+    one MoveResult for every reason (see MOVE_RESULTS below), so getting one makes nothing new"""
+
+    __slots__ = ("_reason",)
+
+    def __init__(self, reason):
+        self._reason = reason
+
+    def is_allowed(self):
+        """returns True if the move was made"""
+        return self._reason is None
+
+    def get_reason(self):
+        """returns why the move was not allowed, or None if it was made"""
+        return self._reason
+
+    def get_code(self):
+        """returns the REJECTION_CODES number of the reason, or 0 if the move was made"""
+        if self._reason is None:
+            return 0
+        return REJECTION_CODES[self._reason]
+
+    def __bool__(self):
+        return self._reason is None
+
+    def __repr__(self):
+        return "MoveResult(" + repr(self._reason) + ")"
+
+
+# the one MoveResult of every reason, and of None for a move that was made
+MOVE_RESULTS = {reason: MoveResult(reason) for reason in (None,) + REJECTION_REASONS}
+MOVE_RESULTS_FROM_CODES = {result.get_code(): result for result in MOVE_RESULTS.values()}
+
+
 class Piece:
     """A piece object represents a chess piece. They have a location (either a string representing a number on the
     board or None representing the piece being off the board), a color (either black or white), and a name
-    (ex. “Knight”, “Pawn”)"""
+    (ex. “Knight”, “Pawn”). A piece never changes, so every board shares the same piece object for each color and
+    name (see PIECES below) and anything that changes during a game, like a pawn's double move, is kept by the
+    board"""
+
+    __slots__ = ("_color", "_name", "_reachable_squares")
 
     def __init__(self, color, name):
         self._color = color
         self._name = name
+        self._reachable_squares = REACHABLE_SQUARES[(color, name)]
 
     def get_color(self):
         """returns the color of the piece, either black or white"""
@@ -198,240 +849,180 @@ class Piece:
         """returns the name of the piece, ex. 'Rook' """
         return self._name
 
-    def make_move(self, start, end, board):
-        """will be modified by each child of Piece, so that each piece has their unique move"""
-        pass
+    def can_reach_by_index(self, start, end):
+        """takes in 2 square indexes and returns False if this piece could not move from start to end even on an
+        empty board (see REACHABLE_SQUARES), without looking at the board"""
+        return self._reachable_squares[start] >> end & 1 == 1
+
+    def make_move(self, start_id, end_id, a_board):
+        """takes in 2 location parameters as strings and returns True if this piece can move from the start_id to
+        the end_id. the ids are turned into square indexes once and checked by make_move_by_index"""
+        return self.make_move_by_index(a_board.get_index_from_id(start_id), a_board.get_index_from_id(end_id), a_board)
+
+    def make_move_by_index(self, start, end, a_board):
+        """will be modified by each child of Piece, so that each piece has their unique move. takes in 2 square
+        indexes (0 is "a8" and 63 is "h1")"""
+        return False
 
 
 class Pawn(Piece):
     """A type of chess piece"""
 
+    __slots__ = ()
+
     def __init__(self, color, name):
         super().__init__(color, name)
-        self._is_first_move = True
-
-    def set_is_first_move_to_false(self):
-        self._is_first_move = False
 
-    def make_move(self, start_id, end_id, a_board):
-        """takes in 2 location parameters as strings and if the end location is valid,
+    def make_move_by_index(self, start, end, a_board):
+        """takes in 2 square indexes and if the end location is valid,
         the Pawn will move according to its abilities in chess and return True. Else return False."""
 
         result = False
-        piece_at_end_id = a_board.get_Piece_from_squareID(end_id)
+        piece_at_end = a_board.get_piece_at_index(end)
         color_of_piece = self.get_color()
 
-        if piece_at_end_id is not None:
-            if self.pawn_capture_valid(color_of_piece, start_id, end_id, a_board):
+        if piece_at_end is not None:
+            if self.pawn_capture_valid_by_index(color_of_piece, start, end):
                 result = True
-        else: #else there is not a piece at the end_id, so we must be trying to move
-            if self._is_first_move:
+        else: #else there is not a piece at the end, so we must be trying to move
+            if a_board.is_first_move_at_index(start):
                 #if we can move double or single correctly, then set to true and set is_first_move to false
-                if self.pawn_double_move_valid(color_of_piece, start_id, end_id, a_board) or self.pawn_move_valid(color_of_piece, start_id, end_id, a_board):
+                if self.pawn_double_move_valid_by_index(color_of_piece, start, end) or self.pawn_move_valid_by_index(color_of_piece, start, end):
                     result = True
-                    self.set_is_first_move_to_false()
+                    a_board.set_is_first_move_at_index(start, False)
             else:
                 #it's not the first move for this pawn
-                if self.pawn_move_valid(color_of_piece, start_id, end_id, a_board):
+                if self.pawn_move_valid_by_index(color_of_piece, start, end):
                     result = True
         return result
 
-
     def pawn_double_move_valid(self, color_of_piece, start_id, end_id, a_board):
         """the pawn double move is valid if the end id is 2 rows down from black pieces and 2 rows up
         from white pieces. Else return false """
+        return self.pawn_double_move_valid_by_index(color_of_piece, a_board.get_index_from_id(start_id),
+                                                    a_board.get_index_from_id(end_id))
 
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
+    def pawn_double_move_valid_by_index(self, color_of_piece, start, end):
+        """same as pawn_double_move_valid with square indexes. 2 rows up is 16 squares back and 2 rows down is 16
+        squares on"""
 
         if color_of_piece == "black":
-            if row_difference == 2 and col_difference == 0:
-                result = True
-
-        if color_of_piece == "white":
-            if row_difference == -2 and col_difference == 0:
-                result = True
-
-        return result
+            return end - start == 16
+        return end - start == -16
 
     def pawn_move_valid(self, color_of_piece, start_id, end_id, a_board):
         """the pawn regular (single) move is valid if the end id is 1 row down from black pieces and 1 row up
         from white pieces. Else return false """
+        return self.pawn_move_valid_by_index(color_of_piece, a_board.get_index_from_id(start_id),
+                                             a_board.get_index_from_id(end_id))
 
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
+    def pawn_move_valid_by_index(self, color_of_piece, start, end):
+        """same as pawn_move_valid with square indexes. 1 row up is 8 squares back and 1 row down is 8 squares on"""
 
         if color_of_piece == "black":
-            if row_difference == 1 and col_difference == 0:
-                result = True
-
-        if color_of_piece == "white":
-            if row_difference == -1 and col_difference == 0:
-                result = True
-
-        return result
-
+            return end - start == 8
+        return end - start == -8
 
     def pawn_capture_valid(self, color_of_piece, start_id, end_id, a_board):
         """if the pawn is black and trying to capture a piece, then it can move diagonally down left
         or diagonally down right. if the pawn is white and trying to capture a piece, then it can move
         diagonally up left or up right. in both cases return true. else the end_id isn't valid so return false."""
+        return self.pawn_capture_valid_by_index(color_of_piece, a_board.get_index_from_id(start_id),
+                                                a_board.get_index_from_id(end_id))
 
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
-
-        if color_of_piece == "black":
-            if row_difference == 1 and col_difference == -1:
-                result = True
-            elif row_difference == 1 and col_difference == 1:
-                result = True
-
-        if color_of_piece == "white":
-            if row_difference == -1 and col_difference == -1:
-                result = True
-            elif row_difference == -1 and col_difference == 1:
-                result = True
-
-        return result
+    def pawn_capture_valid_by_index(self, color_of_piece, start, end):
+        """same as pawn_capture_valid with square indexes, using the pawn capture table"""
+        return PAWN_CAPTURES[color_of_piece][start] >> end & 1 == 1
 
 
 class Rook(Piece):
     "A type of chess piece"
 
+    __slots__ = ()
+
     def __init__(self, color, name):
         super().__init__(color, name)
 
-    def make_move(self, start_id, end_id, a_board):
-        """takes in 2 location parameters as strings and if the end location is valid,
+    def make_move_by_index(self, start, end, a_board):
+        """takes in 2 square indexes and if the end location is valid,
         the Rook will move according to its abilities in chess and return True. Rooks can move
         left, right, up, or down as long as there are no pieces in its path (not including if there is a
         piece at the end square). Else return False."""
-
-        result = False
-        if a_board.is_up_down_left_right_valid(start_id, end_id):
-            result = True
-
-        return result
+        return a_board.is_up_down_left_right_valid_by_index(start, end)
 
 class Knight(Piece):
     "A type of chess piece"
 
+    __slots__ = ()
+
     def __init__(self ,color, name):
         super().__init__(color, name)
 
-    def make_move(self, start_id, end_id, a_board):
-        """takes in 2 location parameters as strings and if the end location is valid,
+    def make_move_by_index(self, start, end, a_board):
+        """takes in 2 square indexes and if the end location is valid,
         the Knight will move according to its abilities in chess and return True. Else return False."""
 
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-
-        if row_col_difference == [-2, 1]:
-            result = True
-        elif row_col_difference == [-2, -1]:
-            result = True
-        elif row_col_difference == [2, 1]:
-            result = True
-        elif row_col_difference == [2, -1]:
-            result = True
-        elif row_col_difference == [-1, 2]:
-            result = True
-        elif row_col_difference == [1, 2]:
-            result = True
-        elif row_col_difference == [-1, -2]:
-            result = True
-        elif row_col_difference == [1, -2]:
-            result = True
-
-        return result
+        # a knight can jump to any square in its attack table, no matter what is in between
+        return KNIGHT_ATTACKS[start] >> end & 1 == 1
 
 
 
 class Bishop(Piece):
     "A type of chess piece"
 
+    __slots__ = ()
+
     def __init__(self, color, name):
         super().__init__(color, name)
 
-    def make_move(self, start_id, end_id, a_board):
-        """takes in 2 location parameters as strings and if the end location is valid,
+    def make_move_by_index(self, start, end, a_board):
+        """takes in 2 square indexes and if the end location is valid,
         the bishop will move according to its abilities in chess and return True. bishops can move diagonally
         up left, up right, down left, or down right as long as there are no pieces in its path
          (not including if there is a piece at the end square). Else return False."""
-
-        result = False
-        if a_board.is_diag_up_down_left_right_valid(start_id, end_id):
-            result = True
-
-        return result
+        return a_board.is_diag_up_down_left_right_valid_by_index(start, end)
 
 class Queen(Piece):
     "A type of chess piece."
 
+    __slots__ = ()
+
     def __init__(self, color, name):
         super().__init__(color, name)
 
-    def make_move(self, start_id, end_id, a_board):
-        """takes in 2 location parameters as strings and if the end location is valid,
+    def make_move_by_index(self, start, end, a_board):
+        """takes in 2 square indexes and if the end location is valid,
         the Queen will move according to its abilities in chess and return True. Else return False."""
 
-        result = False
-        #if the queen can move like a rook
-        if a_board.is_up_down_left_right_valid(start_id, end_id):
-            result = True
-        #if the queen can move like a bishop
-        elif a_board.is_diag_up_down_left_right_valid(start_id, end_id):
-            result = True
-
-        return result
+        #if the queen can move like a rook or like a bishop
+        return (a_board.is_up_down_left_right_valid_by_index(start, end)
+                or a_board.is_diag_up_down_left_right_valid_by_index(start, end))
 
 class King(Piece):
     "A type of chess piece"
 
+    __slots__ = ()
+
     def __init__(self, color, name):
         super().__init__(color, name)
 
-    # idk
-    def make_move(self, start_id, end_id, a_board):
-        """takes in 2 location parameters as strings and if the end location is valid,
+    def make_move_by_index(self, start, end, a_board):
+        """takes in 2 square indexes and if the end location is valid,
         the King will move according to its abilities in chess and return True. Else return False."""
 
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-
-        if row_col_difference == [-1, 0]:
-            result = True
-        elif row_col_difference == [-1, -1]:
-            result = True
-        elif row_col_difference == [0, -1]:
-            result = True
-        elif row_col_difference == [1, -1]:
-            result = True
-        elif row_col_difference == [1, 0]:
-            result = True
-        elif row_col_difference == [1, 1]:
-            result = True
-        elif row_col_difference == [0, 1]:
-            result = True
-        elif row_col_difference == [-1, 1]:
-            result = True
-
-        return result
+        # a king can step to any of the up to 8 squares around it in its attack table
+        return KING_ATTACKS[start] >> end & 1 == 1
 
 class Fairy(Piece):
     "A type of chess piece"
 
+    __slots__ = ()
+
     def __init__(self, color, name):
         super().__init__(color, name)
 
-    def make_move(self, start_id, end_id, a_board):
-        """takes in 2 location parameters as strings and if the end location is valid,
+    def make_move_by_index(self, start, end, a_board):
+        """takes in 2 square indexes and if the end location is valid,
         the Fairy will move according to its abilities in chess and return True. Else return False."""
 
         result = False
@@ -440,112 +1031,111 @@ class Fairy(Piece):
 
         if fairy_color == "black":
             if fairy_name == "hunter":
-                if self.black_hunter_move_valid(start_id, end_id, a_board):
-                    result = True
+                result = self.black_hunter_move_valid_by_index(start, end, a_board)
             elif fairy_name == "falcon":
-                if self.black_falcon_move_valid(start_id, end_id, a_board):
-                    result = True
+                result = self.black_falcon_move_valid_by_index(start, end, a_board)
         elif fairy_color == "white":
             if fairy_name == "hunter":
-                if self.white_hunter_move_valid(start_id, end_id, a_board):
-                    result = True
+                result = self.white_hunter_move_valid_by_index(start, end, a_board)
             elif fairy_name == "falcon":
-                if self.white_falcon_move_valid(start_id, end_id, a_board):
-                    result = True
+                result = self.white_falcon_move_valid_by_index(start, end, a_board)
 
         return result
 
     def black_hunter_move_valid(self, start_id, end_id, a_board):
         """takes in a start_id and end_id as strings and a board object. returns true if the black hunter
         moves according to its rules. else return false"""
+        return self.black_hunter_move_valid_by_index(a_board.get_index_from_id(start_id),
+                                                     a_board.get_index_from_id(end_id), a_board)
 
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-
-        # if black hunter is moving forward/down board, we need to check if its properly moving like a rook
-        if a_board.is_going_down(start_id, end_id):
-            if a_board.is_up_down_left_right_valid(start_id, end_id):
-                result = True
-        #if black hunter is moving backwards/up board, we need to check if its properly moving like a bishop
-        elif a_board.is_going_up(start_id, end_id):
-            if a_board.is_diag_up_down_left_right_valid(start_id, end_id):
-                result = True
+    def black_hunter_move_valid_by_index(self, start, end, a_board):
+        """same as black_hunter_move_valid with square indexes"""
 
-        return result
+        # a black hunter moves forward/down the board like a rook and backwards/up the board like a bishop
+        reachable = FORWARD_STRAIGHT_RAYS["black"][start] | BACKWARD_DIAGONAL_RAYS["black"][start]
+        return reachable >> end & 1 == 1 and a_board.is_path_between_clear(start, end)
 
     def black_falcon_move_valid(self, start_id, end_id, a_board):
         """takes in a start_id and end_id as strings and a board object. returns true if the black falcon
                 moves according to its rules. else return false"""
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
+        return self.black_falcon_move_valid_by_index(a_board.get_index_from_id(start_id),
+                                                     a_board.get_index_from_id(end_id), a_board)
 
-        # if black falcon is moving forward/down board, we need to check if its properly moving like a bishop
-        if a_board.is_going_down(start_id, end_id):
-            if a_board.is_diag_up_down_left_right_valid(start_id, end_id):
-                result = True
-        #if black hunter is moving backwards/up board, we need to check if its properly moving like a rook
-        elif a_board.is_going_up(start_id, end_id):
-            if a_board.is_up_down_left_right_valid(start_id, end_id):
-                result = True
+    def black_falcon_move_valid_by_index(self, start, end, a_board):
+        """same as black_falcon_move_valid with square indexes"""
 
-        return result
+        # a black falcon moves forward/down the board like a bishop and backwards/up the board like a rook
+        reachable = FORWARD_DIAGONAL_RAYS["black"][start] | BACKWARD_STRAIGHT_RAYS["black"][start]
+        return reachable >> end & 1 == 1 and a_board.is_path_between_clear(start, end)
 
     def white_hunter_move_valid(self, start_id, end_id, a_board):
         """takes in a start_id and end_id as strings and a board object. returns true if the white hunter
                 moves according to its rules. else return false"""
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
+        return self.white_hunter_move_valid_by_index(a_board.get_index_from_id(start_id),
+                                                     a_board.get_index_from_id(end_id), a_board)
 
-        # if white hunter is moving forward/up board, we need to check if its properly moving like a rook
-        if a_board.is_going_up(start_id, end_id):
-            if a_board.is_up_down_left_right_valid(start_id, end_id):
-                result = True
-        # if white hunter is moving backwards/down board, we need to check if its properly moving like a bishop
-        elif a_board.is_going_down(start_id, end_id):
-            if a_board.is_diag_up_down_left_right_valid(start_id, end_id):
-                result = True
+    def white_hunter_move_valid_by_index(self, start, end, a_board):
+        """same as white_hunter_move_valid with square indexes"""
 
-        return result
+        # a white hunter moves forward/up the board like a rook and backwards/down the board like a bishop
+        reachable = FORWARD_STRAIGHT_RAYS["white"][start] | BACKWARD_DIAGONAL_RAYS["white"][start]
+        return reachable >> end & 1 == 1 and a_board.is_path_between_clear(start, end)
 
     def white_falcon_move_valid(self, start_id, end_id, a_board):
         """takes in a start_id and end_id as strings and a board object. returns true if the white falcon
                 moves according to its rules. else return false"""
-        result = False
-        row_col_difference = a_board.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
+        return self.white_falcon_move_valid_by_index(a_board.get_index_from_id(start_id),
+                                                     a_board.get_index_from_id(end_id), a_board)
 
-        # if white falcon is moving forward/up board, we need to check if its properly moving like a bishop
-        if a_board.is_going_up(start_id, end_id):
-            if a_board.is_diag_up_down_left_right_valid(start_id, end_id):
-                result = True
-        # if white falcon is moving backwards/down board, we need to check if its properly moving like a rook
-        elif a_board.is_going_down(start_id, end_id):
-            if a_board.is_up_down_left_right_valid(start_id, end_id):
-                result = True
+    def white_falcon_move_valid_by_index(self, start, end, a_board):
+        """same as white_falcon_move_valid with square indexes"""
 
-        return result
+        # a white falcon moves forward/up the board like a bishop and backwards/down the board like a rook
+        reachable = FORWARD_DIAGONAL_RAYS["white"][start] | BACKWARD_STRAIGHT_RAYS["white"][start]
+        return reachable >> end & 1 == 1 and a_board.is_path_between_clear(start, end)
+
+
+# the one piece object of every color and name that all boards share
+PIECE_CLASSES = {"rook": Rook, "knight": Knight, "bishop": Bishop, "king": King, "queen": Queen, "pawn": Pawn,
+                 "hunter": Fairy, "falcon": Fairy}
+PIECES = {(color, piece_name): PIECE_CLASSES[piece_name](color, piece_name)
+          for color in COLORS for piece_name in PIECE_NAMES}
 
 
 class Board:
     """A board object is a list of 8 lists. Each list represents a row on the chessboard. For instance,
     the 0 index of the first list refers to spot “a8” on the chess board, the 7th index of the first list
     refers to spot “h8”, the 0 index of the 8th list refers to spot “a1” on the chess board, and the 7th index
-    of the 8th list refers to spot “1h” on the chessboard. When a board object is created, it also creates Piece
-    objects like “rook” and “pawn” and places them on their proper starting position on the board. So the board
-    class interacts with the Piece class."""
+    of the 8th list refers to spot “1h” on the chessboard. When a board object is created, it also places Piece
+    objects like “rook” and “pawn” on their proper starting position on the board. So the board
+    class interacts with the Piece class. The board also keeps which pawns still have their double move."""
 
-    def __init__(self):
+    def __init__(self, set_up_pieces=True):
+        """set_up_pieces is False to start with an empty board and both piece trackers at 0, so some other position
+        can be put on it"""
         self._board = []
         self._white_pieces_on_board = {"rook": 2, "knight": 2, "bishop": 2, "king": 1, "queen": 1,"pawn": 8,"hunter": 0,
                                        "falcon": 0}
         self._black_pieces_on_board = {"rook": 2, "knight": 2, "bishop": 2, "king": 1, "queen": 1,"pawn": 8,"hunter": 0,
                                        "falcon": 0}
+        # a bitboard of the squares with a pawn that still has its double move
+        self._first_moves = 0
+        # the zobrist hash is updated every time a piece goes on or comes off a square and every time a pawn's double
+        # move changes
+        self._zobrist_hash = 0
+        # the game state only changes when a king comes off or goes back on the piece tracker
+        self._game_state = "UNFINISHED"
+        self._zobrist_black_to_move = False
+        # a bitboard of the squares each color has a piece on, used to check paths with the ray tables
+        self._color_bitboards = {"white": 0, "black": 0}
         self.create_new_board()
-        self.get_pieces_on_board()
-
+        if set_up_pieces:
+            self.get_pieces_on_board()
+        else:
+            for piece_name in PIECE_NAMES:
+                self._white_pieces_on_board[piece_name] = 0
+                self._black_pieces_on_board[piece_name] = 0
+            self.update_game_state()
 
     def create_new_board(self):
         """adds 8 lists to the chess_board list. Each element will hold a Piece or None."""
@@ -581,149 +1171,219 @@ class Board:
 
 
     def get_rooks_on_board(self):
-        """creates rook pieces and places them for the start of the game """
+        """places the rook pieces for the start of the game """
 
-        self._board[0][0] = Rook("black", "rook")
-        self._board[0][7] = Rook("black", "rook")
+        self.place_piece_at_square("a8", PIECES[("black", "rook")])
+        self.place_piece_at_square("h8", PIECES[("black", "rook")])
 
-        self._board[7][0] = Rook("white", "rook")
-        self._board[7][7] = Rook("white", "rook")
+        self.place_piece_at_square("a1", PIECES[("white", "rook")])
+        self.place_piece_at_square("h1", PIECES[("white", "rook")])
 
     def get_knights_on_board(self):
-        """creates knight pieces and places them for the start of the game """
+        """places the knight pieces for the start of the game """
 
-        self._board[0][1] = Knight("black", "knight")
-        self._board[0][6] = Knight("black", "knight")
+        self.place_piece_at_square("b8", PIECES[("black", "knight")])
+        self.place_piece_at_square("g8", PIECES[("black", "knight")])
 
-        self._board[7][1] = Knight("white", "knight")
-        self._board[7][6] = Knight("white", "knight")
+        self.place_piece_at_square("b1", PIECES[("white", "knight")])
+        self.place_piece_at_square("g1", PIECES[("white", "knight")])
 
     def get_bishops_on_board(self):
-        """creates bishop pieces and places them for the start of the game """
+        """places the bishop pieces for the start of the game """
 
-        self._board[0][2] = Bishop("black", "bishop")
-        self._board[0][5] = Bishop("black", "bishop")
+        self.place_piece_at_square("c8", PIECES[("black", "bishop")])
+        self.place_piece_at_square("f8", PIECES[("black", "bishop")])
 
-        self._board[7][2] = Bishop("white", "bishop")
-        self._board[7][5] = Bishop("white", "bishop")
+        self.place_piece_at_square("c1", PIECES[("white", "bishop")])
+        self.place_piece_at_square("f1", PIECES[("white", "bishop")])
 
     def get_kings_on_board(self):
-        """creates king pieces and places them for the start of the game """
+        """places the king pieces for the start of the game """
 
-        self._board[0][4] = King("black", "king")
+        self.place_piece_at_square("e8", PIECES[("black", "king")])
 
-        self._board[7][4] = King("white", "king")
+        self.place_piece_at_square("e1", PIECES[("white", "king")])
 
     def get_queens_on_board(self):
-        """creates queen pieces and places them for the start of the game """
+        """places the queen pieces for the start of the game """
 
-        self._board[0][3] = Queen( "black", "queen")
+        self.place_piece_at_square("d8", PIECES[("black", "queen")])
 
-        self._board[7][3] = Queen("white", "queen")
+        self.place_piece_at_square("d1", PIECES[("white", "queen")])
 
     def get_pawns_on_board(self):
-        """creates pawn pieces and places them for the start of the game """
-
-        self._board[1][0] = Pawn("black", "pawn")
-        self._board[1][1] = Pawn("black", "pawn")
-        self._board[1][2] = Pawn("black", "pawn")
-        self._board[1][3] = Pawn("black", "pawn")
-        self._board[1][4] = Pawn("black", "pawn")
-        self._board[1][5] = Pawn("black", "pawn")
-        self._board[1][6] = Pawn("black", "pawn")
-        self._board[1][7] = Pawn("black", "pawn")
-
-        self._board[6][0] = Pawn( "white", "pawn")
-        self._board[6][1] = Pawn("white", "pawn")
-        self._board[6][2] = Pawn("white", "pawn")
-        self._board[6][3] = Pawn("white", "pawn")
-        self._board[6][4] = Pawn("white", "pawn")
-        self._board[6][5] = Pawn("white", "pawn")
-        self._board[6][6] = Pawn("white", "pawn")
-        self._board[6][7] = Pawn("white", "pawn")
+        """places the pawn pieces for the start of the game """
+
+        self.place_piece_at_square("a7", PIECES[("black", "pawn")])
+        self.place_piece_at_square("b7", PIECES[("black", "pawn")])
+        self.place_piece_at_square("c7", PIECES[("black", "pawn")])
+        self.place_piece_at_square("d7", PIECES[("black", "pawn")])
+        self.place_piece_at_square("e7", PIECES[("black", "pawn")])
+        self.place_piece_at_square("f7", PIECES[("black", "pawn")])
+        self.place_piece_at_square("g7", PIECES[("black", "pawn")])
+        self.place_piece_at_square("h7", PIECES[("black", "pawn")])
+
+        self.place_piece_at_square("a2", PIECES[("white", "pawn")])
+        self.place_piece_at_square("b2", PIECES[("white", "pawn")])
+        self.place_piece_at_square("c2", PIECES[("white", "pawn")])
+        self.place_piece_at_square("d2", PIECES[("white", "pawn")])
+        self.place_piece_at_square("e2", PIECES[("white", "pawn")])
+        self.place_piece_at_square("f2", PIECES[("white", "pawn")])
+        self.place_piece_at_square("g2", PIECES[("white", "pawn")])
+        self.place_piece_at_square("h2", PIECES[("white", "pawn")])
+
+        # every pawn starts with its double move, the black pawns are on squares 8 to 15 and the white pawns on 48 to 55
+        self.set_first_moves(0xFF << 8 | 0xFF << 48)
 
 
     def get_row_from_id(self, square_id):
         """uses the square id to return the row representational row on the board"""
-
-        row_index = None
-
-        if square_id[1] == "8":
-            row_index = 0
-        elif square_id[1] == "7":
-            row_index = 1
-        elif square_id[1] == "6":
-            row_index = 2
-        elif square_id[1] == "5":
-            row_index = 3
-        elif square_id[1] == "4":
-            row_index = 4
-        elif square_id[1] == "3":
-            row_index = 5
-        elif square_id[1] == "2":
-            row_index = 6
-        elif square_id[1] == "1":
-            row_index = 7
-
-        return row_index
+        return ROW_FROM_RANK.get(square_id[1])
 
     def get_col_from_id(self, square_id):
         """uses the square id to return the row representational column on the board"""
-        column_index = None
-
-        if square_id[0] == "a":
-            column_index = 0
-        elif square_id[0] == "b":
-            column_index = 1
-        elif square_id[0] == "c":
-            column_index = 2
-        elif square_id[0] == "d":
-            column_index = 3
-        elif square_id[0] == "e":
-            column_index = 4
-        elif square_id[0] == "f":
-            column_index = 5
-        elif square_id[0] == "g":
-            column_index = 6
-        elif square_id[0] == "h":
-            column_index = 7
-
-        return column_index
+        return COL_FROM_FILE.get(square_id[0])
 
     def is_id_within_board_bounds(self, square_id):
         """takes in a string square id and checks whether this id even exists on the board. This helps us makes sure
         we are not inputting any numbers that do not exist on the board ex. i5"""
-        result = False
-
-        row_at_id = self.get_row_from_id(square_id)
-        col_at_id = self.get_col_from_id(square_id)
-
-        if row_at_id is not None and col_at_id is not None:
-            result = True
-
-        return result
+        return self.get_index_from_id(square_id) is not None
 
+    def get_index_from_id(self, square_id):
+        """takes in a string square id and returns its square index (row * 8 + col, so "a8" is 0 and "h1" is 63).
+        returns None if the id does not exist on the board"""
+        return SQUARE_INDEX.get(square_id[:2])
 
     def get_Piece_from_squareID(self, square_id):
         """return piece from the chessboard at square id ex. "a8". If no piece there return None"""
-
-        result = None
-
-        row_index = self.get_row_from_id(square_id)
-        col_index = self.get_col_from_id(square_id)
-        result = self._board[row_index][col_index]
-
-        return result
+        return self.get_piece_at_index(SQUARE_INDEX[square_id[:2]])
+
+    def get_piece_at_index(self, index):
+        """returns the piece on the square index, or None"""
+        return self._board[index >> 3][index & 7]
+
+    def add_piece_at_index(self, index, piece):
+        """puts the piece on the square index and adds it to the color bitboard and the zobrist hash. the square has
+        to be empty"""
+
+        self._board[index >> 3][index & 7] = piece
+        self._color_bitboards[piece.get_color()] |= 1 << index
+        self.hash_piece_on_square(index, piece)
+
+    def remove_piece_at_index(self, index):
+        """takes whatever piece is on the square index off the board, the color bitboard and the zobrist hash and
+        returns that piece (or None)"""
+
+        piece = self._board[index >> 3][index & 7]
+        if piece is not None:
+            self._board[index >> 3][index & 7] = None
+            self._color_bitboards[piece.get_color()] ^= 1 << index
+            self.hash_piece_off_square(index, piece)
+        return piece
+
+    def get_color_bitboard(self, color):
+        """returns the bitboard of every square holding a piece of this color"""
+        return self._color_bitboards[color]
+
+    def get_occupied(self):
+        """returns the bitboard of every square holding a piece"""
+        return self._color_bitboards["white"] | self._color_bitboards["black"]
+
+    def place_piece_at_square(self, square_id, piece):
+        """takes in a string square_id and a Piece and puts that piece on the square, replacing whatever was there.
+        the piece tracker is not changed"""
+        self.place_piece_at_index(SQUARE_INDEX[square_id[:2]], piece)
+
+    def place_piece_at_index(self, index, piece):
+        """same as place_piece_at_square with a square index"""
+
+        self.remove_piece_at_index(index)
+        if piece is not None:
+            self.add_piece_at_index(index, piece)
+
+    def get_zobrist_hash(self):
+        """returns the 64 bit zobrist hash of the pieces, pawn double moves, entered fairies and side to move"""
+        return self._zobrist_hash
+
+    def hash_piece_on_square(self, index, piece):
+        """adds the piece on the square index to the zobrist hash"""
+        self._zobrist_hash ^= ZOBRIST_PIECE_KEYS[(piece.get_color(), piece.get_name())][index]
+
+    def hash_piece_off_square(self, index, piece):
+        """takes the piece on the square index out of the zobrist hash. a pawn's double move leaves the square with
+        it, so it is taken out of the first moves and the hash too"""
+
+        self._zobrist_hash ^= ZOBRIST_PIECE_KEYS[(piece.get_color(), piece.get_name())][index]
+        if self._first_moves >> index & 1:
+            self._zobrist_hash ^= ZOBRIST_FIRST_MOVE_KEYS[index]
+            self._first_moves ^= 1 << index
+
+    def get_first_moves(self):
+        """returns the bitboard of the squares with a pawn that still has its double move"""
+        return self._first_moves
+
+    def set_first_moves(self, first_moves):
+        """takes in a bitboard of the squares with a pawn that still has its double move and makes it the board's,
+        updating the zobrist hash for every square that changed"""
+
+        changed = self._first_moves ^ first_moves
+        while changed:
+            index = (changed & -changed).bit_length() - 1
+            changed &= changed - 1
+            self._zobrist_hash ^= ZOBRIST_FIRST_MOVE_KEYS[index]
+        self._first_moves = first_moves
+
+    def is_first_move_at_square(self, square_id):
+        """returns true if there is a pawn on the square id that has not made a (non capturing) move yet"""
+        return self.is_first_move_at_index(SQUARE_INDEX[square_id[:2]])
+
+    def is_first_move_at_index(self, index):
+        """same as is_first_move_at_square with a square index"""
+        return self._first_moves >> index & 1 == 1
+
+    def set_is_first_move_at_index(self, index, is_first_move):
+        """gives the pawn on the square index its double move (is_first_move is True) or takes it away (False)"""
+        if self.is_first_move_at_index(index) != is_first_move:
+            self._first_moves ^= 1 << index
+            self._zobrist_hash ^= ZOBRIST_FIRST_MOVE_KEYS[index]
+
+    def toggle_zobrist_side_to_move(self):
+        """called every time the turn switches, so the hash is different for white and black to move"""
+        self._zobrist_hash ^= ZOBRIST_BLACK_TO_MOVE_KEY
+        self._zobrist_black_to_move = not self._zobrist_black_to_move
+
+    def compute_zobrist_hash(self):
+        """works out the zobrist hash of the board from scratch. get_zobrist_hash should always return the same
+        number, this is slower and only used for checking"""
+
+        zobrist_hash = 0
+        virtual_board = self.get_board()
+        for index in range(64):
+            piece = virtual_board[index >> 3][index & 7]
+            if piece is not None:
+                zobrist_hash ^= ZOBRIST_PIECE_KEYS[(piece.get_color(), piece.get_name())][index]
+                if piece.get_name() == "pawn" and self.is_first_move_at_index(index):
+                    zobrist_hash ^= ZOBRIST_FIRST_MOVE_KEYS[index]
+
+        for color, piece_name in ZOBRIST_FAIRY_KEYS:
+            if self.get_num_of_piece_on_board(color, piece_name) != 0:
+                zobrist_hash ^= ZOBRIST_FAIRY_KEYS[(color, piece_name)]
+
+        if self._zobrist_black_to_move:
+            zobrist_hash ^= ZOBRIST_BLACK_TO_MOVE_KEY
+
+        return zobrist_hash
 
     def display_board(self):
         """display the current board"""
 
+        virtual_board = self.get_board()
         row_index = 0
         col_index = 0
         for row_index in range(8):
             row_str = ""
             while col_index < 8:
-                piece_at_indices = self._board[row_index][col_index]
+                piece_at_indices = virtual_board[row_index][col_index]
                 if piece_at_indices is None:
                     row_str += ". "
                 elif piece_at_indices.get_name() == "rook":
@@ -751,6 +1411,107 @@ class Board:
             print(row_str)
             col_index = 0
 
+    def clear_board(self):
+        """takes every piece off the board and sets every amount in both piece trackers to 0, so a position other
+        than the starting position can be set up with place_piece_at_square and add_piece_to_tracker"""
+
+        for square_id in SQUARE_IDS:
+            self.remove_piece_from_board(square_id)
+        for color in COLORS:
+            for piece_name in PIECE_NAMES:
+                while self.get_num_of_piece_on_board(color, piece_name) > 0:
+                    self.remove_piece_from_tracker(color, piece_name)
+
+    def get_piece_codes(self):
+        """returns 64 bytes holding the piece code (see PIECE_CODES) of every square, 0 for an empty square"""
+
+        codes = bytearray(64)
+        occupied = self.get_occupied()
+        while occupied:
+            index = (occupied & -occupied).bit_length() - 1
+            occupied &= occupied - 1
+            piece = self.get_piece_at_index(index)
+            codes[index] = PIECE_CODES[(piece.get_color(), piece.get_name())]
+        return bytes(codes)
+
+    def set_piece_codes(self, codes):
+        """takes in 64 bytes made by get_piece_codes and puts those pieces on the board instead of the ones on it,
+        all at once. every pawn double move is taken away and the piece trackers are not changed. raises a ValueError
+        for a code that is not a piece"""
+
+        self.set_first_moves(0)
+
+        # take the pieces on the board out of the hash, then put the new ones in
+        zobrist_hash = self._zobrist_hash
+        occupied = self.get_occupied()
+        while occupied:
+            index = (occupied & -occupied).bit_length() - 1
+            occupied &= occupied - 1
+            piece = self.get_piece_at_index(index)
+            zobrist_hash ^= ZOBRIST_PIECE_KEYS[(piece.get_color(), piece.get_name())][index]
+
+        pieces = [None] * 64
+        white_bitboard = 0
+        black_bitboard = 0
+        for index, code in enumerate(codes):
+            if code != 0:
+                color_and_name = PIECES_FROM_CODES.get(code)
+                if color_and_name is None:
+                    raise ValueError("square " + SQUARE_IDS[index] + " has no piece with code " + str(code))
+                pieces[index] = PIECES[color_and_name]
+                zobrist_hash ^= ZOBRIST_PIECE_KEYS[color_and_name][index]
+                if code < 128:
+                    white_bitboard |= 1 << index
+                else:
+                    black_bitboard |= 1 << index
+
+        self.store_all_pieces(pieces)
+        self._color_bitboards = {"white": white_bitboard, "black": black_bitboard}
+        self._zobrist_hash = zobrist_hash
+
+    def store_all_pieces(self, pieces):
+        """used by set_piece_codes to replace the 8 lists with a list of 64 pieces (or None) in square index order"""
+        self._board = [list(pieces[row * 8:row * 8 + 8]) for row in range(8)]
+
+    def get_tracker_codes(self):
+        """returns 16 bytes holding the amounts in the white and then the black piece tracker in PIECE_NAMES order"""
+        return bytes([self._white_pieces_on_board[piece_name] for piece_name in PIECE_NAMES] +
+                     [self._black_pieces_on_board[piece_name] for piece_name in PIECE_NAMES])
+
+    def set_tracker_codes(self, codes):
+        """takes in 16 bytes made by get_tracker_codes and sets both piece trackers to them"""
+
+        for color_number, color in enumerate(COLORS):
+            for name_number, piece_name in enumerate(PIECE_NAMES):
+                amount = codes[color_number * 8 + name_number]
+                if color == "white":
+                    dict_of_pieces = self._white_pieces_on_board
+                else:
+                    dict_of_pieces = self._black_pieces_on_board
+                # an entered fairy is part of the zobrist hash
+                if (color, piece_name) in ZOBRIST_FAIRY_KEYS and (dict_of_pieces[piece_name] == 0) != (amount == 0):
+                    self._zobrist_hash ^= ZOBRIST_FAIRY_KEYS[(color, piece_name)]
+                dict_of_pieces[piece_name] = amount
+        self.update_game_state()
+
+    def get_game_state(self):
+        """returns “UNFINISHED”, “WHITE_WON”, or “BLACK_WON”. it is kept up to date by the piece trackers, so nothing
+        has to be counted"""
+        return self._game_state
+
+    def update_game_state(self):
+        """works out the game state again from the kings on the piece trackers. called every time a king's amount
+        changes"""
+
+        #if white have no king, black wins
+        if self._white_pieces_on_board["king"] == 0:
+            self._game_state = "BLACK_WON"
+        # if black have no king, white wins
+        elif self._black_pieces_on_board["king"] == 0:
+            self._game_state = "WHITE_WON"
+        else:
+            self._game_state = "UNFINISHED"
+
     def get_white_pieces_on_board(self):
         """returns the dict of white pieces currently on board"""
         return self._white_pieces_on_board
@@ -845,6 +1606,28 @@ class Board:
         if num_of_piece > 0:
             num_of_piece -= 1
             dict_of_pieces[piece_name] = num_of_piece
+            # an entered fairy is part of the hash, so it has to come out when the fairy is captured
+            if piece_name == "hunter" or piece_name == "falcon":
+                self._zobrist_hash ^= ZOBRIST_FAIRY_KEYS[(color, piece_name)]
+            # capturing a king ends the game
+            elif piece_name == "king":
+                self.update_game_state()
+
+    def add_piece_to_tracker(self, color, piece_name):
+        """take in color and piece_name as strings and increment its amount in the dictionary tracker by 1. used to
+        put a captured piece back when a move is taken back"""
+
+        if color == "white":
+            dict_of_pieces = self._white_pieces_on_board
+        else:
+            # color is black
+            dict_of_pieces = self._black_pieces_on_board
+
+        dict_of_pieces[piece_name] += 1
+        if piece_name == "hunter" or piece_name == "falcon":
+            self._zobrist_hash ^= ZOBRIST_FAIRY_KEYS[(color, piece_name)]
+        elif piece_name == "king":
+            self.update_game_state()
 
     def add_fairy_piece_tracker(self, color, a_letter):
         """takes in a color and name of a fairy piece and adds its amount in the dictionary tracker by 1, returns true.
@@ -871,6 +1654,7 @@ class Board:
         if num_of_piece == 0:
             num_of_piece += 1
             dict_of_pieces[piece_name] = num_of_piece
+            self._zobrist_hash ^= ZOBRIST_FAIRY_KEYS[(color, piece_name)]
             result = True
         # else, then we already have that piece in the tracker and result will be false
 
@@ -883,31 +1667,15 @@ class Board:
         If the row difference is positive we will go down the board. If negative we will go up the board.
         If the col difference is positive we will go right. If negative we will go left.
         Return row difference and col difference as a list"""
+        return self.find_row_and_col_difference_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]])
 
-        row_col_difference = []
-
-        start_row = self.get_row_from_id(start_id)
-        end_row = self.get_row_from_id(end_id)
-        row_difference = end_row - start_row
-        row_col_difference.append(row_difference)
-
-        start_col = self.get_col_from_id(start_id)
-        end_col = self.get_col_from_id(end_id)
-        col_difference = end_col - start_col
-        row_col_difference.append(col_difference)
-        return row_col_difference
+    def find_row_and_col_difference_by_index(self, start, end):
+        """same as find_row_and_col_difference with 2 square indexes. the row is index // 8 and the col is index % 8"""
+        return [(end >> 3) - (start >> 3), (end & 7) - (start & 7)]
 
     def remove_piece_from_board(self, square_id):
         """takes in a string square_id and removes the piece at that id by making it hold None instead"""
-
-        piece_at_id = self.get_Piece_from_squareID(square_id)
-        row_at_id = self.get_row_from_id(square_id)
-        col_at_id = self.get_col_from_id(square_id)
-
-        if piece_at_id is None:
-            return
-        else:
-            self._board[row_at_id][col_at_id] = None
+        self.remove_piece_at_index(SQUARE_INDEX[square_id[:2]])
 
     def set_piece_at_square(self, start_id, end_id):
         """
@@ -916,368 +1684,335 @@ class Board:
         if the square at the end_id is empty then just place the piece from the start_id onto the end_id
         and remove the piece from the start id.
         """
-        piece_at_start_id = self.get_Piece_from_squareID(start_id)
-
-        piece_at_end_id = self.get_Piece_from_squareID(end_id)
-        row_at_end_id = self.get_row_from_id(end_id)
-        col_at_end_id = self.get_col_from_id(end_id)
-
-        #if there is a piece at the end square
-        if piece_at_end_id is not None:
-            # remove that piece from the dict_tracker
-            color_of_end_piece = piece_at_end_id.get_color()
-            name_of_end_piece = piece_at_end_id.get_name()
-            self.remove_piece_from_tracker(color_of_end_piece, name_of_end_piece)
-
-        # remove that piece at the end_id by replacing it with None
-            self._board[row_at_end_id][col_at_end_id] = None
-
-        piece_at_end_id = self.get_Piece_from_squareID(end_id)
-
-        # if there not piece at the end square, or we removed the piece from the end square
-        if piece_at_end_id is None:
-            #set the piece at the start_id to be at the end_id
-            self._board[row_at_end_id][col_at_end_id] = piece_at_start_id
-
-            #remove the piece at the start_id
-            self.remove_piece_from_board(start_id)
+        self.set_piece_at_square_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]])
+
+    def set_piece_at_square_by_index(self, start, end):
+        """same as set_piece_at_square with 2 square indexes"""
+
+        # if there is a piece at the end square, take it off the board and remove it from the dict_tracker
+        piece_at_end = self.remove_piece_at_index(end)
+        if piece_at_end is not None:
+            self.remove_piece_from_tracker(piece_at_end.get_color(), piece_at_end.get_name())
+
+        #remove the piece at the start and set it to be at the end, a pawn keeps its double move
+        had_first_move = self.is_first_move_at_index(start)
+        piece_at_start = self.remove_piece_at_index(start)
+        if piece_at_start is not None:
+            self.add_piece_at_index(end, piece_at_start)
+            if had_first_move:
+                self.set_is_first_move_at_index(end, True)
+
+    def unset_piece_at_square(self, start_id, end_id, captured_piece):
+        """undoes set_piece_at_square. moves the piece at the end_id back to the start_id and puts the captured_piece
+        back on the end_id and on the piece tracker. captured_piece is None if nothing was captured. the moving pawn
+        takes its double move back with it, but a captured pawn comes back without one, so set_first_moves has to be
+        used to give it back"""
+        self.unset_piece_at_square_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]], captured_piece)
+
+    def unset_piece_at_square_by_index(self, start, end, captured_piece):
+        """same as unset_piece_at_square with 2 square indexes"""
+
+        had_first_move = self.is_first_move_at_index(end)
+        moving_piece = self.remove_piece_at_index(end)
+        self.place_piece_at_index(start, moving_piece)
+        if had_first_move:
+            self.set_is_first_move_at_index(start, True)
+
+        if captured_piece is not None:
+            self.add_piece_at_index(end, captured_piece)
+            self.add_piece_to_tracker(captured_piece.get_color(), captured_piece.get_name())
+
+    def is_path_between_clear(self, start, end):
+        """takes in 2 square indexes and returns true if there are no pieces on the squares in between them (not
+        including the start and end squares). the squares have to share a row, column or diagonal"""
+        return SQUARES_BETWEEN[start][end] & self.get_occupied() == 0
+
+    def is_ray_move_clear(self, start_id, end_id, rays):
+        """takes in 2 square ids and a table of rays. returns true if the end_id is on the start_id's ray and there
+        are no pieces in between them (not including the end_id)"""
+        return self.is_ray_move_clear_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]], rays)
+
+    def is_ray_move_clear_by_index(self, start, end, rays):
+        """same as is_ray_move_clear with 2 square indexes"""
+        return rays[start] >> end & 1 == 1 and SQUARES_BETWEEN[start][end] & self.get_occupied() == 0
 
     def vertical_path_down_is_clear(self, start_id, end_id):
         """takes in 2 square ids as strings and returns false if there is a piece on the way vertically DOWN from the
         start_id to the end_id. the path does NOT include any pieces on the end_id square. return true otherwise"""
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(1, 0)])
 
-        row_difference = self.find_row_and_col_difference(start_id, end_id)[0]
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_row = self.get_row_from_id(end_id)
-        result = False
-
-        # if going down, row difference should be postive
-        distance_from_start_row = 1
-        while distance_from_start_row <= row_difference:
-            temp_row = start_row + distance_from_start_row
-            temp_square = self._board[temp_row][start_col]
-            if temp_row == end_row:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_row += 1
-
-        return result
+    def vertical_path_down_is_clear_by_index(self, start, end):
+        """same as vertical_path_down_is_clear with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(1, 0)])
 
     def vertical_path_up_is_clear(self, start_id, end_id):
         """takes in 2 square ids as strings and returns false if there is a piece on the way vertically up from the
         start_id to the end_id. the path does NOT include any pieces on the end_id square. return true otherwise"""
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(-1, 0)])
 
-        row_difference = self.find_row_and_col_difference(start_id, end_id)[0]
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_row = self.get_row_from_id(end_id)
-        result = False
-
-        # if going up, row difference should be negative
-        distance_from_start_row = -1
-        while distance_from_start_row >= row_difference:
-            temp_row = start_row + distance_from_start_row
-            temp_square = self._board[temp_row][start_col]
-            if temp_row == end_row:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_row -= 1
-
-        return result
+    def vertical_path_up_is_clear_by_index(self, start, end):
+        """same as vertical_path_up_is_clear with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(-1, 0)])
 
     def horizontal_path_right_is_clear(self, start_id, end_id):
         """takes in 2 square ids as strings and returns false if there is a piece on the way horizontally right from the
         start_id to the end_id. the path does NOT include any pieces on the end_id square. return true otherwise"""
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(0, 1)])
 
-        col_difference = self.find_row_and_col_difference(start_id, end_id)[1]
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_col = self.get_col_from_id(end_id)
-        result = False
-
-        # if going right, col difference should be positive
-        distance_from_start_col = 1
-        while distance_from_start_col <= col_difference:
-            temp_col = start_col + distance_from_start_col
-            temp_square = self._board[start_row][temp_col]
-            if temp_col == end_col:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_col += 1
-
-        return result
+    def horizontal_path_right_is_clear_by_index(self, start, end):
+        """same as horizontal_path_right_is_clear with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(0, 1)])
 
     def horizontal_path_left_is_clear(self, start_id, end_id):
         """takes in 2 square ids as strings and returns false if there is a piece on the way horizontally LEFT from the
         start_id to the end_id. the path does NOT include any pieces on the end_id square. return true otherwise"""
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(0, -1)])
 
-        col_difference = self.find_row_and_col_difference(start_id, end_id)[1]
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_col = self.get_col_from_id(end_id)
-        result = False
-
-        # if going left, col difference should be negative
-        distance_from_start_col = -1
-        while distance_from_start_col >= col_difference:
-            temp_col = start_col + distance_from_start_col
-            temp_square = self._board[start_row][temp_col]
-            if temp_col == end_col:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_col -= 1
-
-        return result
+    def horizontal_path_left_is_clear_by_index(self, start, end):
+        """same as horizontal_path_left_is_clear with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(0, -1)])
 
     def is_going_up(self, start_id, end_id):
         """return true if piece is moving up based on start and end ids. else return false"""
-        result = False
-        row_difference = self.find_row_and_col_difference(start_id, end_id)[0]
-        if row_difference < 0:
-            result = True
+        return self.is_going_up_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]])
 
-        return result
+    def is_going_up_by_index(self, start, end):
+        """same as is_going_up with 2 square indexes"""
+        return self.find_row_and_col_difference_by_index(start, end)[0] < 0
 
     def is_going_down(self, start_id, end_id):
         """return true if piece is moving up based on start and end ids. else return false"""
-        result = False
-        row_difference = self.find_row_and_col_difference(start_id, end_id)[0]
-        if row_difference > 0:
-            result = True
+        return self.is_going_down_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]])
 
-        return result
+    def is_going_down_by_index(self, start, end):
+        """same as is_going_down with 2 square indexes"""
+        return self.find_row_and_col_difference_by_index(start, end)[0] > 0
 
     def is_going_left(self, start_id, end_id):
         """return true if piece is moving up based on start and end ids. else return false"""
-        result = False
-        col_difference = self.find_row_and_col_difference(start_id, end_id)[1]
-        if col_difference < 0:
-            result = True
+        return self.is_going_left_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]])
 
-        return result
+    def is_going_left_by_index(self, start, end):
+        """same as is_going_left with 2 square indexes"""
+        return self.find_row_and_col_difference_by_index(start, end)[1] < 0
 
     def is_going_right(self, start_id, end_id):
         """return true if piece is moving up based on start and end ids. else return false"""
-        result = False
-        col_difference = self.find_row_and_col_difference(start_id, end_id)[1]
-        if col_difference > 0:
-            result = True
+        return self.is_going_right_by_index(SQUARE_INDEX[start_id[:2]], SQUARE_INDEX[end_id[:2]])
 
-        return result
+    def is_going_right_by_index(self, start, end):
+        """same as is_going_right with 2 square indexes"""
+        return self.find_row_and_col_difference_by_index(start, end)[1] > 0
 
     def is_up_down_left_right_valid(self, start_id, end_id):
         """used for queen and rook, king, hunter, falcon movement. if the end_id is up, down, left, OR right to the start_id, and there
         is no pieces in between the start_id and end_id (not including the end_id) return true. Else return false"""
-        result = False
-        list_of_row_col_path = self.find_row_and_col_difference(start_id, end_id)
-
-        # if end is on the same row as start
-        if self.get_row_from_id(end_id) == self.get_row_from_id(start_id):
-            # if going left, check if there is a clear path left
-            if self.is_going_left(start_id, end_id):
-                if self.horizontal_path_left_is_clear(start_id, end_id):
-                    result = True
-            # if going right, check if there is a clear path right
-            elif self.is_going_right(start_id, end_id):
-                if self.horizontal_path_right_is_clear(start_id, end_id):
-                    result = True
-        # if end is on the same column as start
-        elif self.get_col_from_id(end_id) == self.get_col_from_id(start_id):
-            # if going up, check if up path is clear
-            if self.is_going_up(start_id, end_id):
-                if self.vertical_path_up_is_clear(start_id, end_id):
-                    result = True
-            # if going down, check if down path is clear
-            elif self.is_going_down(start_id, end_id):
-                if self.vertical_path_down_is_clear(start_id, end_id):
-                    result = True
-        else:
-            result = False
+        return self.is_ray_move_clear(start_id, end_id, STRAIGHT_RAYS)
 
-        return result
+    def is_up_down_left_right_valid_by_index(self, start, end):
+        """same as is_up_down_left_right_valid with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, STRAIGHT_RAYS)
 
     def is_diag_up_left_valid(self, start_id, end_id):
         """takes in 2 string ids and returns true if there is a clear path diagonal up left from start_id to end_id"""
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(-1, -1)])
 
-        #we are gonna keep doing decrementing row and col by 1 until we reach end_id
-        result = False
-        row_col_difference = self.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
-
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_row = self.get_row_from_id(end_id)
-        end_col = self.get_col_from_id(end_id)
-
-        # if going up left, row and col difference should be both be negative
-        distance_from_start_col = -1
-        distance_from_start_row = -1
-
-        #this could be distance_from_start_row or column
-        while distance_from_start_row >= row_difference:
-            temp_col = start_col + distance_from_start_col
-            temp_row = start_row + distance_from_start_row
-            temp_square = self._board[temp_row][temp_col]
-            if temp_row == end_row:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_row -= 1
-            distance_from_start_col -= 1
-
-        return result
+    def is_diag_up_left_valid_by_index(self, start, end):
+        """same as is_diag_up_left_valid with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(-1, -1)])
 
     def is_diag_up_right_valid(self, start_id, end_id):
         """takes in 2 string ids and returns true if there is a clear path diagonal right up from start_id to end_id"""
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(-1, 1)])
 
-        result = False
-        row_col_difference = self.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
-
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_row = self.get_row_from_id(end_id)
-        end_col = self.get_col_from_id(end_id)
-
-        # if going up right, row should be both be negative and col should be positive
-        distance_from_start_row = -1
-        distance_from_start_col = 1
-
-        #this could be distance_from_start_row or column
-        while distance_from_start_row >= row_difference:
-            temp_col = start_col + distance_from_start_col
-            temp_row = start_row + distance_from_start_row
-            temp_square = self._board[temp_row][temp_col]
-            if temp_row == end_row:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_row -= 1
-            distance_from_start_col += 1
-
-        return result
+    def is_diag_up_right_valid_by_index(self, start, end):
+        """same as is_diag_up_right_valid with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(-1, 1)])
 
     def is_diag_down_left_valid(self, start_id, end_id):
         """takes in 2 string ids and returns true if there is a clear path diagonal down left from start_id to end_id"""
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(1, -1)])
 
-        result = False
-        row_col_difference = self.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
-
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_row = self.get_row_from_id(end_id)
-        end_col = self.get_col_from_id(end_id)
-
-        # if going down right, row should be positive and col should be negative
-        distance_from_start_row = 1
-        distance_from_start_col = -1
-
-        #this could be distance_from_start_row or column
-        while distance_from_start_row <= row_difference:
-            temp_col = start_col + distance_from_start_col
-            temp_row = start_row + distance_from_start_row
-            temp_square = self._board[temp_row][temp_col]
-            if temp_row == end_row:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_row += 1
-            distance_from_start_col -= 1
-
-        return result
+    def is_diag_down_left_valid_by_index(self, start, end):
+        """same as is_diag_down_left_valid with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(1, -1)])
 
     def is_diag_down_right_valid(self, start_id, end_id):
         """takes in 2 string ids and returns true if there is a clear path diagonal right down from start_id to end_id"""
-        result = False
-        row_col_difference = self.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
-
-        start_row = self.get_row_from_id(start_id)
-        start_col = self.get_col_from_id(start_id)
-        end_row = self.get_row_from_id(end_id)
-        end_col = self.get_col_from_id(end_id)
-
-        # if going down right, row and col should be both be positive
-        distance_from_start_row = 1
-        distance_from_start_col = 1
-
-        #this could be distance_from_start_row or column
-        while distance_from_start_row <= row_difference:
-            temp_col = start_col + distance_from_start_col
-            temp_row = start_row + distance_from_start_row
-            temp_square = self._board[temp_row][temp_col]
-            if temp_row == end_row:
-                result = True
-                break
-            else:
-                if temp_square is not None:
-                    result = False
-                    break
-            distance_from_start_row += 1
-            distance_from_start_col += 1
+        return self.is_ray_move_clear(start_id, end_id, RAYS[(1, 1)])
 
-        return result
+    def is_diag_down_right_valid_by_index(self, start, end):
+        """same as is_diag_down_right_valid with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, RAYS[(1, 1)])
 
     def is_diag_up_down_left_right_valid(self, start_id, end_id):
         """takes in 2 string ids and returns true if there is a clear path diagonal either diagonal up, down, left or
         right between the start_id and end_id"""
+        return self.is_ray_move_clear(start_id, end_id, DIAGONAL_RAYS)
+
+    def is_diag_up_down_left_right_valid_by_index(self, start, end):
+        """same as is_diag_up_down_left_right_valid with 2 square indexes"""
+        return self.is_ray_move_clear_by_index(start, end, DIAGONAL_RAYS)
+
+    def generate_moves(self, color):
+        """returns a list of every legal move for the color. moves of pieces on the board are tuples of two square
+        ids like ("e2", "e4") and fairy entries are tuples of a letter and a square id like ("H", "c1"). these are
+        exactly the moves make_move and enter_fairy_piece would accept for that player. once a king has been
+        captured the game is over, so the list is empty"""
+
+        if self._game_state != "UNFINISHED":
+            return []
+
+        moves = self.generate_piece_moves(color)
+        moves.extend(self.generate_fairy_entries(color))
+        return moves
+
+    def generate_piece_moves(self, color):
+        """returns a list of (start_id, end_id) tuples for every legal move of the color's pieces on the board"""
+
+        moves = []
+        own = self._color_bitboards[color]
+        enemy = self._color_bitboards["black" if color == "white" else "white"]
+        occupied = own | enemy
+
+        pieces_left = own
+        while pieces_left:
+            start = (pieces_left & -pieces_left).bit_length() - 1
+            pieces_left &= pieces_left - 1
+            piece = self.get_piece_at_index(start)
+            piece_name = piece.get_name()
+
+            if piece_name == "pawn":
+                # a pawn moves forward onto empty squares (two squares on its first move, without checking the
+                # square it jumps over) and captures diagonally forward
+                targets = PAWN_CAPTURES[color][start] & enemy
+                step = -8 if color == "white" else 8
+                for distance in (step, step * 2):
+                    end = start + distance
+                    if 0 <= end < 64 and not occupied >> end & 1:
+                        targets |= 1 << end
+                    if not self._first_moves >> start & 1:
+                        break
+            elif piece_name == "knight":
+                targets = KNIGHT_ATTACKS[start] & ~own
+            elif piece_name == "king":
+                targets = KING_ATTACKS[start] & ~own
+            else:
+                # rooks, bishops, queens, hunters and falcons go along their rays up to and including the first
+                # piece in the way
+                targets = 0
+                for direction in SLIDING_DIRECTIONS[(color, piece_name)]:
+                    ray = RAYS[direction][start]
+                    blockers = ray & occupied
+                    if blockers:
+                        if direction in POSITIVE_DIRECTIONS:
+                            first_blocker = (blockers & -blockers).bit_length() - 1
+                        else:
+                            first_blocker = blockers.bit_length() - 1
+                        ray ^= RAYS[direction][first_blocker]
+                    targets |= ray
+                targets &= ~own
+
+            start_id = SQUARE_IDS[start]
+            while targets:
+                end = (targets & -targets).bit_length() - 1
+                targets &= targets - 1
+                moves.append((start_id, SQUARE_IDS[end]))
+
+        return moves
+
+    def generate_fairy_entries(self, color):
+        """returns a list of (letter, square_id) tuples for every fairy piece the color could enter right now. the
+        fairy has to go on an empty square of the color's home rank, the color can have at most 6 major pieces left
+        to enter its first fairy and at most 5 to enter its second, and each fairy can only be on the board once"""
+
+        entries = []
+        if self.has_no_fairy_on_board(color):
+            most_major_pieces = MOST_MAJOR_PIECES_FOR_FIRST_FAIRY
+        else:
+            most_major_pieces = MOST_MAJOR_PIECES_FOR_SECOND_FAIRY
+        if self.get_current_num_major_pieces(color) > most_major_pieces:
+            return entries
 
-        result = False
-        row_col_difference = self.find_row_and_col_difference(start_id, end_id)
-        row_difference = row_col_difference[0]
-        col_difference = row_col_difference[1]
-
-        #if we are going up left: row and col difference both negative
-        if row_difference < 0 and col_difference < 0:
-            # if there are no pieces up left diagonally not including end_id square, then valid
-            if self.is_diag_up_left_valid(start_id, end_id):
-               result = True
-        #if we are going up right: row is negative and col is positive
-        elif row_difference < 0 and col_difference > 0:
-            # if there are no pieces up right diagonally not including end_id square, then valid
-            if self.is_diag_up_right_valid(start_id, end_id):
-               result = True
-        #if we are going down left: row is positive, and col is negative
-        elif row_difference > 0 and col_difference < 0:
-            if self.is_diag_down_left_valid(start_id, end_id):
-               result = True
-        #if we are going down right: row is positive and col is postive
-        elif row_difference > 0 and col_difference > 0:
-            if self.is_diag_down_right_valid(start_id, end_id):
-               result = True
+        if color == "white":
+            letters = ("H", "F")
         else:
-            result = False
+            letters = ("h", "f")
+
+        empty_home_squares = HOME_RANKS[color] & ~self.get_occupied()
+        for letter in letters:
+            piece_name = "hunter" if letter in ("H", "h") else "falcon"
+            if self.get_num_of_piece_on_board(color, piece_name) != 0:
+                continue
+            squares_left = empty_home_squares
+            while squares_left:
+                end = (squares_left & -squares_left).bit_length() - 1
+                squares_left &= squares_left - 1
+                entries.append((letter, SQUARE_IDS[end]))
+
+        return entries
+
+
+class BitBoard(Board):
+    """A BitBoard object is a chess board that answers all of the same questions as a Board object, but instead of a
+    list of 8 lists it keeps one 64 bit integer (a bitboard) for every (color, piece name) pair, including the hunter
+    and the falcon. Bit 0 is square "a8", bit 7 is "h8", bit 56 is "a1" and bit 63 is "h1", so the bit of a square
+    is row * 8 + col using the same rows and columns as Board. A list of 64 squares holding the Piece objects is kept
+    next to the bitboards so the piece on a square can be looked up directly. Checking that a path is clear is one
+    AND between the squares in between the two ids and the occupied squares instead of a walk along the board."""
 
-        return result
+    def create_new_board(self):
+        """starts every (color, piece name) bitboard at 0 and makes the 64 empty squares"""
 
+        self._bitboards = {}
+        for color in COLORS:
+            for piece_name in PIECE_NAMES:
+                self._bitboards[(color, piece_name)] = 0
+        self._squares = [None] * 64
+
+    def get_board(self):
+        """returns a new list of 8 lists holding the current pieces, laid out the same way as a Board. changing this
+        list does not change the board"""
+        return [self._squares[row * 8:row * 8 + 8] for row in range(8)]
+
+    def get_bitboard(self, color, piece_name):
+        """returns the bitboard of every square holding a piece of this color and name"""
+        return self._bitboards[(color, piece_name)]
+
+    def store_all_pieces(self, pieces):
+        """used by set_piece_codes to replace the squares and the bitboards with a list of 64 pieces (or None) in
+        square index order"""
+
+        self._squares = list(pieces)
+        for color_and_name in self._bitboards:
+            self._bitboards[color_and_name] = 0
+        for index, piece in enumerate(pieces):
+            if piece is not None:
+                self._bitboards[(piece.get_color(), piece.get_name())] |= 1 << index
+
+    def get_piece_at_index(self, index):
+        """returns the piece on the square index, or None"""
+        return self._squares[index]
+
+    def add_piece_at_index(self, index, piece):
+        """sets the bits for the piece at the square index. the square has to be empty"""
+
+        bit = 1 << index
+        color = piece.get_color()
+        self._bitboards[(color, piece.get_name())] |= bit
+        self._color_bitboards[color] |= bit
+        self._squares[index] = piece
+        self.hash_piece_on_square(index, piece)
+
+    def remove_piece_at_index(self, index):
+        """clears the bits for whatever piece is at the square index and returns that piece (or None)"""
+
+        piece = self._squares[index]
+        if piece is not None:
+            bit = 1 << index
+            color = piece.get_color()
+            self._bitboards[(color, piece.get_name())] ^= bit
+            self._color_bitboards[color] ^= bit
+            self._squares[index] = None
+            self.hash_piece_off_square(index, piece)
+        return piece
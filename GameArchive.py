@@ -0,0 +1,214 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file keeps many finished ChessVar games in one archive file that is read with mmap, so a single
+# game, or a single move of a game, can be looked up straight away without reading the games or moves before it. A
+# move is 2 bytes: the start and end square index, or 64 + the fairy number (H, F, h, f) and the square index for a
+# fairy entry. The file is laid out as:
+#
+#     header    8 byte ARCHIVE_MAGIC, number of games (8 bytes), where the index starts (8 bytes)
+#     games     for every game: the starting position (ChessVar.to_bytes), 2 bytes for every move, and the position
+#               after every CHECKPOINT_PLIES moves
+#     index     for every game: where the game starts (8 bytes), how many moves it has (4 bytes), its game state
+#               (1 byte) and 3 empty bytes
+#
+# Numbers are little endian. The position at any move is rebuilt from the checkpoint before it, so at most
+# CHECKPOINT_PLIES - 1 moves are played to get there.
+
+import mmap
+import struct
+
+from ChessVar import ChessVar, SQUARE_IDS, SQUARE_INDEX, POSITION_BYTES, FAIRY_LETTERS, is_fairy_entry
+from GameRecord import GameRecord, RESULTS, play_move
+
+ARCHIVE_MAGIC = b"CVARCH1\x00"
+HEADER = struct.Struct("<8sQQ")
+INDEX_ENTRY = struct.Struct("<QIB3x")
+MOVE_BYTES = 2
+CHECKPOINT_PLIES = 64
+
+GAME_STATES = ("UNFINISHED", "WHITE_WON", "BLACK_WON")
+# the fairy number of a letter is where it is in ChessVar.FAIRY_LETTERS ("HFhf"), which archive files depend on
+FAIRY_NUMBERS = {letter: number for number, letter in enumerate(FAIRY_LETTERS)}
+
+
+def encode_move(move):
+    """returns the 2 bytes of a move tuple like ("e2", "e4") or ("H", "b1")"""
+    if is_fairy_entry(move[0]):
+        return bytes((64 + FAIRY_NUMBERS[move[0]], SQUARE_INDEX[move[1]]))
+    return bytes((SQUARE_INDEX[move[0]], SQUARE_INDEX[move[1]]))
+
+
+def decode_move(first_byte, second_byte):
+    """returns the move tuple of the 2 bytes of a move"""
+    if first_byte >= 64:
+        return FAIRY_LETTERS[first_byte - 64], SQUARE_IDS[second_byte]
+    return SQUARE_IDS[first_byte], SQUARE_IDS[second_byte]
+
+
+class GameArchiveWriter:
+    """A GameArchiveWriter object makes a new archive file and adds games to it. close() has to be called (or the
+    writer used in a with statement) to write the index at the end"""
+
+    def __init__(self, path):
+        self._archive_file = open(path, "wb")
+        self._archive_file.write(HEADER.pack(ARCHIVE_MAGIC, 0, 0))
+        self._offset = HEADER.size
+        self._index = bytearray()
+        self._num_of_games = 0
+
+    def get_num_of_games(self):
+        """returns how many games have been added"""
+        return self._num_of_games
+
+    def add_game(self, moves, starting_game=None):
+        """plays the move tuples with make_move and enter_fairy_piece from the position of starting_game (the
+        starting position if it is None, starting_game is not changed) and adds the game to the archive. returns the
+        game's number. raises a ValueError naming the first move that is not allowed"""
+
+        if starting_game is None:
+            game = ChessVar()
+        else:
+            game = ChessVar.from_bytes(starting_game.to_bytes())
+
+        data = bytearray(game.to_bytes())
+        checkpoints = bytearray()
+        for ply, move in enumerate(moves):
+            if not play_move(game, move):
+                raise ValueError("move " + str(ply + 1) + " " + str(move) + " is not allowed")
+            data += encode_move(move)
+            if (ply + 1) % CHECKPOINT_PLIES == 0:
+                checkpoints += game.to_bytes()
+        data += checkpoints
+
+        self._archive_file.write(data)
+        self._index += INDEX_ENTRY.pack(self._offset, len(moves), GAME_STATES.index(game.get_game_state()))
+        self._offset += len(data)
+        self._num_of_games += 1
+        return self._num_of_games - 1
+
+    def add_record(self, record):
+        """adds a GameRecord to the archive and returns the game's number"""
+        starting_game = None
+        if "FEN" in record.get_tags():
+            starting_game = record.get_starting_game()
+        return self.add_game(record.get_moves(), starting_game)
+
+    def close(self):
+        """writes the index and the header and closes the file"""
+        self._archive_file.write(self._index)
+        self._archive_file.seek(0)
+        self._archive_file.write(HEADER.pack(ARCHIVE_MAGIC, self._num_of_games, self._offset))
+        self._archive_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class GameArchive:
+    """A GameArchive object opens an archive file made by GameArchiveWriter with mmap. Games are looked up by their
+    number (0 is the first game added) and moves by their ply (0 is the first move). Can be used in a with statement
+    to close the file at the end"""
+
+    def __init__(self, path):
+        self._archive_file = open(path, "rb")
+        self._data = mmap.mmap(self._archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._num_of_games, self._index_offset = HEADER.unpack_from(self._data, 0)
+        if magic != ARCHIVE_MAGIC:
+            self.close()
+            raise ValueError(path + " is not a ChessVar game archive")
+
+    def get_num_of_games(self):
+        """returns how many games are in the archive"""
+        return self._num_of_games
+
+    def get_index_entry(self, game_number):
+        """returns (where the game starts, how many moves it has, its game state number) for the game"""
+        if not 0 <= game_number < self._num_of_games:
+            raise IndexError("there is no game " + str(game_number) + " in the archive")
+        return INDEX_ENTRY.unpack_from(self._data, self._index_offset + game_number * INDEX_ENTRY.size)
+
+    def get_num_of_plies(self, game_number):
+        """returns how many moves the game has"""
+        return self.get_index_entry(game_number)[1]
+
+    def get_game_state(self, game_number):
+        """returns the game state at the end of the game: "UNFINISHED", "WHITE_WON" or "BLACK_WON" """
+        return GAME_STATES[self.get_index_entry(game_number)[2]]
+
+    def get_move(self, game_number, ply):
+        """returns the move tuple played at the ply (0 is the first move) of the game"""
+
+        offset, num_of_plies, _ = self.get_index_entry(game_number)
+        if not 0 <= ply < num_of_plies:
+            raise IndexError("game " + str(game_number) + " has no move " + str(ply))
+        move_offset = offset + POSITION_BYTES + ply * MOVE_BYTES
+        return decode_move(self._data[move_offset], self._data[move_offset + 1])
+
+    def get_moves(self, game_number):
+        """returns a list of every move tuple of the game"""
+
+        offset, num_of_plies, _ = self.get_index_entry(game_number)
+        moves_start = offset + POSITION_BYTES
+        encoded_moves = self._data[moves_start:moves_start + num_of_plies * MOVE_BYTES]
+        return [decode_move(encoded_moves[position], encoded_moves[position + 1])
+                for position in range(0, len(encoded_moves), MOVE_BYTES)]
+
+    def get_position_bytes(self, game_number, ply):
+        """returns the position (ChessVar.to_bytes) of the checkpoint at or before the ply, and the ply it is at.
+        ply 0 is the starting position and ply n is the position after n moves"""
+
+        offset, num_of_plies, _ = self.get_index_entry(game_number)
+        if not 0 <= ply <= num_of_plies:
+            raise IndexError("game " + str(game_number) + " has no ply " + str(ply))
+        checkpoint = ply // CHECKPOINT_PLIES
+        if checkpoint == 0:
+            position_offset = offset
+        else:
+            position_offset = offset + POSITION_BYTES + num_of_plies * MOVE_BYTES + (checkpoint - 1) * POSITION_BYTES
+        return self._data[position_offset:position_offset + POSITION_BYTES], checkpoint * CHECKPOINT_PLIES
+
+    def get_game(self, game_number, ply=None, engine="list"):
+        """returns a new ChessVar at the position after ply moves of the game (the end of the game if ply is None),
+        using the engine for its board. the moves after the checkpoint are played with ChessVar.make, so they can be
+        taken back with unmake"""
+
+        if ply is None:
+            ply = self.get_num_of_plies(game_number)
+        position, checkpoint_ply = self.get_position_bytes(game_number, ply)
+        game = ChessVar.from_bytes(position, engine)
+        for move_ply in range(checkpoint_ply, ply):
+            game.make(self.get_move(game_number, move_ply))
+        return game
+
+    def replay(self, game_number, engine="list"):
+        """goes through the game one move at a time, yielding (move, game) after each move is played on the same
+        ChessVar. nothing is played until the next position is asked for"""
+
+        game = self.get_game(game_number, 0, engine)
+        for move in self.get_moves(game_number):
+            game.make(move)
+            yield move, game
+
+    def get_record(self, game_number):
+        """returns the game as a GameRecord, with a FEN tag if it does not start from the starting position"""
+
+        tags = {}
+        starting_game = self.get_game(game_number, 0)
+        if starting_game.to_bytes() != ChessVar().to_bytes():
+            tags["FEN"] = starting_game.to_fen()
+        return GameRecord(self.get_moves(game_number), tags, RESULTS[self.get_game_state(game_number)])
+
+    def close(self):
+        """closes the archive file"""
+        self._data.close()
+        self._archive_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
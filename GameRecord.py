@@ -0,0 +1,243 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file reads and writes records of ChessVar games in a PGN-like text format. Every game is a few tag
+# lines like [White "ally"], a blank line, the moves, and a blank line after it:
+#
+#     [Event "club night"]
+#     [Result "1-0"]
+#
+#     1. e2e4 e7e5 2. H@b1 d7d5 ... 1-0
+#
+# A move is the start and end square ids ("e2e4") and a fairy entry is the fairy letter, "@" and the square id
+# ("H@b1", "f@g8"). The moves end with the result: "1-0" (WHITE_WON), "0-1" (BLACK_WON) or "*" (UNFINISHED). A
+# [FEN "..."] tag starts the game from that position (see ChessVar.from_fen) instead of the starting position. Text in
+# {braces} is a comment and is skipped. read_games goes through a file one line at a time and gives back one game at
+# a time, so a file of any size can be read with the memory of a single game, and GameRecordWriter adds games to the
+# end of a file.
+
+from ChessVar import ChessVar, SQUARE_INDEX, is_fairy_entry
+
+# the result at the end of the moves for every game state
+RESULTS = {"WHITE_WON": "1-0", "BLACK_WON": "0-1", "UNFINISHED": "*"}
+GAME_STATES_FROM_RESULTS = {result: game_state for game_state, result in RESULTS.items()}
+
+# the longest line of moves the writer makes
+MOVE_LINE_LENGTH = 79
+
+
+class GameRecord:
+    """A GameRecord object is one recorded game: its tags (a dict like {"White": "ally"}), its moves as tuples like
+    ("e2", "e4") or ("H", "b1") (the same tuples ChessVar.legal_moves returns) and its result ("1-0", "0-1" or
+    "*")"""
+
+    def __init__(self, moves=None, tags=None, result="*"):
+        if moves is None:
+            moves = []
+        if tags is None:
+            tags = {}
+        self._moves = moves
+        self._tags = tags
+        self._result = result
+
+    def get_moves(self):
+        """returns the list of moves"""
+        return self._moves
+
+    def get_tags(self):
+        """returns the dict of tags"""
+        return self._tags
+
+    def get_result(self):
+        """returns "1-0", "0-1" or "*" """
+        return self._result
+
+    def set_result(self, result):
+        """takes in "1-0", "0-1" or "*" and makes it the result of the game"""
+        if result not in GAME_STATES_FROM_RESULTS:
+            raise ValueError("result has to be '1-0', '0-1' or '*', not " + repr(result))
+        self._result = result
+
+    def add_move(self, move):
+        """adds a move tuple to the end of the moves"""
+        self._moves.append(move)
+
+    def get_starting_game(self, engine="list"):
+        """returns a new ChessVar at the position the game starts from, using the engine for its board"""
+        if "FEN" in self._tags:
+            return ChessVar.from_fen(self._tags["FEN"], engine)
+        return ChessVar(engine)
+
+    def replay(self, engine="list"):
+        """plays every move with make_move and enter_fairy_piece and returns the ChessVar at the end. raises a
+        ValueError naming the first move that is not allowed"""
+
+        game = self.get_starting_game(engine)
+        for ply, move in enumerate(self._moves):
+            if not play_move(game, move):
+                raise ValueError("move " + str(ply + 1) + " " + move_to_text(move) + " is not allowed")
+        return game
+
+    def to_text(self):
+        """returns the game as record text, ending with a blank line"""
+
+        lines = []
+        for name, value in self._tags.items():
+            lines.append("[" + name + ' "' + value.replace("\\", "\\\\").replace('"', '\\"') + '"]')
+        lines.append("")
+
+        # a game that starts with black to move starts at "1..." instead of "1."
+        first_ply = 0
+        if "FEN" in self._tags and self._tags["FEN"].split()[1:2] == ["b"]:
+            first_ply = 1
+
+        line = ""
+        for ply, move in enumerate(self._moves, first_ply):
+            token = move_to_text(move)
+            if ply % 2 == 0:
+                token = str(ply // 2 + 1) + ". " + token
+            elif ply == first_ply:
+                token = str(ply // 2 + 1) + "... " + token
+            if line and len(line) + 1 + len(token) > MOVE_LINE_LENGTH:
+                lines.append(line)
+                line = token
+            elif line:
+                line += " " + token
+            else:
+                line = token
+        if line and len(line) + 1 + len(self._result) > MOVE_LINE_LENGTH:
+            lines.append(line)
+            line = self._result
+        elif line:
+            line += " " + self._result
+        else:
+            line = self._result
+        lines.append(line)
+        lines.append("")
+        return "\n".join(lines) + "\n"
+
+
+def play_move(game, move):
+    """plays a move tuple on a ChessVar with make_move or enter_fairy_piece (see ChessVar.is_fairy_entry) and returns
+    what it returned"""
+    if is_fairy_entry(move[0]):
+        return game.enter_fairy_piece(move[0], move[1])
+    return game.make_move(move[0], move[1])
+
+
+def move_to_text(move):
+    """returns the record text of a move tuple, like "e2e4" or "H@b1" """
+    if len(move[0]) == 1:
+        return move[0] + "@" + move[1]
+    return move[0] + move[1]
+
+
+def text_to_move(text):
+    """returns the move tuple of record text like "e2e4" or "H@b1". raises a ValueError if it is not a move"""
+
+    if len(text) == 4 and text[1] == "@" and text[0] in "HFhf" and text[2:] in SQUARE_INDEX:
+        return text[0], text[2:]
+    if len(text) == 4 and text[:2] in SQUARE_INDEX and text[2:] in SQUARE_INDEX:
+        return text[:2], text[2:]
+    raise ValueError("not a move: " + repr(text))
+
+
+def parse_tag(line):
+    """returns the (name, value) of a tag line like [White "ally"]. raises a ValueError if it is not a tag"""
+
+    line = line.strip()
+    space = line.find(" ")
+    if not line.startswith("[") or not line.endswith('"]') or space == -1 or line[space + 1:space + 2] != '"':
+        raise ValueError("not a tag: " + repr(line))
+
+    value = []
+    escaped = False
+    for letter in line[space + 2:-2]:
+        if escaped:
+            value.append(letter)
+            escaped = False
+        elif letter == "\\":
+            escaped = True
+        else:
+            value.append(letter)
+    return line[1:space], "".join(value)
+
+
+def read_games(path):
+    """goes through the record file at the path and yields a GameRecord for every game in it, one at a time"""
+    with open(path, encoding="utf-8") as record_file:
+        yield from read_games_from_file(record_file)
+
+
+def read_games_from_file(record_file):
+    """goes through an open record file (or any iterable of lines) and yields a GameRecord for every game in it, one
+    at a time. raises a ValueError with the line number for text that is not a game record"""
+
+    record = None
+    in_comment = False
+    for line_number, line in enumerate(record_file, 1):
+        try:
+            if not in_comment and line.startswith("["):
+                if record is not None and record.get_moves():
+                    raise ValueError("tag after the moves, the game has no result")
+                if record is None:
+                    record = GameRecord()
+                name, value = parse_tag(line)
+                record.get_tags()[name] = value
+                continue
+
+            for token in line.split():
+                if in_comment:
+                    if token.endswith("}"):
+                        in_comment = False
+                    continue
+                if token.startswith("{"):
+                    in_comment = not token.endswith("}")
+                    continue
+                if record is None:
+                    record = GameRecord()
+                if token in GAME_STATES_FROM_RESULTS:
+                    record.set_result(token)
+                    yield record
+                    record = None
+                    continue
+                # move numbers like "12." or "12..." are only there to read
+                if token[0].isdigit() and token.endswith("."):
+                    continue
+                record.add_move(text_to_move(token))
+        except ValueError as error:
+            raise ValueError("line " + str(line_number) + ": " + str(error)) from None
+
+    if record is not None:
+        raise ValueError("the last game has no result")
+
+
+class GameRecordWriter:
+    """A GameRecordWriter object adds games to the end of a record file, making the file if it is not there yet. It
+    can be used in a with statement to close the file at the end"""
+
+    def __init__(self, path):
+        self._record_file = open(path, "a", encoding="utf-8")
+
+    def write_game(self, record):
+        """adds the GameRecord to the end of the file"""
+        self._record_file.write(record.to_text())
+
+    def write_chess_var(self, game, moves, tags=None):
+        """adds a game played on a ChessVar to the end of the file, with the moves that were played and the result
+        from its game state"""
+        self.write_game(GameRecord(list(moves), dict(tags or {}), RESULTS[game.get_game_state()]))
+
+    def flush(self):
+        """makes sure everything written so far is in the file"""
+        self._record_file.flush()
+
+    def close(self):
+        """closes the file"""
+        self._record_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,415 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file hosts many ChessVar games in one process with an asyncio server that clients talk to over
+# TCP, one line of text at a time. Every command gets a line back that starts with "OK" or "ERR":
+#
+#     NEW                       makes a game at the starting position          OK <game id>
+#     NEW <fen>                 makes a game at the FEN position and watches   OK <game id>
+#     PLAY <game id> <color>    plays "white" or "black" in the game           OK <fen>
+#     WATCH <game id>           hears about every change to the game           OK <fen>
+#     UNWATCH <game id>         stops hearing about the game                   OK
+#     MOVE <game id> <move>     makes a move like e2e4 or H@b1                 OK, or ERR <reason>
+#     BOARD <game id>           asks for the position                          OK <fen>
+#     QUIT                      closes the connection                          OK
+#
+# The reason of a move that is not allowed is one of REJECTION_REASONS in ChessVar.py, NOT_SEATED if nobody plays
+# the color whose turn it is yet, or NOT_YOUR_TURN if it is played by another connection. The connection that makes
+# a game with NEW watches it, and a game stops being hosted once nobody plays or watches it, so games can't pile up
+# after their clients leave. A connection can play or watch at most MAX_GAMES_PER_CONNECTION games at a time.
+# Players and watchers of a game are sent a line for every change:
+#
+#     DELTA <game id> <player to move> <square>:<piece> ...     squares that changed, "-" for an empty square and a
+#                                                               FEN letter for a piece, like "DELTA 4 black e2:- e4:P"
+#     END <game id> <game state>                                a king was captured
+#
+# A command is handled from start to end without waiting on anything, so the moves of a game are always made one at
+# a time in the order they came in without any lock. Every connection has a queue of lines to send. A client that
+# sends commands faster than it reads the answers fills its own queue, and its commands are not read until there is
+# room again. The changes of a game are sent without waiting, so a watcher that falls MAX_QUEUED_LINES lines behind
+# is disconnected so it can't hold up the game. Players are watchers too and are disconnected the same way: the
+# waiting above only holds back a client's own commands, never the other player's moves. Run
+# "python GameServer.py --port 8765" to start a server. GameClient can talk to a server from the same program, for
+# example in tests.
+
+import argparse
+import asyncio
+import itertools
+
+from ChessVar import ChessVar, FEN_LETTERS, COLORS
+from GameRecord import text_to_move, play_move
+
+# how many lines can wait to be sent to a connection
+MAX_QUEUED_LINES = 256
+
+# the longest command line read from a client
+MAX_LINE_BYTES = 4096
+
+# how many games one connection can play or watch at a time
+MAX_GAMES_PER_CONNECTION = 64
+
+
+class ServerGame:
+    """A ServerGame object is a game hosted by the server: the ChessVar, the connections playing each color and the
+    connections that get its changes (players and watchers)"""
+
+    def __init__(self, game_id, game):
+        self._game_id = game_id
+        self._game = game
+        self._players = {"white": None, "black": None}
+        self._watchers = set()
+        self._changed_squares = []
+        game.add_event_listener(self.hear_event)
+
+    def get_game_id(self):
+        """returns the id of the game"""
+        return self._game_id
+
+    def get_chess_var(self):
+        """returns the ChessVar of the game"""
+        return self._game
+
+    def get_player(self, color):
+        """returns the connection playing the color, or None"""
+        return self._players[color]
+
+    def set_player(self, color, connection):
+        """makes the connection (or None) play the color"""
+        self._players[color] = connection
+
+    def get_watchers(self):
+        """returns the set of connections that get the changes of the game"""
+        return self._watchers
+
+    def hear_event(self, game, event):
+        """the event listener of the ChessVar. keeps the squares that changed"""
+
+        event_type = event["type"]
+        if event_type == "MOVE" or event_type == "FAIRY_ENTRY":
+            letter = FEN_LETTERS[event["piece"]]
+            if event["color"] == "white":
+                letter = letter.upper()
+            if event_type == "MOVE":
+                self._changed_squares.append(event["move"][0] + ":-")
+            self._changed_squares.append(event["move"][1] + ":" + letter)
+
+    def make_move(self, connection, move):
+        """makes the move for the connection and sends the changes to the watchers. returns None if the move was
+        made, or the reason it was not allowed"""
+
+        # only the connection that plays the color whose turn it is can move, so nobody moves for an empty seat
+        player = self._players[self._game.get_current_player_turn()]
+        if player is None:
+            return "NOT_SEATED"
+        if player is not connection:
+            return "NOT_YOUR_TURN"
+
+        self._changed_squares = []
+        if not play_move(self._game, move):
+            return self._game.get_rejection_reason()
+
+        self.send_to_watchers("DELTA " + self._game_id + " " + self._game.get_current_player_turn() + " " +
+                              " ".join(self._changed_squares))
+        if self._game.get_game_state() != "UNFINISHED":
+            self.send_to_watchers("END " + self._game_id + " " + self._game.get_game_state())
+        return None
+
+    def send_to_watchers(self, line):
+        """adds the line to the queue of every watcher (players included), disconnecting the ones that are too far
+        behind"""
+        for connection in list(self._watchers):
+            connection.send_or_drop(line)
+
+
+class Connection:
+    """A Connection object is a client connected to the server. Lines sent to it go in a queue and a task writes them
+    out, waiting for the client to read them"""
+
+    def __init__(self, server, reader, writer):
+        self._server = server
+        self._reader = reader
+        self._writer = writer
+        self._lines = asyncio.Queue(MAX_QUEUED_LINES)
+        self._games = set()
+        self._closed = False
+
+    def get_games(self):
+        """returns the set of ServerGames the connection plays or watches"""
+        return self._games
+
+    async def send(self, line):
+        """adds a line to the queue, waiting until there is room"""
+        await self._lines.put(line)
+
+    def send_or_drop(self, line):
+        """adds a line to the queue if there is room, and disconnects the client if there is not"""
+        if self._closed:
+            return
+        try:
+            self._lines.put_nowait(line)
+        except asyncio.QueueFull:
+            self.close()
+
+    async def write_lines(self):
+        """writes out the lines in the queue until the connection is closed"""
+        try:
+            while True:
+                line = await self._lines.get()
+                if line is None:
+                    break
+                self._writer.write(line.encode() + b"\n")
+                await self._writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._closed = True
+            self._writer.close()
+
+    async def read_commands(self):
+        """reads the client's command lines and answers each one until the client leaves"""
+
+        writing = asyncio.ensure_future(self.write_lines())
+        try:
+            while not self._closed:
+                try:
+                    line = await self._reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                answer = self._server.run_command(self, line.decode(errors="replace").split())
+                if self._closed:
+                    break
+                await self.send(answer)
+                if answer == "OK" and line.strip().upper() == b"QUIT":
+                    break
+        finally:
+            self._server.remove_connection(self)
+            if not self._closed:
+                # let the lines still in the queue go out first, unless the client is gone
+                self._closed = True
+                sending_end = asyncio.ensure_future(self.send(None))
+                await asyncio.wait((sending_end, writing), return_when=asyncio.FIRST_COMPLETED)
+                sending_end.cancel()
+            await writing
+
+    def close(self):
+        """stops the connection. lines still in the queue are not sent"""
+        if self._closed:
+            return
+        self._closed = True
+        self._server.remove_connection(self)
+        # make room for the line that stops write_lines
+        while not self._lines.empty():
+            self._lines.get_nowait()
+        self._lines.put_nowait(None)
+        self._writer.transport.abort()
+
+
+class GameServer:
+    """A GameServer object hosts games for the clients connected to it. start() starts listening and close() stops
+    it"""
+
+    def __init__(self):
+        self._games = {}
+        self._game_ids = itertools.count(1)
+        # the task talking to each connected client
+        self._connections = {}
+        self._server = None
+
+    def get_game(self, game_id):
+        """returns the ServerGame with the id, or None"""
+        return self._games.get(game_id)
+
+    def get_num_of_games(self):
+        """returns how many games are hosted"""
+        return len(self._games)
+
+    async def start(self, host="127.0.0.1", port=0):
+        """starts listening on the host and port (any free port if it is 0) and returns the port"""
+        self._server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """keeps listening until the server is closed"""
+        await self._server.serve_forever()
+
+    async def close(self):
+        """stops listening and disconnects every client"""
+        self._server.close()
+        tasks = list(self._connections.values())
+        for connection in list(self._connections):
+            connection.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        """talks to a new client until it leaves"""
+        connection = Connection(self, reader, writer)
+        self._connections[connection] = asyncio.current_task()
+        try:
+            await connection.read_commands()
+        finally:
+            del self._connections[connection]
+
+    def add_game(self, game):
+        """starts hosting the ChessVar and returns its ServerGame"""
+        game_id = str(next(self._game_ids))
+        server_game = ServerGame(game_id, game)
+        self._games[game_id] = server_game
+        return server_game
+
+    def remove_connection(self, connection):
+        """takes the connection out of every game it plays or watches. a game nobody plays or watches anymore stops
+        being hosted"""
+
+        for server_game in connection.get_games():
+            self.remove_watcher(server_game, connection)
+        connection.get_games().clear()
+
+    def add_watcher(self, server_game, connection):
+        """makes the connection get the changes of the game"""
+        server_game.get_watchers().add(connection)
+        connection.get_games().add(server_game)
+
+    def remove_watcher(self, server_game, connection):
+        """stops the connection playing or watching the game, and stops hosting the game if nobody plays or watches
+        it anymore. the game is left in the connection's set of games"""
+
+        server_game.get_watchers().discard(connection)
+        for color in COLORS:
+            if server_game.get_player(color) is connection:
+                server_game.set_player(color, None)
+        if not server_game.get_watchers():
+            self._games.pop(server_game.get_game_id(), None)
+
+    def run_command(self, connection, words):
+        """runs a command line split into words for the connection and returns the line to answer with"""
+
+        if not words:
+            return "ERR EMPTY_COMMAND"
+        command = words[0].upper()
+
+        if command == "NEW":
+            if len(connection.get_games()) >= MAX_GAMES_PER_CONNECTION:
+                return "ERR TOO_MANY_GAMES"
+            if len(words) == 1:
+                game = ChessVar()
+            else:
+                try:
+                    game = ChessVar.from_fen(" ".join(words[1:]))
+                except ValueError:
+                    return "ERR BAD_FEN"
+            # the connection that made the game watches it, so the game goes away with it if nobody else joins
+            server_game = self.add_game(game)
+            self.add_watcher(server_game, connection)
+            return "OK " + server_game.get_game_id()
+        if command == "QUIT":
+            return "OK"
+        if command not in ("PLAY", "WATCH", "UNWATCH", "MOVE", "BOARD"):
+            return "ERR UNKNOWN_COMMAND"
+        if len(words) != (3 if command in ("PLAY", "MOVE") else 2):
+            return "ERR WRONG_NUMBER_OF_WORDS"
+
+        server_game = self._games.get(words[1])
+        if server_game is None:
+            return "ERR NO_SUCH_GAME"
+
+        if command == "BOARD":
+            return "OK " + server_game.get_chess_var().to_fen()
+        if command == "MOVE":
+            try:
+                move = text_to_move(words[2])
+            except ValueError:
+                return "ERR BAD_MOVE_TEXT"
+            reason = server_game.make_move(connection, move)
+            if reason is not None:
+                return "ERR " + reason
+            return "OK"
+        if command == "PLAY":
+            color = words[2].lower()
+            if color not in COLORS:
+                return "ERR BAD_COLOR"
+            if server_game.get_player(color) not in (None, connection):
+                return "ERR COLOR_TAKEN"
+        if command == "UNWATCH":
+            self.remove_watcher(server_game, connection)
+            connection.get_games().discard(server_game)
+            return "OK"
+
+        # PLAY and WATCH
+        if server_game not in connection.get_games() and len(connection.get_games()) >= MAX_GAMES_PER_CONNECTION:
+            return "ERR TOO_MANY_GAMES"
+        if command == "PLAY":
+            server_game.set_player(color, connection)
+        self.add_watcher(server_game, connection)
+        return "OK " + server_game.get_chess_var().to_fen()
+
+
+class GameClient:
+    """A GameClient object talks to a GameServer. request() sends a command and returns the answer, and the DELTA and
+    END lines that come in meanwhile are kept for read_update()"""
+
+    def __init__(self):
+        self._reader = None
+        self._writer = None
+        self._updates = asyncio.Queue()
+
+    async def connect(self, host="127.0.0.1", port=8765):
+        """connects to the server"""
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+
+    async def read_line(self):
+        """returns the next line from the server without the newline, or None if the server closed the connection"""
+        line = await self._reader.readline()
+        if not line:
+            return None
+        return line.decode().rstrip("\n")
+
+    async def request(self, command):
+        """sends the command line and returns the answer line (starting with "OK" or "ERR"), or None if the server
+        closed the connection"""
+
+        self._writer.write(command.encode() + b"\n")
+        await self._writer.drain()
+        while True:
+            line = await self.read_line()
+            if line is None or line == "OK" or line.startswith("OK ") or line.startswith("ERR "):
+                return line
+            await self._updates.put(line)
+
+    async def read_update(self):
+        """returns the next DELTA or END line, waiting for one if there is none yet. returns None if the server closed
+        the connection"""
+        if not self._updates.empty():
+            return self._updates.get_nowait()
+        return await self.read_line()
+
+    async def close(self):
+        """closes the connection"""
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def run_server(host, port):
+    """runs a GameServer until the program is stopped"""
+    server = GameServer()
+    port = await server.start(host, port)
+    print("hosting ChessVar games on", host, "port", port)
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="host ChessVar games over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    arguments = parser.parse_args()
+    try:
+        asyncio.run(run_server(arguments.host, arguments.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file times the ChessVar rule checks, to find out which pieces and which rules make moves slow.
+# enable() swaps the methods in INSTRUMENTED_METHODS for ones that time every call into a histogram, count the calls
+# and the calls that returned False, and count why ChessVar.make_move and enter_fairy_piece said no (see
+# ChessVar.get_rejection_reason). disable() puts the real methods back, so nothing is timed or counted and nothing
+# costs anything while instrumentation is off. The numbers can be read as a dict with get_snapshot() or as text in the
+# Prometheus format with to_prometheus_text():
+#
+#     import Instrumentation
+#     Instrumentation.enable()
+#     ... play games ...
+#     print(Instrumentation.to_prometheus_text())
+#     Instrumentation.disable()
+#
+# The moves are timed in ChessVar.make_move_by_index and enter_fairy_piece_by_index, which make_move and
+# enter_fairy_piece call once the square ids are turned into indexes, and which BatchMoves plays through directly
+# (ShardedHost and GameServer call make_move and enter_fairy_piece). Their numbers are named "ChessVar.make_move" and
+# "ChessVar.enter_fairy_piece". make_move and enter_fairy_piece are timed too, but only add a call when a square id
+# was not on the board and the _by_index method never ran, so no call is counted twice. The time of
+# "ChessVar.make_move" includes everything it checks, and the time of "ChessVar.enter_fairy_piece" includes the fairy
+# checks (home rank, empty square, number of major pieces), which are not timed on their own. The REACHABLE_SQUARES
+# check that turns down a move before the piece is asked is also timed on its own as "Piece.can_reach", and its
+# false results are the moves it turned down. The piece methods are the make_move_by_index of every Piece class,
+# which ChessVar.make_move_by_index uses to check a piece's move, and they are named like "Knight.make_move" in the
+# numbers. In the same way the path checks are the _by_index methods that is_up_down_left_right_valid and
+# is_diag_up_down_left_right_valid call.
+
+import time
+
+from ChessVar import ChessVar, Board, Piece, Pawn, Rook, Knight, Bishop, Queen, King, Fairy
+
+# (class, method name, name in the numbers) of every method that is timed
+INSTRUMENTED_METHODS = [
+    (ChessVar, "make_move_by_index", "ChessVar.make_move"),
+    (ChessVar, "enter_fairy_piece_by_index", "ChessVar.enter_fairy_piece"),
+    (ChessVar, "make_move", "ChessVar.make_move"),
+    (ChessVar, "enter_fairy_piece", "ChessVar.enter_fairy_piece"),
+    (Piece, "can_reach_by_index", "Piece.can_reach"),
+    (Pawn, "make_move_by_index", "Pawn.make_move"),
+    (Rook, "make_move_by_index", "Rook.make_move"),
+    (Knight, "make_move_by_index", "Knight.make_move"),
+    (Bishop, "make_move_by_index", "Bishop.make_move"),
+    (Queen, "make_move_by_index", "Queen.make_move"),
+    (King, "make_move_by_index", "King.make_move"),
+    (Fairy, "make_move_by_index", "Fairy.make_move"),
+    (Board, "is_up_down_left_right_valid_by_index", "Board.is_up_down_left_right_valid"),
+    (Board, "is_diag_up_down_left_right_valid_by_index", "Board.is_diag_up_down_left_right_valid"),
+]
+
+# the (class, method name) of the methods whose rejection reasons are counted
+MOVE_METHODS = ((ChessVar, "make_move_by_index"), (ChessVar, "enter_fairy_piece_by_index"))
+
+# the (class, method name) of the methods that only add a call when the _by_index method they call did not run
+SQUARE_ID_METHODS = ((ChessVar, "make_move"), (ChessVar, "enter_fairy_piece"))
+
+# the upper bounds of the histogram buckets, in seconds
+BUCKET_BOUNDS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, float("inf"))
+
+# the real methods while instrumentation is on, as (class, method name, method)
+_real_methods = []
+
+# the Histogram of every name in INSTRUMENTED_METHODS
+_histograms = {}
+
+
+class Histogram:
+    """A Histogram object counts how many calls took up to each of the BUCKET_BOUNDS, how many calls there were in
+    all, how many returned False, the reasons of the rejected moves and the total seconds"""
+
+    def __init__(self):
+        self._bucket_counts = [0] * len(BUCKET_BOUNDS)
+        self._num_of_calls = 0
+        self._num_of_false_results = 0
+        self._seconds = 0.0
+        self._rejection_reasons = {}
+
+    def add_call(self, seconds, result):
+        """adds a call that took the seconds and returned the result"""
+
+        self._num_of_calls += 1
+        self._seconds += seconds
+        if result is False:
+            self._num_of_false_results += 1
+        for bucket, bound in enumerate(BUCKET_BOUNDS):
+            if seconds <= bound:
+                self._bucket_counts[bucket] += 1
+                break
+
+    def get_num_of_calls(self):
+        """returns how many calls were added"""
+        return self._num_of_calls
+
+    def add_rejection_reason(self, reason):
+        """counts a rejected move's reason"""
+        self._rejection_reasons[reason] = self._rejection_reasons.get(reason, 0) + 1
+
+    def get_snapshot(self):
+        """returns the numbers as a dict. "buckets" has the number of calls that took up to each bound (so the last
+        one is every call), like a Prometheus histogram"""
+
+        buckets = {}
+        total = 0
+        for bound, count in zip(BUCKET_BOUNDS, self._bucket_counts):
+            total += count
+            buckets[bound] = total
+        return {"calls": self._num_of_calls, "false_results": self._num_of_false_results, "seconds": self._seconds,
+                "buckets": buckets, "rejection_reasons": dict(self._rejection_reasons)}
+
+
+def make_timed_method(method, histogram, counts_reasons, takes_square_ids=False):
+    """returns a method that calls the method and adds the call to the histogram, and the rejection reason if
+    counts_reasons is True and the method returned False. if takes_square_ids is True the call is only added when
+    no other call was added to the histogram meanwhile (the _by_index method it calls adds its own)"""
+
+    perf_counter = time.perf_counter
+
+    if takes_square_ids:
+        def timed_square_id_method(game, *arguments):
+            start_time = perf_counter()
+            num_of_calls = histogram.get_num_of_calls()
+            result = method(game, *arguments)
+            if histogram.get_num_of_calls() == num_of_calls:
+                histogram.add_call(perf_counter() - start_time, result)
+                if result is False:
+                    histogram.add_rejection_reason(game.get_rejection_reason())
+            return result
+        return timed_square_id_method
+
+    if counts_reasons:
+        def timed_move_method(game, *arguments):
+            start_time = perf_counter()
+            result = method(game, *arguments)
+            histogram.add_call(perf_counter() - start_time, result)
+            if result is False:
+                histogram.add_rejection_reason(game.get_rejection_reason())
+            return result
+        return timed_move_method
+
+    def timed_method(*arguments):
+        start_time = perf_counter()
+        result = method(*arguments)
+        histogram.add_call(perf_counter() - start_time, result)
+        return result
+    return timed_method
+
+
+def is_enabled():
+    """returns True while the methods are being timed"""
+    return bool(_real_methods)
+
+
+def enable():
+    """starts timing every method in INSTRUMENTED_METHODS. the numbers from before are kept"""
+
+    if is_enabled():
+        return
+    for a_class, method_name, name in INSTRUMENTED_METHODS:
+        if name not in _histograms:
+            _histograms[name] = Histogram()
+        method = a_class.__dict__[method_name]
+        _real_methods.append((a_class, method_name, method))
+        timed_method = make_timed_method(method, _histograms[name], (a_class, method_name) in MOVE_METHODS,
+                                         (a_class, method_name) in SQUARE_ID_METHODS)
+        setattr(a_class, method_name, timed_method)
+
+
+def disable():
+    """puts the real methods back. the numbers are kept until reset()"""
+    while _real_methods:
+        a_class, method_name, method = _real_methods.pop()
+        setattr(a_class, method_name, method)
+
+
+def reset():
+    """forgets every number"""
+    for name in _histograms:
+        _histograms[name] = Histogram()
+    # methods that are timed right now keep adding to the histogram they were made with
+    if is_enabled():
+        disable()
+        enable()
+
+
+def get_snapshot():
+    """returns a dict of the numbers (see Histogram.get_snapshot) of every method that was timed"""
+    return {name: histogram.get_snapshot() for name, histogram in _histograms.items()}
+
+
+def to_prometheus_text():
+    """returns the numbers as text in the Prometheus exposition format"""
+
+    snapshot = get_snapshot()
+    lines = ["# HELP chessvar_call_seconds Seconds a ChessVar rule check took.",
+             "# TYPE chessvar_call_seconds histogram"]
+    for name, numbers in snapshot.items():
+        for bound, count in numbers["buckets"].items():
+            bound_text = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append('chessvar_call_seconds_bucket{function="%s",le="%s"} %d' % (name, bound_text, count))
+        lines.append('chessvar_call_seconds_sum{function="%s"} %r' % (name, numbers["seconds"]))
+        lines.append('chessvar_call_seconds_count{function="%s"} %d' % (name, numbers["calls"]))
+
+    lines.append("# HELP chessvar_false_results_total Calls of a ChessVar rule check that returned False.")
+    lines.append("# TYPE chessvar_false_results_total counter")
+    for name, numbers in snapshot.items():
+        lines.append('chessvar_false_results_total{function="%s"} %d' % (name, numbers["false_results"]))
+
+    lines.append("# HELP chessvar_rejections_total Moves make_move or enter_fairy_piece said no to, by reason.")
+    lines.append("# TYPE chessvar_rejections_total counter")
+    for name, numbers in snapshot.items():
+        for reason, count in sorted(numbers["rejection_reasons"].items()):
+            lines.append('chessvar_rejections_total{function="%s",reason="%s"} %d' % (name, reason, count))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,269 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file runs the alpha-beta search of Search.py on a pool of worker processes with lazy SMP: every
+# worker searches the whole root position, one move deeper at a time, and all of them use the same transposition
+# table kept in shared memory. A worker that finds a position already searched by another worker uses that result
+# instead of searching it again, so together they finish each depth sooner than one process would. To make the
+# workers look at different positions, every other worker skips the first depth and is always one depth ahead. A
+# find_best_move sends each worker one task (the 89 byte position from ChessVar.to_bytes, never a pickled ChessVar)
+# and every worker keeps its Search from one move to the next, so what carries over is its history scores and the
+# shared transposition table. Killer moves are forgotten at the start of every search, the same as with Search.
+# When the first worker is done the others are stopped through a shared flag, and the move of the deepest finished
+# depth is played. How fast this is depends on the number of cores: with one core the workers only take turns, so it
+# is no faster than Search. Run "python ParallelSearch.py --depth 4" to time it against Search on the perft positions.
+#
+# The shared table has a fixed number of slots of two 64 bit numbers and a position goes in slot (zobrist hash %
+# number of slots), replacing whatever was there. The first number is the zobrist hash xor the second number, so an
+# entry that was half written by one process while another one read it does not match its hash and is skipped
+# (lockless hashing). The second number holds the entry:
+#
+#     bits 0-1    EXACT_SCORE, LOWER_BOUND or UPPER_BOUND
+#     bits 2-9    depth
+#     bits 10-22  move code (see MOVE_CODES), NO_MOVE_CODE if there is no move
+#     bits 23-54  score + 2 ** 31
+#     bit 63      1 if the slot is used
+
+import argparse
+import concurrent.futures
+import ctypes
+import multiprocessing
+import os
+import time
+
+from ChessVar import ChessVar, SQUARE_IDS
+from Search import Search, WIN_THRESHOLD, EXACT_SCORE
+from Perft import PERFT_POSITIONS
+
+# a number for every move tuple: start index * 64 + end index for moves, and 4096 + fairy number * 64 + square index
+# for fairy entries
+MOVES_FROM_CODES = [(start_id, end_id) for start_id in SQUARE_IDS for end_id in SQUARE_IDS]
+MOVES_FROM_CODES += [(letter, square_id) for letter in "HFhf" for square_id in SQUARE_IDS]
+MOVE_CODES = {move: code for code, move in enumerate(MOVES_FROM_CODES)}
+NO_MOVE_CODE = 0x1FFF
+
+USED_SLOT_BIT = 1 << 63
+SCORE_OFFSET = 1 << 31
+
+# the search of a worker process, made by start_worker, and the ParallelSearch.clear count it was made for
+_worker_search = None
+_worker_generation = 0
+_worker_slots = None
+_worker_stop_flag = None
+
+
+class SharedTranspositionTable:
+    """A SharedTranspositionTable object is a transposition table for Search kept in shared memory, so every process
+    of a pool can read and write it. It has get and [] = like the dict Search uses. Pass its get_slots() to the other
+    processes and make their own SharedTranspositionTable from it"""
+
+    def __init__(self, num_of_slots=1 << 20, slots=None):
+        if slots is None:
+            slots = multiprocessing.RawArray("Q", 2 * num_of_slots)
+        self._slots = slots
+        self._num_of_slots = len(slots) // 2
+
+    def get_slots(self):
+        """returns the shared memory array of the slots"""
+        return self._slots
+
+    def get_num_of_slots(self):
+        """returns how many positions the table can hold"""
+        return self._num_of_slots
+
+    def get(self, zobrist_hash):
+        """returns the (depth, score, flag, move) stored for the zobrist hash, or None"""
+
+        slot = (zobrist_hash % self._num_of_slots) * 2
+        data = self._slots[slot + 1]
+        if not data & USED_SLOT_BIT or self._slots[slot] ^ data != zobrist_hash:
+            return None
+        move_code = (data >> 10) & 0x1FFF
+        move = None if move_code == NO_MOVE_CODE else MOVES_FROM_CODES[move_code]
+        return (data >> 2) & 0xFF, ((data >> 23) & 0xFFFFFFFF) - SCORE_OFFSET, data & 0x3, move
+
+    def __setitem__(self, zobrist_hash, entry):
+        """stores the (depth, score, flag, move) for the zobrist hash, replacing whatever was in its slot"""
+
+        depth, score, flag, move = entry
+        move_code = NO_MOVE_CODE if move is None else MOVE_CODES[move]
+        data = USED_SLOT_BIT | (score + SCORE_OFFSET) << 23 | move_code << 10 | min(depth, 0xFF) << 2 | flag
+        slot = (zobrist_hash % self._num_of_slots) * 2
+        self._slots[slot] = zobrist_hash ^ data
+        self._slots[slot + 1] = data
+
+    def clear(self):
+        """empties every slot"""
+        ctypes.memset(self._slots, 0, ctypes.sizeof(self._slots))
+
+
+def start_worker(slots, stop_flag):
+    """makes the search of a worker process, using the shared table with these slots and the shared stop flag"""
+    global _worker_search, _worker_slots, _worker_stop_flag
+    _worker_slots = slots
+    _worker_stop_flag = stop_flag
+    _worker_search = Search(shared_table=SharedTranspositionTable(slots=slots), stop_flag=stop_flag)
+
+
+def search_position(position, max_depth, deadline, worker_number, generation):
+    """searches the position (ChessVar.to_bytes) one depth at a time up to max_depth in a worker process, starting
+    at depth 2 if the worker number is odd. deadline is a time.time() to stop at, or None. generation is the
+    ParallelSearch.clear count, and the history scores are forgotten when it changes (killer moves are forgotten by
+    every search). returns (deepest finished depth, its score, its move, nodes), with depth 0 and move None if no
+    depth was finished"""
+
+    global _worker_search, _worker_generation
+    if generation != _worker_generation:
+        _worker_search = Search(shared_table=SharedTranspositionTable(slots=_worker_slots),
+                                stop_flag=_worker_stop_flag)
+        _worker_generation = generation
+
+    time_limit = None
+    if deadline is not None:
+        time_limit = deadline - time.time()
+        if time_limit <= 0:
+            return 0, 0, None, 0
+    _worker_search.start_search(time_limit)
+
+    game = ChessVar.from_bytes(position)
+    moves = game.legal_moves()
+    result = (0, 0, None)
+    for depth in range(1 + worker_number % 2, max_depth + 1):
+        score, move = _worker_search.search_root(game, depth, moves)
+        if _worker_search.is_stopped():
+            break
+        result = (depth, score, move)
+        # there is no point looking deeper once a king capture is certain either way
+        if abs(score) >= WIN_THRESHOLD:
+            break
+    return result + (_worker_search.get_nodes(),)
+
+
+class ParallelSearch:
+    """A ParallelSearch object finds the best move like Search.find_best_move, with the root position searched by a
+    pool of processes (one for every core if processes is None) sharing one transposition table. close() has to be
+    called (or the object used in a with statement) to stop the pool"""
+
+    def __init__(self, processes=None, num_of_table_slots=1 << 20):
+        if processes is None:
+            processes = os.cpu_count() or 1
+        self._processes = processes
+        self._table = SharedTranspositionTable(num_of_table_slots)
+        self._stop_flag = multiprocessing.RawValue("b", 0)
+        self._pool = concurrent.futures.ProcessPoolExecutor(processes, initializer=start_worker,
+                                                            initargs=(self._table.get_slots(), self._stop_flag))
+        self._generation = 0
+        self._nodes = 0
+        self._last_score = 0
+        self._last_depth = 0
+
+    def get_nodes(self):
+        """returns how many positions the workers looked at in the last search"""
+        return self._nodes
+
+    def get_last_score(self):
+        """returns the score of the best move from the last finished depth, from the point of view of the player
+        who was moving"""
+        return self._last_score
+
+    def get_last_depth(self):
+        """returns the deepest depth the last search finished"""
+        return self._last_depth
+
+    def clear(self):
+        """forgets the shared transposition table and the workers' killer moves and history scores, for example when
+        starting a new game"""
+        self._table.clear()
+        self._generation += 1
+
+    def find_best_move(self, game, max_depth=64, time_limit=None):
+        """searches one move deeper at a time until max_depth is finished or time_limit seconds have passed, and
+        returns the best move found as a (start_id, end_id) or (letter, square_id) tuple. returns None if the player
+        has no legal moves. the game is not changed"""
+
+        moves = game.legal_moves()
+        if not moves:
+            return None
+        deadline = None
+        if time_limit is not None:
+            deadline = time.time() + time_limit
+
+        position = game.to_bytes()
+        self._stop_flag.value = 0
+        futures = [self._pool.submit(search_position, position, max_depth, deadline, worker_number,
+                                     self._generation)
+                   for worker_number in range(self._processes)]
+        # the first worker decides when the search is over, then the others are told to stop
+        results = [futures[0].result()]
+        self._stop_flag.value = 1
+        results += [future.result() for future in futures[1:]]
+
+        # the deepest finished depth wins, and a tie goes to the lowest worker number
+        self._nodes = sum(result[3] for result in results)
+        depth, score, move, _ = max(results, key=lambda result: result[0])
+        if move is None:
+            self._last_score = 0
+            self._last_depth = 0
+            return moves[0]
+        self._last_score = score
+        self._last_depth = depth
+        return move
+
+    def close(self):
+        """stops the worker processes"""
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def time_searches(depth, processes, positions=PERFT_POSITIONS):
+    """times Search.find_best_move and ParallelSearch.find_best_move to the depth on every perft position that is
+    not finished, each starting with an empty table. returns a list of (name, Search seconds, ParallelSearch
+    seconds)"""
+
+    timings = []
+    with ParallelSearch(processes) as parallel_search:
+        for name, fen, _ in positions:
+            game = ChessVar.from_fen(fen)
+            if game.get_game_state() != "UNFINISHED":
+                continue
+            start_time = time.perf_counter()
+            Search().find_best_move(game, depth)
+            search_seconds = time.perf_counter() - start_time
+
+            parallel_search.clear()
+            start_time = time.perf_counter()
+            parallel_search.find_best_move(game, depth)
+            timings.append((name, search_seconds, time.perf_counter() - start_time))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time ParallelSearch against Search on the perft positions")
+    parser.add_argument("--depth", type=int, default=4, help="depth to search every position to")
+    parser.add_argument("--processes", type=int, help="number of worker processes (default: one for every core)")
+    arguments = parser.parse_args()
+    if arguments.depth < 1:
+        parser.error("--depth has to be at least 1")
+    if arguments.processes is not None and arguments.processes < 1:
+        parser.error("--processes has to be at least 1")
+
+    processes = arguments.processes or os.cpu_count() or 1
+    print("depth %d, %d processes, %d cores" % (arguments.depth, processes, os.cpu_count() or 1))
+    total_search = total_parallel = 0.0
+    for name, search_seconds, parallel_seconds in time_searches(arguments.depth, processes):
+        total_search += search_seconds
+        total_parallel += parallel_seconds
+        print("  %-32s Search %7.3fs  ParallelSearch %7.3fs  speed-up %5.2fx"
+              % (name, search_seconds, parallel_seconds, search_seconds / parallel_seconds))
+    print("  total: Search %.3fs, ParallelSearch %.3fs, speed-up %.2fx"
+          % (total_search, total_parallel, total_search / total_parallel))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file counts and times move generation (perft) for ChessVar. A perft of depth n plays every legal
+# sequence of n moves (fairy entries included) and counts the positions at the end. The counts for a set of test
+# positions are stored below, so any change to the move rules or to a board engine shows up as a different count,
+# and the time it takes gives the nodes per second of an engine. Run "python Perft.py" to check and time both
+# engines, or "python Perft.py --help" for the options.
+
+import argparse
+import time
+
+from ChessVar import ChessVar, STARTING_FEN
+
+# test positions in the FEN text of ChessVar.from_fen, with the reference perft counts for depth 1, 2, ...
+PERFT_POSITIONS = [
+    ("start",
+     STARTING_FEN,
+     [20, 400, 8982, 201386]),
+    ("fairy entries",
+     "r1bqkb1r/pppppppp/8/8/8/8/PPPPPPPP/R1BQKB1R w HFhf -",
+     [22, 484, 11200, 258949]),
+    ("fairies on board",
+     "r2qk2r/ppp2ppp/2nh1f2/3pp3/3PP3/2NH1F2/PPP2PPP/R2QK2R w - -",
+     [32, 1027, 33412, 1090389]),
+    ("one fairy each",
+     "r1bqkb1r/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RHBQKB1R b Fhf -",
+     [34, 881, 30792, 857853]),
+    ("pawn that kept its double move",
+     "rnbqkb1r/pppppppp/8/8/8/2P5/P1PPPPPP/RNBQKBNR w HFhf c3",
+     [20, 419, 9349, 214478]),
+    ("black king captured",
+     "rnbq1bnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w HFhf -",
+     [0, 0]),
+]
+
+
+def divide(game, depth):
+    """returns a dict of every legal move and the perft count of depth - 1 after it, to find which move a
+    different count comes from"""
+
+    counts = {}
+    for move in game.legal_moves():
+        game.make(move)
+        counts[move] = game.perft(depth - 1)
+        game.unmake()
+    return counts
+
+
+def run_perft_suite(engine="list", max_depth=3, positions=PERFT_POSITIONS):
+    """runs perft on every test position up to max_depth (or as deep as there are reference counts) and prints
+    the count, time and nodes per second of each depth. returns True if every count matches its reference"""
+
+    all_match = True
+    total_nodes = 0
+    total_seconds = 0.0
+    print("engine:", engine)
+    for name, text, reference_counts in positions:
+        print(" ", name, "-", text)
+        game = ChessVar.from_fen(text, engine)
+        for depth in range(1, min(max_depth, len(reference_counts)) + 1):
+            start = time.perf_counter()
+            nodes = game.perft(depth)
+            seconds = time.perf_counter() - start
+            total_nodes += nodes
+            total_seconds += seconds
+
+            expected = reference_counts[depth - 1]
+            status = "ok" if nodes == expected else "MISMATCH (expected " + str(expected) + ")"
+            if nodes != expected:
+                all_match = False
+            print("    depth %d: %10d nodes %9.3fs %10.0f nodes/s  %s"
+                  % (depth, nodes, seconds, nodes / seconds if seconds else 0.0, status))
+
+    if total_seconds:
+        print("  total: %d nodes in %.3fs, %.0f nodes/s" % (total_nodes, total_seconds, total_nodes / total_seconds))
+    return all_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check and time ChessVar move generation with perft")
+    parser.add_argument("--engine", choices=("list", "bitboard", "both"), default="both")
+    parser.add_argument("--depth", type=int, default=3, help="deepest depth to run on each position")
+    parser.add_argument("--position", help="run only the test position with this name")
+    arguments = parser.parse_args()
+
+    positions = PERFT_POSITIONS
+    if arguments.position is not None:
+        positions = [position for position in PERFT_POSITIONS if position[0] == arguments.position]
+        if not positions:
+            parser.error("no test position named " + repr(arguments.position))
+
+    engines = ("list", "bitboard") if arguments.engine == "both" else (arguments.engine,)
+    all_match = True
+    for engine in engines:
+        if not run_perft_suite(engine, arguments.depth, positions):
+            all_match = False
+    return 0 if all_match else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
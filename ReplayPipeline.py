@@ -0,0 +1,313 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file checks recorded games again with the ChessVar rules, for example after a rule is fixed. Every
+# move of every game is played with make_move or enter_fairy_piece, and the games are split into chunks that are
+# checked by a pool of processes. A corpus is a record file (see GameRecord.py) or an archive file (see
+# GameArchive.py). Record files are read by the main process one game at a time and the moves are sent to the
+# workers, while for archive files only the game numbers are sent and every worker reads the games from the archive
+# itself. Only a few chunks per process are handed out at a time, so a corpus of any size is checked with the memory
+# of a few chunks. Run "python ReplayPipeline.py games.txt" to check a corpus, or "python ReplayPipeline.py --help"
+# for the options.
+#
+# The result for a game is a tuple (game number, number of moves played, the number of the first move that is not
+# allowed or None, game state at the end, game state that was recorded, error text or None). Game numbers start at 0
+# in the order the games are in the file. A game that can't be set up at all, like one with a FEN tag that is not a
+# position, gets the text of the ValueError, 0 moves and a game state of None, and is counted as an invalid game
+# instead of stopping the whole corpus.
+#
+# Every process keeps the archives it opened, keyed by the path, time changed and size of the file, so an archive
+# file that is written again is opened again. They are closed when the process exits.
+
+import argparse
+import atexit
+import collections
+import concurrent.futures
+import multiprocessing.util
+import os
+import time
+
+from ChessVar import ChessVar
+from GameArchive import GameArchive, ARCHIVE_MAGIC
+from GameRecord import GAME_STATES_FROM_RESULTS, read_games, play_move
+
+# how many chunks every worker process can have waiting at a time
+CHUNKS_PER_PROCESS = 2
+
+# how many of the games with a move that is not allowed the summary lists
+MAX_LISTED_GAMES = 20
+
+# the archives a process has open, by (path, time changed, size), so an archive is opened once per process and not
+# once per chunk
+_open_archives = {}
+
+
+def validate_game(game, moves):
+    """plays the moves on the ChessVar with make_move and enter_fairy_piece, stopping at the first one that is not
+    allowed. returns (number of moves played, the number of the move that is not allowed or None)"""
+
+    for ply, move in enumerate(moves):
+        if not play_move(game, move):
+            return ply, ply + 1
+    return len(moves), None
+
+
+def validate_records(games, engine="list"):
+    """takes in a list of (game number, FEN text or None, moves, recorded game state) and returns the result for every
+    game"""
+
+    results = []
+    for game_number, fen, moves, recorded_game_state in games:
+        try:
+            if fen is None:
+                game = ChessVar(engine)
+            else:
+                game = ChessVar.from_fen(fen, engine)
+            num_of_plies, illegal_move = validate_game(game, moves)
+        except ValueError as error:
+            results.append((game_number, 0, None, None, recorded_game_state, str(error)))
+            continue
+        results.append((game_number, num_of_plies, illegal_move, game.get_game_state(), recorded_game_state, None))
+    return results
+
+
+def get_open_archive(path):
+    """returns the GameArchive of the file at the path, opening it only if this process has not opened it yet. an
+    archive opened before the file changed is closed and opened again"""
+
+    status = os.stat(path)
+    key = (path, status.st_mtime_ns, status.st_size)
+    archive = _open_archives.get(key)
+    if archive is None:
+        for old_key in [old_key for old_key in _open_archives if old_key[0] == path]:
+            _open_archives.pop(old_key).close()
+        archive = GameArchive(path)
+        _open_archives[key] = archive
+    return archive
+
+
+def close_open_archives():
+    """closes every archive this process has open"""
+    for archive in _open_archives.values():
+        archive.close()
+    _open_archives.clear()
+
+
+# the main process closes its archives with atexit, but worker processes don't run atexit functions when they exit,
+# so start_worker gives them a multiprocessing finalizer instead
+atexit.register(close_open_archives)
+
+
+def start_worker():
+    """runs in every worker process of the pool when it starts, so its archives are closed when it exits"""
+    multiprocessing.util.Finalize(None, close_open_archives, exitpriority=0)
+
+
+def validate_archive_games(path, first_game, stop_game, engine="list"):
+    """returns the result for every game of the archive at the path from first_game up to (but not including)
+    stop_game"""
+
+    archive = get_open_archive(path)
+
+    results = []
+    for game_number in range(first_game, stop_game):
+        recorded_game_state = archive.get_game_state(game_number)
+        try:
+            game = archive.get_game(game_number, 0, engine)
+            num_of_plies, illegal_move = validate_game(game, archive.get_moves(game_number))
+        except ValueError as error:
+            results.append((game_number, 0, None, None, recorded_game_state, str(error)))
+            continue
+        results.append((game_number, num_of_plies, illegal_move, game.get_game_state(), recorded_game_state, None))
+    return results
+
+
+def validate_chunk(chunk):
+    """checks a chunk made by make_chunks and returns the result for every game in it. this is the function the worker
+    processes run"""
+    if chunk[0] == "archive":
+        return validate_archive_games(*chunk[1:])
+    return validate_records(*chunk[1:])
+
+
+def is_archive(path):
+    """returns True if the file at the path is a GameArchive file and False if it is taken to be a record file"""
+    with open(path, "rb") as corpus_file:
+        return corpus_file.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+
+
+def make_chunks(path, chunk_size=64, engine="list"):
+    """goes through the corpus at the path and yields chunks of up to chunk_size games for validate_chunk"""
+
+    if is_archive(path):
+        with GameArchive(path) as archive:
+            num_of_games = archive.get_num_of_games()
+        for first_game in range(0, num_of_games, chunk_size):
+            yield "archive", path, first_game, min(first_game + chunk_size, num_of_games), engine
+        return
+
+    games = []
+    for game_number, record in enumerate(read_games(path)):
+        games.append((game_number, record.get_tags().get("FEN"), record.get_moves(),
+                      GAME_STATES_FROM_RESULTS[record.get_result()]))
+        if len(games) == chunk_size:
+            yield "records", games, engine
+            games = []
+    if games:
+        yield "records", games, engine
+
+
+def replay_games(path, processes=None, chunk_size=64, ordered=True, engine="list"):
+    """checks every game of the corpus at the path with a pool of processes (one for every core if processes is None,
+    and no pool at all if it is 1) and yields the result for every game as the chunks are done. if ordered is False
+    the results of a chunk are yielded as soon as it is done, even if a chunk before it is not done yet"""
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    chunks = make_chunks(path, chunk_size, engine)
+
+    if processes == 1:
+        for chunk in chunks:
+            yield from validate_chunk(chunk)
+        return
+
+    max_waiting = processes * CHUNKS_PER_PROCESS
+    with concurrent.futures.ProcessPoolExecutor(processes, initializer=start_worker) as pool:
+        waiting = collections.deque()
+        for chunk in chunks:
+            waiting.append(pool.submit(validate_chunk, chunk))
+            while len(waiting) >= max_waiting:
+                yield from take_done_results(waiting, ordered)
+        while waiting:
+            yield from take_done_results(waiting, ordered)
+
+
+def take_done_results(waiting, ordered):
+    """waits for a chunk in the deque of waiting futures to be done, removes it and returns its results. the chunk is
+    the first one in the deque if ordered is True and whichever is done first if it is False"""
+
+    if ordered:
+        return waiting.popleft().result()
+    done, _ = concurrent.futures.wait(waiting, return_when=concurrent.futures.FIRST_COMPLETED)
+    future = done.pop()
+    waiting.remove(future)
+    return future.result()
+
+
+class ReplaySummary:
+    """A ReplaySummary object adds up the results of replay_games: how many games and moves were checked, how many
+    games have a move that is not allowed, how many games could not be set up at all, how many games end in each game
+    state and how many games do not end in the game state that was recorded"""
+
+    def __init__(self):
+        self._num_of_games = 0
+        self._num_of_plies = 0
+        self._num_of_illegal_games = 0
+        self._num_of_invalid_games = 0
+        self._num_of_changed_results = 0
+        self._game_states = {"UNFINISHED": 0, "WHITE_WON": 0, "BLACK_WON": 0}
+        self._illegal_games = []
+        self._invalid_games = []
+
+    def add_result(self, result):
+        """adds the result tuple of a game to the summary"""
+
+        game_number, num_of_plies, illegal_move, game_state, recorded_game_state, error = result
+        self._num_of_games += 1
+        if error is not None:
+            self._num_of_invalid_games += 1
+            if len(self._invalid_games) < MAX_LISTED_GAMES:
+                self._invalid_games.append((game_number, error))
+            return
+
+        self._num_of_plies += num_of_plies
+        self._game_states[game_state] += 1
+        if game_state != recorded_game_state:
+            self._num_of_changed_results += 1
+        if illegal_move is not None:
+            self._num_of_illegal_games += 1
+            if len(self._illegal_games) < MAX_LISTED_GAMES:
+                self._illegal_games.append((game_number, illegal_move))
+
+    def get_num_of_games(self):
+        """returns how many games were checked"""
+        return self._num_of_games
+
+    def get_num_of_plies(self):
+        """returns how many moves were played"""
+        return self._num_of_plies
+
+    def get_num_of_illegal_games(self):
+        """returns how many games have a move that is not allowed"""
+        return self._num_of_illegal_games
+
+    def get_num_of_invalid_games(self):
+        """returns how many games could not be set up to be checked"""
+        return self._num_of_invalid_games
+
+    def get_num_of_changed_results(self):
+        """returns how many games do not end in the game state that was recorded"""
+        return self._num_of_changed_results
+
+    def get_game_states(self):
+        """returns a dict of how many games end in each game state"""
+        return self._game_states
+
+    def get_illegal_games(self):
+        """returns (game number, move number) for the first MAX_LISTED_GAMES games with a move that is not allowed"""
+        return self._illegal_games
+
+    def get_invalid_games(self):
+        """returns (game number, error text) for the first MAX_LISTED_GAMES games that could not be set up"""
+        return self._invalid_games
+
+    def to_text(self):
+        """returns the summary as lines of text"""
+
+        lines = ["games: " + str(self._num_of_games),
+                 "moves played: " + str(self._num_of_plies),
+                 "games with a move that is not allowed: " + str(self._num_of_illegal_games),
+                 "games that could not be set up: " + str(self._num_of_invalid_games),
+                 "games that do not end in the recorded game state: " + str(self._num_of_changed_results)]
+        for game_state, count in self._game_states.items():
+            lines.append(game_state + ": " + str(count))
+        for game_number, illegal_move in self._illegal_games:
+            lines.append("game " + str(game_number) + ": move " + str(illegal_move) + " is not allowed")
+        for game_number, error in self._invalid_games:
+            lines.append("game " + str(game_number) + ": " + error)
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check recorded ChessVar games again with the rules")
+    parser.add_argument("paths", nargs="+", help="record or archive files to check")
+    parser.add_argument("--processes", type=int, help="number of worker processes (default: one for every core)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="number of games in a chunk")
+    parser.add_argument("--unordered", action="store_true", help="take the chunks in the order they are done")
+    parser.add_argument("--engine", choices=("list", "bitboard"), default="list")
+    arguments = parser.parse_args()
+    if arguments.processes is not None and arguments.processes < 1:
+        parser.error("--processes has to be at least 1")
+    if arguments.chunk_size < 1:
+        parser.error("--chunk-size has to be at least 1")
+
+    all_allowed = True
+    for path in arguments.paths:
+        summary = ReplaySummary()
+        start_time = time.perf_counter()
+        for result in replay_games(path, arguments.processes, arguments.chunk_size, not arguments.unordered,
+                                   arguments.engine):
+            summary.add_result(result)
+        seconds = time.perf_counter() - start_time
+
+        print(path)
+        print(summary.to_text())
+        print("%.2f seconds, %d moves per second" % (seconds, summary.get_num_of_plies() / max(seconds, 1e-9)))
+        if (summary.get_num_of_illegal_games() or summary.get_num_of_invalid_games() or
+                summary.get_num_of_changed_results()):
+            all_allowed = False
+    return 0 if all_allowed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
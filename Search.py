@@ -0,0 +1,340 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file lets the computer pick a move in a game of ChessVar. The Search class looks ahead a number of
+# moves with an alpha-beta search, going one move deeper at a time (iterative deepening) until it runs out of depth
+# or time. Positions it has already searched are remembered in a transposition table keyed by the board's zobrist
+# hash, and moves are tried best-first: the remembered best move, then captures of the most valuable piece by the
+# least valuable piece (MVV-LVA), then killer moves and moves with a good history. At the end of the search only
+# captures are looked at (quiescence) so a position is never judged in the middle of a trade. A game ends when a king
+# is captured, so the search scores a position with no king as lost straight away.
+
+import time
+
+# how many points each piece is worth to the evaluation
+PIECE_VALUES = {"pawn": 100, "knight": 300, "bishop": 310, "rook": 500, "queen": 900, "hunter": 450, "falcon": 450,
+                "king": 20000}
+
+# the score for capturing the other king. wins found sooner score a little higher than wins found later
+WIN_SCORE = 1000000
+WIN_THRESHOLD = WIN_SCORE - 1000
+
+# what a score in the transposition table means
+EXACT_SCORE = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# check the clock every this many nodes
+NODES_BETWEEN_TIME_CHECKS = 1024
+
+
+class Search:
+    """A Search object finds the best move for the player whose turn it is in a ChessVar game. It plays the moves it
+    is trying with ChessVar.make and takes them back with ChessVar.unmake, so the game is back to how it was when
+    find_best_move returns. The transposition table, killer moves and history scores are kept between searches so
+    the next move of the same game can reuse them. If a shared_table is given (see ParallelSearch.py) it is used as the
+    transposition table instead of a dict, so searches in other processes can use what this one found. If a
+    stop_flag is given (a multiprocessing Value) the search stops as soon as another process sets it to 1."""
+
+    def __init__(self, max_table_entries=1000000, shared_table=None, stop_flag=None):
+        self._max_table_entries = max_table_entries
+        self._shared_table = shared_table
+        self._stop_flag = stop_flag
+        self._transposition_table = {}
+        self._killer_moves = {}
+        self._history_scores = {}
+        self._nodes = 0
+        self._deadline = None
+        self._stopped = False
+        self._last_score = 0
+        self._last_depth = 0
+
+    def get_nodes(self):
+        """returns how many positions the last search looked at"""
+        return self._nodes
+
+    def get_last_score(self):
+        """returns the score of the best move from the last finished depth, from the point of view of the player
+        who was moving"""
+        return self._last_score
+
+    def get_last_depth(self):
+        """returns the deepest depth the last search finished"""
+        return self._last_depth
+
+    def clear(self):
+        """forgets the transposition table, killer moves and history scores, for example when starting a new game"""
+        self._transposition_table = {}
+        if self._shared_table is not None:
+            self._shared_table.clear()
+        self._killer_moves = {}
+        self._history_scores = {}
+
+    def find_best_move(self, game, max_depth=64, time_limit=None):
+        """searches one move deeper at a time until max_depth is finished or time_limit seconds have passed, and
+        returns the best move found as a (start_id, end_id) or (letter, square_id) tuple. returns None if the player
+        has no legal moves. the best move of the last finished depth is used when time runs out"""
+
+        self.start_search(time_limit)
+        moves = game.legal_moves()
+        if not moves:
+            return None
+
+        best_move = moves[0]
+        self._last_score = 0
+        self._last_depth = 0
+        for depth in range(1, max_depth + 1):
+            score, move = self.search_root(game, depth, moves)
+            if self._stopped:
+                break
+            best_move = move
+            self._last_score = score
+            self._last_depth = depth
+            # there is no point looking deeper once a king capture is certain either way
+            if abs(score) >= WIN_THRESHOLD:
+                break
+
+        return best_move
+
+    def start_search(self, time_limit=None):
+        """resets the node count, the killer moves and the clock before a search of at most time_limit seconds"""
+        self._nodes = 0
+        self._stopped = False
+        self._killer_moves = {}
+        if time_limit is None:
+            self._deadline = None
+        else:
+            self._deadline = time.perf_counter() + time_limit
+
+    def is_stopped(self):
+        """returns True if the last search ran out of time"""
+        return self._stopped
+
+    def search_root(self, game, depth, moves):
+        """searches every move of the root position to the depth and returns (best score, best move)"""
+
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = None
+        best_score = -WIN_SCORE - 1
+
+        for move in self.order_moves(game, moves, 0, self.get_table_move(game)):
+            game.make(move)
+            score = -self.alpha_beta(game, depth - 1, -beta, -alpha, 1)
+            game.unmake()
+            if self._stopped:
+                break
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+
+        # a depth that was stopped part way has not looked at every move, so it is not remembered
+        if best_move is not None and not self._stopped:
+            self.store(game, depth, best_score, EXACT_SCORE, best_move, 0)
+        return best_score, best_move
+
+    def alpha_beta(self, game, depth, alpha, beta, ply):
+        """returns the score of the position for the player to move, searching depth more moves. scores outside of
+        (alpha, beta) are only bounds, because the caller will not pick this line anyway"""
+
+        a_board = game.get_chess_board()
+        color = game.get_current_player_turn()
+
+        # the other player captured our king with their last move
+        if a_board.has_no_king_on_board(color):
+            return -WIN_SCORE + ply
+
+        if depth <= 0:
+            return self.quiescence(game, alpha, beta, ply)
+
+        self.count_node()
+        if self._stopped:
+            return 0
+
+        original_alpha = alpha
+        table_move = None
+        entry = self.get_table_entry(game.get_zobrist_hash())
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, table_move = entry
+            if entry_depth >= depth:
+                entry_score = self.score_from_table(entry_score, ply)
+                if entry_flag == EXACT_SCORE:
+                    return entry_score
+                if entry_flag == LOWER_BOUND and entry_score >= beta:
+                    return entry_score
+                if entry_flag == UPPER_BOUND and entry_score <= alpha:
+                    return entry_score
+
+        moves = a_board.generate_moves(color)
+        if not moves:
+            # nobody can capture a king from here, call it even
+            return 0
+
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for move in self.order_moves(game, moves, ply, table_move):
+            is_capture = self.get_captured_piece(game, move) is not None
+            game.make(move)
+            score = -self.alpha_beta(game, depth - 1, -beta, -alpha, ply + 1)
+            game.unmake()
+            if self._stopped:
+                return 0
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                # a quiet move that was good enough to stop the search is worth trying early next time
+                if not is_capture:
+                    self.add_killer_move(move, ply)
+                    self._history_scores[move] = self._history_scores.get(move, 0) + depth * depth
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT_SCORE
+        self.store(game, depth, best_score, flag, best_move, ply)
+        return best_score
+
+    def quiescence(self, game, alpha, beta, ply):
+        """keeps searching captures only until the position is quiet, so the evaluation is not taken in the middle
+        of a trade. the player to move can also choose not to capture (stand pat)"""
+
+        self.count_node()
+        if self._stopped:
+            return 0
+
+        a_board = game.get_chess_board()
+        color = game.get_current_player_turn()
+        if a_board.has_no_king_on_board(color):
+            return -WIN_SCORE + ply
+
+        stand_pat = self.evaluate(game)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        captures = []
+        for move in a_board.generate_piece_moves(color):
+            victim = a_board.get_Piece_from_squareID(move[1])
+            if victim is not None:
+                attacker = a_board.get_Piece_from_squareID(move[0])
+                captures.append((PIECE_VALUES[victim.get_name()] * 10 - PIECE_VALUES[attacker.get_name()] // 100,
+                                 move))
+        captures.sort(key=lambda scored_move: scored_move[0], reverse=True)
+
+        for _, move in captures:
+            game.make(move)
+            score = -self.quiescence(game, -beta, -alpha, ply + 1)
+            game.unmake()
+            if self._stopped:
+                return 0
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def evaluate(self, game):
+        """returns the material of the player to move minus the material of the other player"""
+
+        a_board = game.get_chess_board()
+        score = 0
+        for piece_name, amount in a_board.get_white_pieces_on_board().items():
+            score += PIECE_VALUES[piece_name] * amount
+        for piece_name, amount in a_board.get_black_pieces_on_board().items():
+            score -= PIECE_VALUES[piece_name] * amount
+
+        if game.get_current_player_turn() == "white":
+            return score
+        return -score
+
+    def order_moves(self, game, moves, ply, table_move):
+        """returns the moves sorted so the ones most likely to be best come first: the transposition table move,
+        then captures by MVV-LVA, then the killer moves of this ply, then the rest by history score"""
+
+        killers = self._killer_moves.get(ply, ())
+        scored_moves = []
+        for move in moves:
+            if move == table_move:
+                score = 10000000
+            else:
+                victim = self.get_captured_piece(game, move)
+                if victim is not None:
+                    attacker = game.get_chess_board().get_Piece_from_squareID(move[0])
+                    score = 1000000 + PIECE_VALUES[victim.get_name()] * 10 - PIECE_VALUES[attacker.get_name()] // 100
+                elif move in killers:
+                    score = 900000
+                else:
+                    score = self._history_scores.get(move, 0)
+            scored_moves.append((score, move))
+
+        scored_moves.sort(key=lambda scored_move: scored_move[0], reverse=True)
+        return [move for _, move in scored_moves]
+
+    def get_captured_piece(self, game, move):
+        """returns the piece the move would capture, or None. fairy entries never capture"""
+        if len(move[0]) == 1:
+            return None
+        return game.get_chess_board().get_Piece_from_squareID(move[1])
+
+    def add_killer_move(self, move, ply):
+        """remembers the last two quiet moves that stopped the search at this ply"""
+        killers = self._killer_moves.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+
+    def get_table_move(self, game):
+        """returns the best move the transposition table remembers for this position, or None"""
+        entry = self.get_table_entry(game.get_zobrist_hash())
+        if entry is None:
+            return None
+        return entry[3]
+
+    def get_table_entry(self, zobrist_hash):
+        """returns the (depth, score, flag, move) the transposition table remembers for the zobrist hash, or None"""
+        if self._shared_table is not None:
+            return self._shared_table.get(zobrist_hash)
+        return self._transposition_table.get(zobrist_hash)
+
+    def store(self, game, depth, score, flag, move, ply):
+        """remembers the result of searching this position. win scores are stored relative to this position so they
+        can be reused at a different ply"""
+
+        if score >= WIN_THRESHOLD:
+            score += ply
+        elif score <= -WIN_THRESHOLD:
+            score -= ply
+        if self._shared_table is not None:
+            self._shared_table[game.get_zobrist_hash()] = (depth, score, flag, move)
+            return
+        if len(self._transposition_table) >= self._max_table_entries:
+            self._transposition_table = {}
+        self._transposition_table[game.get_zobrist_hash()] = (depth, score, flag, move)
+
+    def score_from_table(self, score, ply):
+        """turns a win score stored in the transposition table back into a score at this ply"""
+        if score >= WIN_THRESHOLD:
+            return score - ply
+        if score <= -WIN_THRESHOLD:
+            return score + ply
+        return score
+
+    def count_node(self):
+        """counts a node and stops the search if the time limit has passed or the stop flag is set"""
+        self._nodes += 1
+        if self._nodes % NODES_BETWEEN_TIME_CHECKS == 0:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                self._stopped = True
+            if self._stop_flag is not None and self._stop_flag.value:
+                self._stopped = True
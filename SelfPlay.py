@@ -0,0 +1,270 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file plays many ChessVar games between computer players, for example to check that a change to
+# the search made it stronger or to put load on the rules. A player is given as text:
+#
+#     random      plays a random legal move
+#     greedy      captures the most valuable piece it can, and plays a random legal move if it cannot capture
+#     search:N    plays the best move of Search.find_best_move looking N moves ahead
+#
+# Every pair of players plays the same number of games, taking turns being white. The games are played on a pool of
+# processes and every game is added to a record file (see GameRecord.py) as soon as it is done. At the end the games
+# and moves per second, the average game length and how often each player won are printed. Run
+# "python SelfPlay.py random greedy search:2 --games 10" to play a tournament, or "python SelfPlay.py --help" for the
+# options.
+
+import argparse
+import concurrent.futures
+import itertools
+import os
+import random
+import time
+
+from ChessVar import ChessVar
+from GameRecord import GameRecord, GameRecordWriter, RESULTS, play_move
+from Search import Search, PIECE_VALUES
+
+# a game still going after this many moves is stopped and counts as a draw
+MAX_PLIES = 300
+
+
+class RandomPlayer:
+    """A RandomPlayer object plays a random legal move"""
+
+    def __init__(self, rng):
+        self._rng = rng
+
+    def choose_move(self, game):
+        """returns the move to play in the game, or None if there is no legal move"""
+
+        moves = game.legal_moves()
+        if not moves:
+            return None
+        return self._rng.choice(moves)
+
+
+class GreedyPlayer:
+    """A GreedyPlayer object captures the most valuable piece it can, and plays a random legal move if it cannot
+    capture anything"""
+
+    def __init__(self, rng):
+        self._rng = rng
+
+    def choose_move(self, game):
+        """returns the move to play in the game, or None if there is no legal move"""
+
+        a_board = game.get_chess_board()
+        moves = game.legal_moves()
+        if not moves:
+            return None
+        best_value = 0
+        best_moves = moves
+        for move in moves:
+            if len(move[0]) == 1:
+                continue
+            victim = a_board.get_Piece_from_squareID(move[1])
+            if victim is None:
+                continue
+            value = PIECE_VALUES[victim.get_name()]
+            if value > best_value:
+                best_value = value
+                best_moves = [move]
+            elif value == best_value:
+                best_moves.append(move)
+        return self._rng.choice(best_moves)
+
+
+class SearchPlayer:
+    """A SearchPlayer object plays the best move Search finds looking depth moves ahead"""
+
+    def __init__(self, depth):
+        self._depth = depth
+        self._search = Search()
+
+    def choose_move(self, game):
+        """returns the move to play in the game, or None if there is no legal move"""
+        return self._search.find_best_move(game, self._depth)
+
+
+def make_player(player, seed):
+    """returns a new player object for player text like "random", "greedy" or "search:3". raises a ValueError for
+    any other text"""
+
+    if player == "random":
+        return RandomPlayer(random.Random(seed))
+    if player == "greedy":
+        return GreedyPlayer(random.Random(seed))
+    if player.startswith("search:") and player[7:].isdigit() and int(player[7:]) > 0:
+        return SearchPlayer(int(player[7:]))
+    raise ValueError("a player has to be 'random', 'greedy' or 'search:N', not " + repr(player))
+
+
+def play_game(game_number, white, black, seed, max_plies=MAX_PLIES, engine="list"):
+    """plays a game between the white and black player texts and returns (game number, white, black, moves, game
+    state, seconds it took). the same seed always plays the same game"""
+
+    start_time = time.perf_counter()
+    players = {"white": make_player(white, seed), "black": make_player(black, seed + 1)}
+    game = ChessVar(engine)
+    moves = []
+    while game.get_game_state() == "UNFINISHED" and len(moves) < max_plies:
+        move = players[game.get_current_player_turn()].choose_move(game)
+        # a player with no legal move ends the game where it is, the same as reaching max_plies
+        if move is None:
+            break
+        play_move(game, move)
+        moves.append(move)
+    return game_number, white, black, moves, game.get_game_state(), time.perf_counter() - start_time
+
+
+def play_game_from_tuple(arguments):
+    """plays the game of a tuple from make_pairings, for the worker processes"""
+    return play_game(*arguments)
+
+
+def make_pairings(players, games_per_pair, seed=0, max_plies=MAX_PLIES, engine="list"):
+    """returns the play_game arguments of every game: every pair of players plays games_per_pair games, swapping who
+    is white every game"""
+
+    pairings = []
+    for first, second in itertools.combinations(players, 2):
+        for round_number in range(games_per_pair):
+            if round_number % 2 == 0:
+                white, black = first, second
+            else:
+                white, black = second, first
+            game_number = len(pairings)
+            pairings.append((game_number, white, black, seed * 1000003 + game_number * 2, max_plies, engine))
+    return pairings
+
+
+class TournamentSummary:
+    """A TournamentSummary object adds up the games of a tournament: how many games and moves were played, how long
+    it took, and the wins, losses and draws of every player"""
+
+    def __init__(self, players):
+        self._num_of_games = 0
+        self._num_of_plies = 0
+        self._start_time = time.perf_counter()
+        self._end_time = self._start_time
+        self._scores = {player: {"wins": 0, "losses": 0, "draws": 0} for player in players}
+        self._game_states = {"UNFINISHED": 0, "WHITE_WON": 0, "BLACK_WON": 0}
+
+    def add_game(self, result):
+        """adds a result tuple of play_game to the summary"""
+
+        _, white, black, moves, game_state, _ = result
+        self._num_of_games += 1
+        self._num_of_plies += len(moves)
+        self._end_time = time.perf_counter()
+        self._game_states[game_state] += 1
+        if game_state == "WHITE_WON":
+            self._scores[white]["wins"] += 1
+            self._scores[black]["losses"] += 1
+        elif game_state == "BLACK_WON":
+            self._scores[black]["wins"] += 1
+            self._scores[white]["losses"] += 1
+        else:
+            self._scores[white]["draws"] += 1
+            self._scores[black]["draws"] += 1
+
+    def get_num_of_games(self):
+        """returns how many games were played"""
+        return self._num_of_games
+
+    def get_num_of_plies(self):
+        """returns how many moves were played in all of the games"""
+        return self._num_of_plies
+
+    def get_seconds(self):
+        """returns the seconds from the start of the tournament to the end of the last game added"""
+        return self._end_time - self._start_time
+
+    def get_scores(self):
+        """returns a dict of {"wins": ..., "losses": ..., "draws": ...} for every player"""
+        return self._scores
+
+    def get_game_states(self):
+        """returns a dict of how many games ended in each game state"""
+        return self._game_states
+
+    def to_text(self):
+        """returns the summary as lines of text"""
+
+        seconds = max(self.get_seconds(), 1e-9)
+        lines = ["games: %d in %.2fs, %.2f games/s" % (self._num_of_games, seconds, self._num_of_games / seconds),
+                 "moves: %d, %.0f moves/s" % (self._num_of_plies, self._num_of_plies / seconds),
+                 "average game length: %.1f moves" % (self._num_of_plies / max(self._num_of_games, 1)),
+                 "white won: %(WHITE_WON)d  black won: %(BLACK_WON)d  unfinished: %(UNFINISHED)d" % self._game_states]
+        for player, score in self._scores.items():
+            played = max(score["wins"] + score["losses"] + score["draws"], 1)
+            lines.append("%-12s wins %5d  losses %5d  draws %5d  win rate %5.1f%%"
+                         % (player, score["wins"], score["losses"], score["draws"], 100 * score["wins"] / played))
+        return "\n".join(lines)
+
+
+def run_tournament(players, games_per_pair, path=None, processes=None, seed=0, max_plies=MAX_PLIES, engine="list"):
+    """plays every game of the tournament on a pool of processes (one for every core if processes is None, and no
+    pool at all if it is 1), adding each game to the record file at the path if there is one. returns the
+    TournamentSummary"""
+
+    for player in players:
+        make_player(player, 0)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    pairings = make_pairings(players, games_per_pair, seed, max_plies, engine)
+    summary = TournamentSummary(players)
+    writer = None if path is None else GameRecordWriter(path)
+
+    pool = None
+    if processes == 1:
+        results = map(play_game_from_tuple, pairings)
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(processes)
+        results = pool.map(play_game_from_tuple, pairings, chunksize=max(1, len(pairings) // (processes * 8)))
+
+    try:
+        for result in results:
+            game_number, white, black, moves, game_state, seconds = result
+            summary.add_game(result)
+            if writer is not None:
+                tags = {"White": white, "Black": black, "Round": str(game_number + 1), "Seconds": "%.3f" % seconds}
+                writer.write_game(GameRecord(moves, tags, RESULTS[game_state]))
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="play ChessVar games between computer players")
+    parser.add_argument("players", nargs="+", help="'random', 'greedy' or 'search:N' (at least two)")
+    parser.add_argument("--games", type=int, default=10, help="number of games every pair of players plays")
+    parser.add_argument("--output", help="record file to add the games to")
+    parser.add_argument("--processes", type=int, help="number of worker processes (default: one for every core)")
+    parser.add_argument("--max-plies", type=int, default=MAX_PLIES, help="moves before a game counts as a draw")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", choices=("list", "bitboard"), default="list")
+    arguments = parser.parse_args()
+
+    if len(set(arguments.players)) < 2:
+        parser.error("at least two different players are needed")
+    if arguments.processes is not None and arguments.processes < 1:
+        parser.error("--processes has to be at least 1")
+    for player in arguments.players:
+        try:
+            make_player(player, 0)
+        except ValueError as error:
+            parser.error(str(error))
+
+    summary = run_tournament(list(dict.fromkeys(arguments.players)), arguments.games, arguments.output,
+                             arguments.processes, arguments.seed, arguments.max_plies, arguments.engine)
+    print(summary.to_text())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
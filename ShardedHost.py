@@ -0,0 +1,314 @@
+# Author: Allysa Gallardo
+# GitHub username: allygallardo
+# Date: 10/18/26
+# Description: This file hosts ChessVar games on several worker processes, so moves of different games are made on
+# different cores. Every game has a text id, and the worker that has a game is found by hashing its id onto a ring
+# (consistent hashing): every worker owns VIRTUAL_NODES points on the ring, and a game belongs to the worker of the
+# first point at or after the hash of its id. Adding or removing a worker only moves the games between that worker
+# and its neighbors on the ring, instead of nearly every game. A game is moved by taking its ChessVar.to_bytes
+# snapshot (89 bytes) off one worker and making a ChessVar from it on the other.
+#
+# The main process talks to each worker over a multiprocessing Pipe. make_moves sends the moves of many games in one
+# message per worker and all of the workers play them at the same time, so the workers are not waiting on one message
+# per move. Within one worker the moves are played in the order they were given. With with_results=True the workers
+# send back the REJECTION_CODES number of every move instead of True or False, and make_moves turns them into
+# ChessVar MoveResults, so the reason a move was not allowed costs no more to send than the True or False.
+
+import bisect
+import hashlib
+import multiprocessing
+
+from ChessVar import ChessVar, REJECTION_CODES, MOVE_RESULTS_FROM_CODES, fen_to_position_bytes, check_position_bytes, \
+    is_fairy_entry
+
+# how many points on the ring every worker has. more points spread the games more evenly
+VIRTUAL_NODES = 64
+
+
+def hash_key(text):
+    """returns a 64 bit hash of the text that is the same in every process and every run"""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+class HashRing:
+    """A HashRing object finds the worker that owns a game id with consistent hashing"""
+
+    def __init__(self):
+        self._points = []
+        self._workers = []
+
+    def get_workers(self):
+        """returns the sorted list of worker numbers on the ring"""
+        return sorted(set(self._workers))
+
+    def add_worker(self, worker_number):
+        """puts VIRTUAL_NODES points of the worker on the ring"""
+        for node in range(VIRTUAL_NODES):
+            point = hash_key(str(worker_number) + ":" + str(node))
+            position = bisect.bisect_left(self._points, point)
+            self._points.insert(position, point)
+            self._workers.insert(position, worker_number)
+
+    def remove_worker(self, worker_number):
+        """takes every point of the worker off the ring"""
+        kept = [(point, worker) for point, worker in zip(self._points, self._workers) if worker != worker_number]
+        self._points = [point for point, _ in kept]
+        self._workers = [worker for _, worker in kept]
+
+    def get_worker(self, game_id):
+        """returns the number of the worker that owns the game id"""
+        if not self._points:
+            raise ValueError("there are no workers on the ring")
+        position = bisect.bisect_left(self._points, hash_key(game_id))
+        if position == len(self._points):
+            position = 0
+        return self._workers[position]
+
+
+def play_operation(game, first, square_id):
+    """plays a (first, square_id) operation on the game with enter_fairy_piece if first is a fairy letter (see
+    ChessVar.is_fairy_entry), else with make_move, so the ids are read the same way as on a ChessVar in this process.
+    returns what it returned"""
+    if is_fairy_entry(first):
+        return game.enter_fairy_piece(first, square_id)
+    return game.make_move(first, square_id)
+
+
+def answer_message(games, message):
+    """runs a message from the main process on the worker's dict of games and returns the answer"""
+
+    command = message[0]
+    if command == "moves":
+        results = []
+        for game_id, first, square_id in message[1]:
+            game = games.get(game_id)
+            if game is None:
+                results.append(False)
+            else:
+                results.append(play_operation(game, first, square_id))
+        return results
+    if command == "moves with codes":
+        # the same as "moves" but with the REJECTION_CODES number of every move (0 if it was made), and None for a
+        # game the worker does not have
+        codes = []
+        for game_id, first, square_id in message[1]:
+            game = games.get(game_id)
+            if game is None:
+                codes.append(None)
+            else:
+                play_operation(game, first, square_id)
+                codes.append(REJECTION_CODES.get(game.get_rejection_reason(), 0))
+        return codes
+    if command == "new":
+        _, game_id, position = message
+        if game_id in games:
+            return False
+        games[game_id] = ChessVar("list", position)
+        return True
+    if command == "state":
+        game = games.get(message[1])
+        if game is None:
+            return None
+        return game.get_game_state(), game.get_current_player_turn()
+    if command == "snapshot":
+        game = games.get(message[1])
+        return None if game is None else game.to_bytes()
+    if command == "take":
+        return {game_id: games.pop(game_id).to_bytes() for game_id in message[1] if game_id in games}
+    if command == "put":
+        # every position is made into a game before any is added, so a bad one adds none of them
+        games.update({game_id: ChessVar.from_bytes(position) for game_id, position in message[1].items()})
+        return True
+    if command == "list":
+        return list(games)
+    if command == "remove":
+        return games.pop(message[1], None) is not None
+    raise ValueError("unknown worker command " + repr(command))
+
+
+def run_worker(connection):
+    """the loop of a worker process: answers every message from the main process until it gets None. every answer
+    is sent as (True, answer), or as (False, exception) if the message raised one, so one bad message can't stop the
+    worker and lose its games"""
+
+    games = {}
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        try:
+            answer = (True, answer_message(games, message))
+        except Exception as error:
+            answer = (False, error)
+        connection.send(answer)
+
+    connection.close()
+
+
+def receive_answer(connection):
+    """returns the next answer of a worker, raising the exception again in this process if the message raised one"""
+    succeeded, answer = connection.recv()
+    if not succeeded:
+        raise answer
+    return answer
+
+
+class ShardedHost:
+    """A ShardedHost object hosts ChessVar games on num_of_workers worker processes. close() has to be called (or the
+    host used in a with statement) to stop the workers"""
+
+    def __init__(self, num_of_workers=2):
+        self._ring = HashRing()
+        self._workers = {}
+        self._next_worker_number = 0
+        for _ in range(num_of_workers):
+            self.start_worker()
+
+    def start_worker(self):
+        """starts a worker process and puts it on the ring without moving any games to it. returns its number"""
+
+        worker_number = self._next_worker_number
+        self._next_worker_number += 1
+        main_end, worker_end = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_worker, args=(worker_end,), daemon=True)
+        process.start()
+        worker_end.close()
+        self._workers[worker_number] = (process, main_end)
+        self._ring.add_worker(worker_number)
+        return worker_number
+
+    def get_workers(self):
+        """returns the sorted list of worker numbers"""
+        return self._ring.get_workers()
+
+    def get_worker_for_game(self, game_id):
+        """returns the number of the worker that hosts the game id"""
+        return self._ring.get_worker(game_id)
+
+    def ask_worker(self, worker_number, message):
+        """sends a message to a worker and returns its answer"""
+        connection = self._workers[worker_number][1]
+        connection.send(message)
+        return receive_answer(connection)
+
+    def new_game(self, game_id, fen=None):
+        """starts hosting a game with the id at the starting position, or at the FEN position. returns False if there
+        already is a game with that id. raises a ValueError if the FEN text is not a position"""
+        position = None
+        if fen is not None:
+            position = fen_to_position_bytes(fen)
+            # checked here so a bad position never reaches the worker
+            check_position_bytes(position)
+        return self.ask_worker(self._ring.get_worker(game_id), ("new", game_id, position))
+
+    def remove_game(self, game_id):
+        """stops hosting the game. returns False if there is no game with that id"""
+        return self.ask_worker(self._ring.get_worker(game_id), ("remove", game_id))
+
+    def make_move(self, game_id, start_id, end_id):
+        """same as make_move of the game's ChessVar. returns False if there is no game with that id"""
+        return self.make_moves([(game_id, start_id, end_id)])[0]
+
+    def enter_fairy_piece(self, game_id, letter, square_id):
+        """same as enter_fairy_piece of the game's ChessVar. returns False if there is no game with that id"""
+        return self.make_moves([(game_id, letter, square_id)])[0]
+
+    def make_moves(self, operations, with_results=False):
+        """takes in a list of (game_id, start_id, end_id) and (game_id, letter, square_id) operations and plays them
+        like make_move and enter_fairy_piece, with every worker playing its share at the same time. returns a list
+        with True or False for every operation. if with_results is True the list has a ChessVar MoveResult for every
+        operation instead, or None for an operation on a game that is not hosted"""
+
+        shares = {}
+        for position, operation in enumerate(operations):
+            worker_number = self._ring.get_worker(operation[0])
+            if worker_number not in shares:
+                shares[worker_number] = ([], [])
+            shares[worker_number][0].append(position)
+            shares[worker_number][1].append(operation)
+
+        # send every share before waiting for any answer, so the workers play at the same time
+        command = "moves with codes" if with_results else "moves"
+        for worker_number, (_, share) in shares.items():
+            self._workers[worker_number][1].send((command, share))
+        # every answer is taken off its pipe before an error is raised, so no pipe is left out of step
+        answers = [(positions, self._workers[worker_number][1].recv())
+                   for worker_number, (positions, _) in shares.items()]
+        results = [False] * len(operations)
+        for positions, (succeeded, answer) in answers:
+            if not succeeded:
+                raise answer
+            for position, result in zip(positions, answer):
+                results[position] = result
+        if with_results:
+            return [None if code is None else MOVE_RESULTS_FROM_CODES[code] for code in results]
+        return results
+
+    def get_game_state(self, game_id):
+        """returns the game state of the game, or None if there is no game with that id"""
+        state = self.ask_worker(self._ring.get_worker(game_id), ("state", game_id))
+        return None if state is None else state[0]
+
+    def get_current_player_turn(self, game_id):
+        """returns whose turn it is in the game, or None if there is no game with that id"""
+        state = self.ask_worker(self._ring.get_worker(game_id), ("state", game_id))
+        return None if state is None else state[1]
+
+    def get_chess_var(self, game_id):
+        """returns a copy of the game as a new ChessVar in this process, or None if there is no game with that id"""
+        position = self.ask_worker(self._ring.get_worker(game_id), ("snapshot", game_id))
+        return None if position is None else ChessVar.from_bytes(position)
+
+    def get_num_of_games(self):
+        """returns how many games each worker hosts, as a dict"""
+        return {worker_number: len(self.ask_worker(worker_number, ("list",))) for worker_number in self.get_workers()}
+
+    def add_worker(self):
+        """starts a new worker and moves the games it now owns to it from the other workers. returns its number"""
+
+        worker_number = self.start_worker()
+        moved = {}
+        for other_worker in self.get_workers():
+            if other_worker == worker_number:
+                continue
+            game_ids = [game_id for game_id in self.ask_worker(other_worker, ("list",))
+                        if self._ring.get_worker(game_id) == worker_number]
+            if game_ids:
+                moved.update(self.ask_worker(other_worker, ("take", game_ids)))
+        if moved:
+            self.ask_worker(worker_number, ("put", moved))
+        return worker_number
+
+    def remove_worker(self, worker_number):
+        """moves every game of the worker to the workers that now own them and stops it. raises a ValueError for the
+        last worker"""
+
+        if len(self._workers) == 1:
+            raise ValueError("the last worker can't be removed")
+        games = self.ask_worker(worker_number, ("take", self.ask_worker(worker_number, ("list",))))
+        self._ring.remove_worker(worker_number)
+        self.stop_worker(worker_number)
+
+        shares = {}
+        for game_id, position in games.items():
+            shares.setdefault(self._ring.get_worker(game_id), {})[game_id] = position
+        for other_worker, share in shares.items():
+            self.ask_worker(other_worker, ("put", share))
+
+    def stop_worker(self, worker_number):
+        """stops the worker process"""
+        process, connection = self._workers.pop(worker_number)
+        connection.send(None)
+        connection.close()
+        process.join()
+
+    def close(self):
+        """stops every worker. their games are gone"""
+        for worker_number in list(self._workers):
+            self.stop_worker(worker_number)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()